@@ -1,44 +1,131 @@
-import heapq
+import time
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic
+from Algorithms.instrumentation import tree_depth
+from Algorithms.path_tree import ShortestPathTree
+from Algorithms.priority_queue import make_queue
+
+# search_all with more goals than this runs as Dijkstra: the min over every
+# goal's heuristic row costs O(N) per goal (and evicts the cached rows)
+MAX_HEURISTIC_GOALS = 8
 
 class AStarAlgorithm:
-    def __init__(self, actualGraph, estimateGraph):
-        self.graph = actualGraph
-        self.heuristicValues = estimateGraph
+    def __init__(self, actualGraph, estimateGraph, queue='heapq'):
+        self.graph = as_compact_graph(actualGraph)
+        # estimateGraph can be a heuristic provider (e.g. HaversineHeuristic)
+        # or the old straight-line matrix, either way it shares our node ids
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+        # frontier backend, see priority_queue.py ('heapq', 'binary', 'pairing', 'bucket')
+        self.queue = queue
+        self.queue_stats = {}
         self.expanded_nodes = 0  
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
 
     def search(self, start_city, goal_city):
+        self.expanded_nodes = 0
         if start_city == goal_city:
             return ([start_city], 0)
+
+        graph = self.graph
+        if start_city not in graph.index or goal_city not in graph.index:
+            return (None, 0)
+        start = graph.index[start_city]
+        goal = graph.index[goal_city]
+        h = self.heuristic.goal_row(goal)
             
-        priorityq = []
-        heapq.heappush(priorityq, (0, 0, start_city))  # (f, g, node)
+        priorityq = make_queue(self.queue)
+        priorityq.push(start, 0, 0)  # node keyed by (f, g)
         cameFrom = {}
-        costSoFar = {start_city: 0}
+        costSoFar = {start: 0}
         
         while priorityq:
-            _, currentCost, current = heapq.heappop(priorityq)
-            
-            if current in costSoFar and currentCost > costSoFar[current]:
-                continue
+            _, current = priorityq.pop()
                 
             self.expanded_nodes += 1
-            if current == goal_city:
+            if current == goal:
                 path = []
                 total = current
                 while total in cameFrom:
                     path.append(total)
                     total = cameFrom[total]
-                path.append(start_city)
-                return (path[::-1], costSoFar[current])
+                path.append(start)
+                self.queue_stats = priorityq.stats()
+                if self.stats is not None:
+                    self._report(costSoFar, cameFrom)
+                return (graph.names(path[::-1]), costSoFar[current])
             
-            for neighbor, cost in self.graph[current].items():
+            for neighbor, cost in graph.edges(current):
                 newCost = costSoFar[current] + cost
                 t = costSoFar.get(neighbor, float('inf'))
                 if (newCost < t):
                     costSoFar[neighbor] = newCost
-                    heuristic = self.heuristicValues[neighbor][current]
-                    priority = newCost + heuristic
-                    heapq.heappush(priorityq, (priority, newCost, neighbor))
+                    priority = newCost + h[neighbor]
+                    priorityq.push(neighbor, priority, newCost)
+                    cameFrom[neighbor] = current
+        
+        self.queue_stats = priorityq.stats()
+        if self.stats is not None:
+            self._report(costSoFar, cameFrom)
+        return (None, 0)
+
+    def _report(self, costSoFar, cameFrom):
+        queue_stats = self.queue_stats
+        # every entry past the first for a city is a duplicate (re-opened ones included)
+        generated = queue_stats['pushes'] + queue_stats['decreases']
+        self.stats.update(generated=generated, duplicates=generated - len(costSoFar),
+                          max_frontier=queue_stats['peak_frontier'],
+                          max_depth=tree_depth(cameFrom))
+
+    def search_all(self, start_city, goal_cities=None):
+        """
+        One-to-many A*: a single search that stops once every goal is popped.
+        h(n) = min over the goals of h(n, goal), which stays admissible. With
+        goal_cities=None, or more than MAX_HEURISTIC_GOALS goals, h is 0 and
+        this is Dijkstra.
+        Returns: ShortestPathTree, use tree.path_to(city) for each route
+        """
+        graph = self.graph
+        self.expanded_nodes = 0
+        start_time = time.perf_counter()
+        
+        start = graph.index[start_city]
+        tree = ShortestPathTree(graph, start)
+        if goal_cities is None:
+            goals = set(range(graph.num_nodes))
+        else:
+            goals = {graph.index[city] for city in goal_cities if city in graph.index}
+        if goal_cities is None or not goals or len(goals) > MAX_HEURISTIC_GOALS:
+            h = [0.0] * graph.num_nodes
+        else:
+            rows = [self.heuristic.goal_row(goal) for goal in goals]
+            h = rows[0] if len(rows) == 1 else list(map(min, *rows))
+        
+        priorityq = make_queue(self.queue)
+        priorityq.push(start, h[start], 0)
+        cameFrom = tree.parent
+        costSoFar = tree.cost
+        
+        while priorityq and len(tree.settled) < len(goals):
+            _, current = priorityq.pop()
+            currentCost = costSoFar[current]
+                
+            self.expanded_nodes += 1
+            if current in goals and current not in tree.settled:
+                tree.settled[current] = (self.expanded_nodes,
+                                         (time.perf_counter() - start_time) * 1000)
+            
+            for neighbor, cost in graph.edges(current):
+                newCost = currentCost + cost
+                if newCost < costSoFar.get(neighbor, float('inf')):
+                    costSoFar[neighbor] = newCost
+                    priorityq.push(neighbor, newCost + h[neighbor], newCost)
                     cameFrom[neighbor] = current
         
-        return None
+        self.queue_stats = priorityq.stats()
+        if self.stats is not None:
+            self._report(costSoFar, cameFrom)
+        tree.expanded_nodes = self.expanded_nodes
+        tree.runtime = (time.perf_counter() - start_time) * 1000
+        tree.complete = goal_cities is None
+        return tree
@@ -0,0 +1,317 @@
+"""
+all_pairs.py - All-pairs shortest-path distance table
+Precomputes the road distance between every pair of cities, plus a next-hop
+matrix so any route can be read back in O(path length):
+
+    table = DistanceTable.build(graph)
+    table.distance('Buffalo', 'Sag Harbor')
+    table.path('Buffalo', 'Sag Harbor')
+
+Dense graphs (like our fully connected matrix) use Floyd-Warshall, relaxed a
+whole row at a time (NumPy when available). Sparse graphs use one Dijkstra
+per source, optionally spread over a process pool. When a single road
+changes, update_edge() only recomputes the entries that can be affected.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from Algorithms.compact_graph import as_compact_graph
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+INF = math.inf
+NO_HOP = -1
+EPSILON = 1e-9
+# graphs with more than this fraction of all possible edges count as dense
+DENSE_THRESHOLD = 0.1
+
+MAGIC = b'NYAP'
+VERSION = 1
+HEADER = struct.Struct('<4sIqqq')  # magic, version, nodes, table version, names length
+
+
+def dijkstra_row(graph, source):
+    """
+    Single-source Dijkstra over a CompactGraph.
+    Returns: (distance list, first-hop list) indexed by node id
+    """
+    n = graph.num_nodes
+    dist = [INF] * n
+    first_hop = [NO_HOP] * n
+    dist[source] = 0.0
+    first_hop[source] = source
+    done = [False] * n
+    frontier = [(0.0, source)]
+    while frontier:
+        cost, current = heapq.heappop(frontier)
+        if done[current]:
+            continue
+        done[current] = True
+        # first hop out of the source towards current's neighbors
+        hop = first_hop[current]
+        for neighbor, distance in graph.edges(current):
+            new_cost = cost + distance
+            if new_cost < dist[neighbor]:
+                dist[neighbor] = new_cost
+                first_hop[neighbor] = neighbor if current == source else hop
+                heapq.heappush(frontier, (new_cost, neighbor))
+    return dist, first_hop
+
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_row(source):
+    return source, dijkstra_row(_worker_graph, source)
+
+
+class DistanceTable:
+    """N x N distance + next-hop matrices, stored row-major in flat arrays"""
+
+    def __init__(self, graph, dist, next_hop, version=0):
+        self.graph = graph
+        self.cities = graph.cities
+        self.n = graph.num_nodes
+        self.dist = dist            # float64[N*N]
+        self.next_hop = next_hop    # int32[N*N], NO_HOP if unreachable
+        self.version = version
+
+    # ------------------------------------------------------------------
+    # building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, graph, method='auto', workers=1):
+        """
+        method: 'floyd' (dense), 'dijkstra' (sparse) or 'auto' to pick by density
+        workers: processes used for the repeated-Dijkstra method
+        """
+        graph = as_compact_graph(graph)
+        n = graph.num_nodes
+        if method == 'auto':
+            density = graph.num_edges / (n * n) if n else 0
+            method = 'floyd' if density > DENSE_THRESHOLD else 'dijkstra'
+        if method == 'floyd':
+            dist, next_hop = cls._floyd_warshall(graph)
+        elif method == 'dijkstra':
+            dist, next_hop = cls._repeated_dijkstra(graph, workers)
+        else:
+            raise ValueError(f"Unknown all-pairs method: {method}")
+        return cls(graph, dist, next_hop)
+
+    @staticmethod
+    def _floyd_warshall(graph):
+        n = graph.num_nodes
+        if NUMPY_AVAILABLE:
+            dist = np.full((n, n), np.inf)
+            nxt = np.full((n, n), NO_HOP, dtype=np.int32)
+            for u in range(n):
+                for v, w in graph.edges(u):
+                    if w < dist[u, v]:
+                        dist[u, v] = w
+                        nxt[u, v] = v
+            np.fill_diagonal(dist, 0.0)
+            np.fill_diagonal(nxt, np.arange(n, dtype=np.int32))
+            for k in range(n):
+                # relax every pair through k at once
+                through_k = dist[:, k, None] + dist[None, k, :]
+                better = through_k < dist
+                dist = np.where(better, through_k, dist)
+                nxt = np.where(better, nxt[:, k, None], nxt)
+            return array('d', dist.tobytes()), array('i', nxt.astype(np.int32).tobytes())
+
+        dist = [[INF] * n for _ in range(n)]
+        nxt = [[NO_HOP] * n for _ in range(n)]
+        for u in range(n):
+            dist[u][u] = 0.0
+            nxt[u][u] = u
+            for v, w in graph.edges(u):
+                if w < dist[u][v]:
+                    dist[u][v] = w
+                    nxt[u][v] = v
+        for k in range(n):
+            row_k = dist[k]
+            for i in range(n):
+                d_ik = dist[i][k]
+                if d_ik == INF:
+                    continue
+                row_i, hops_i = dist[i], nxt[i]
+                hop = hops_i[k]
+                for j, d_kj in enumerate(row_k):
+                    if d_ik + d_kj < row_i[j]:
+                        row_i[j] = d_ik + d_kj
+                        hops_i[j] = hop
+        return (array('d', (d for row in dist for d in row)),
+                array('i', (h for row in nxt for h in row)))
+
+    @staticmethod
+    def _repeated_dijkstra(graph, workers):
+        n = graph.num_nodes
+        dist = array('d', [INF]) * (n * n)
+        next_hop = array('i', [NO_HOP]) * (n * n)
+
+        def store(source, row):
+            row_dist, row_hops = row
+            dist[source * n:(source + 1) * n] = array('d', row_dist)
+            next_hop[source * n:(source + 1) * n] = array('i', row_hops)
+
+        if workers and workers > 1:
+            # the graph is sent once per worker, not once per source
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(graph,)) as pool:
+                for source, row in pool.map(_worker_row, range(n), chunksize=64):
+                    store(source, row)
+        else:
+            for source in range(n):
+                store(source, dijkstra_row(graph, source))
+        return dist, next_hop
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+
+    def distance(self, start, goal):
+        """Shortest road distance between two cities (inf if unreachable)"""
+        return self.dist[self.graph.index[start] * self.n + self.graph.index[goal]]
+
+    def path(self, start, goal):
+        """(path, cost) between two cities by following next hops, (None, 0) if unreachable"""
+        u, v = self.graph.index[start], self.graph.index[goal]
+        if self.next_hop[u * self.n + v] == NO_HOP:
+            return (None, 0)
+        path = [u]
+        while u != v:
+            u = self.next_hop[u * self.n + v]
+            path.append(u)
+        return (self.graph.names(path), self.dist[path[0] * self.n + v])
+
+    def row(self, start):
+        """{city: distance} from one start city"""
+        u = self.graph.index[start]
+        return dict(zip(self.cities, self.dist[u * self.n:(u + 1) * self.n]))
+
+    # ------------------------------------------------------------------
+    # incremental updates
+    # ------------------------------------------------------------------
+
+    def update_edge(self, city_from, city_to, distance, both_ways=False):
+        """
+        Change one road (distance None removes it) on self.graph, in place,
+        and repair the table. Returns the number of rows recomputed.
+        """
+        u, v = self.graph.index[city_from], self.graph.index[city_to]
+        edges = [(u, v)] + ([(v, u)] if both_ways else [])
+        return self.repair(self.graph.update_edges((a, b, distance) for a, b in edges))
+
+    def repair(self, changes):
+        """
+        Bring the table up to date after self.graph was edited.
+        changes: [(from_id, to_id, old distance, new distance)] as returned by
+        CompactGraph.update_edges, None meaning no edge
+        Longer/removed roads go first and re-run Dijkstra just for the sources
+        whose routes used them; each shorter road then only needs an O(N^2)
+        relaxation through it. Returns the number of rows recomputed.
+        """
+        changes = [(u, v, INF if old is None else old, INF if new is None else new)
+                   for u, v, old, new in changes]
+        recomputed = 0
+        for u, v, old, new in changes:
+            if new > old:
+                recomputed += self._repair_increase(u, v, old)
+        for u, v, old, new in changes:
+            if new < old:
+                self._relax_through(u, v, new)
+        self.version += 1
+        return recomputed
+
+    def _relax_through(self, u, v, w):
+        n, dist, nxt = self.n, self.dist, self.next_hop
+        row_v = dist[v * n:(v + 1) * n]
+        for i in range(n):
+            d_iu = dist[i * n + u]
+            if d_iu == INF:
+                continue
+            base = d_iu + w
+            hop = v if i == u else nxt[i * n + u]
+            offset = i * n
+            for j in range(n):
+                candidate = base + row_v[j]
+                if candidate < dist[offset + j] - EPSILON:
+                    dist[offset + j] = candidate
+                    nxt[offset + j] = hop
+
+    def _repair_increase(self, u, v, old):
+        n, dist, nxt = self.n, self.dist, self.next_hop
+        # destinations whose route out of u starts with the changed edge
+        affected = [j for j in range(n) if nxt[u * n + j] == v and j != u]
+        if not affected:
+            return 0
+        row_v = dist[v * n:(v + 1) * n]
+        sources = []
+        for i in range(n):
+            d_iu = dist[i * n + u]
+            if d_iu == INF:
+                continue
+            # i's route to j can only use u->v if it is a shortest route (ties included)
+            if any(d_iu + old + row_v[j] <= dist[i * n + j] + EPSILON for j in affected):
+                sources.append(i)
+        for i in sources:
+            row_dist, row_hops = dijkstra_row(self.graph, i)
+            dist[i * n:(i + 1) * n] = array('d', row_dist)
+            nxt[i * n:(i + 1) * n] = array('i', row_hops)
+        return len(sources)
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+
+    def save(self, filename):
+        """Write the table (names, distances, next hops) to a binary file"""
+        names = '\n'.join(self.cities).encode('utf-8')
+        tmp_path = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.n, self.version, len(names)))
+            f.write(names + b'\0' * (-len(names) % 8))
+            f.write(array('d', self.dist).tobytes())
+            f.write(array('i', self.next_hop).tobytes())
+        os.replace(tmp_path, filename)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """
+        Map a saved table back in (copy-on-write, so update_edge still works).
+        graph must be the road graph the table was built from.
+        """
+        graph = as_compact_graph(graph)
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, n, table_version, names_length = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a distance table: {filename}")
+        position = HEADER.size
+        cities = bytes(mapped[position:position + names_length]).decode('utf-8').split('\n')
+        if n and cities != graph.cities[:n]:
+            graph = graph.reindex(cities)
+        position += names_length + (-names_length % 8)
+        view = memoryview(mapped)
+        dist = view[position:position + 8 * n * n].cast('d')
+        position += 8 * n * n
+        next_hop = view[position:position + 4 * n * n].cast('i')
+        table = cls(graph, dist, next_hop, table_version)
+        table._mmap = mapped
+        return table
@@ -0,0 +1,293 @@
+"""
+analysis.py - Structural analysis of a road graph
+Everything is computed on request from the CSR arrays and kept with the
+graph, so asking twice costs nothing. Road edits (update_edges) clear the
+graph's cache, and with_edges builds a new graph with an empty one, so
+results always belong to the graph version they were asked for.
+
+    analysis = GraphAnalysis.for_graph(graph)
+    analysis.summary()
+
+    degrees              out/in degree min, max, mean and histogram, from the
+                         offsets alone
+    components           connected components of the roads taken as two-way
+    articulation_points  cities whose loss splits their component (same DFS
+                         pass as the components)
+    strong_components    strongly connected components (Tarjan, one pass)
+    eccentricity         farthest reachable city, in miles or in hops
+    diameter             double-sweep estimate: a lower bound from the
+                         farthest pair found, and 2 x the smallest
+                         eccentricity seen as upper bound on connected
+                         two-way graphs
+
+The DFS passes use explicit stacks, so deep sparse graphs don't hit the
+recursion limit.
+"""
+
+from collections import deque
+from itertools import chain
+
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.compact_graph import as_compact_graph
+
+
+def _hop_row(graph, source):
+    """BFS hop counts from source, INF where unreachable"""
+    hops = [INF] * graph.num_nodes
+    hops[source] = 0
+    queue = deque([source])
+    offsets, nbrs = graph.offsets, graph.neighbors
+    while queue:
+        u = queue.popleft()
+        step = hops[u] + 1
+        for i in range(offsets[u], offsets[u + 1]):
+            v = nbrs[i]
+            if hops[v] == INF:
+                hops[v] = step
+                queue.append(v)
+    return hops
+
+
+def _farthest(row):
+    """(node, distance) of the farthest reachable node in a distance row"""
+    best, far = 0, -1
+    for v, d in enumerate(row):
+        if d != INF and d >= best:
+            best, far = d, v
+    return far, best
+
+
+class GraphAnalysis:
+    """Connectivity and shape metrics of one CompactGraph, each computed once"""
+
+    def __init__(self, graph):
+        self.graph = as_compact_graph(graph)
+        self._results = {}
+
+    @classmethod
+    def for_graph(cls, graph):
+        """Analysis of graph, kept with the graph"""
+        graph = as_compact_graph(graph)
+        if 'graph_analysis' not in graph.derived:
+            graph.derived['graph_analysis'] = cls(graph)
+        return graph.derived['graph_analysis']
+
+    def _cached(self, key, build):
+        if key not in self._results:
+            self._results[key] = build()
+        return self._results[key]
+
+    # ------------------------------------------------------------------
+    # degrees
+    # ------------------------------------------------------------------
+
+    def symmetric(self):
+        """True if every road has a return road of the same length"""
+        def build():
+            graph, reverse = self.graph, self.graph.reversed()
+            return (graph.offsets == reverse.offsets and graph.neighbors == reverse.neighbors
+                    and graph.weights == reverse.weights)
+        return self._cached('symmetric', build)
+
+    def degrees(self):
+        """{'out': stats, 'in': stats}, stats being min, max, mean and {degree: count}"""
+        def stats(offsets):
+            degree = [offsets[u + 1] - offsets[u] for u in range(self.graph.num_nodes)]
+            histogram = {}
+            for d in degree:
+                histogram[d] = histogram.get(d, 0) + 1
+            return {'min': min(degree, default=0), 'max': max(degree, default=0),
+                    'mean': sum(degree) / len(degree) if degree else 0.0,
+                    'histogram': dict(sorted(histogram.items()))}
+
+        def build():
+            out = stats(self.graph.offsets)
+            into = out if self.symmetric() else stats(self.graph.reversed().offsets)
+            return {'out': out, 'in': into}
+        return self._cached('degrees', build)
+
+    def most_connected(self, count=5):
+        """[(city, out degree)] of the count cities with the most roads"""
+        graph = self.graph
+        ranked = sorted(range(graph.num_nodes), key=lambda u: -graph.degree(u))
+        return [(graph.cities[u], graph.degree(u)) for u in ranked[:count]]
+
+    # ------------------------------------------------------------------
+    # connectivity
+    # ------------------------------------------------------------------
+
+    def _undirected_pass(self):
+        """
+        Iterative Hopcroft-Tarjan DFS over the roads taken as two-way.
+        Returns: (components as id lists, articulation point ids)
+        """
+        graph = self.graph
+        n = graph.num_nodes
+        if self.symmetric():
+            adjacent = graph.neighbor_ids
+        else:
+            reverse = graph.reversed()
+            adjacent = lambda u: chain(graph.neighbor_ids(u), reverse.neighbor_ids(u))
+
+        discovered = [-1] * n
+        low = [0] * n
+        cut = bytearray(n)
+        components = []
+        clock = 0
+        for root in range(n):
+            if discovered[root] >= 0:
+                continue
+            discovered[root] = low[root] = clock
+            clock += 1
+            members = [root]
+            root_children = 0
+            stack = [(root, -1, iter(adjacent(root)))]
+            while stack:
+                u, parent, neighbors = stack[-1]
+                for v in neighbors:
+                    if v == parent:
+                        continue
+                    if discovered[v] < 0:
+                        discovered[v] = low[v] = clock
+                        clock += 1
+                        members.append(v)
+                        stack.append((v, u, iter(adjacent(v))))
+                        break
+                    if discovered[v] < low[u]:
+                        low[u] = discovered[v]
+                else:
+                    stack.pop()
+                    if parent < 0:
+                        continue
+                    if low[u] < low[parent]:
+                        low[parent] = low[u]
+                    if parent == root:
+                        root_children += 1
+                    elif low[u] >= discovered[parent]:
+                        cut[parent] = 1
+            if root_children > 1:
+                cut[root] = 1
+            components.append(members)
+        return components, [u for u in range(n) if cut[u]]
+
+    def components(self):
+        """Connected components (roads taken as two-way) as lists of cities, largest first"""
+        def build():
+            components, _ = self._cached('undirected', self._undirected_pass)
+            return sorted((self.graph.names(c) for c in components), key=len, reverse=True)
+        return self._cached('components', build)
+
+    def is_connected(self):
+        return len(self.components()) <= 1 and self.graph.num_nodes > 0
+
+    def articulation_points(self):
+        """Cities whose removal disconnects the rest of their component"""
+        def build():
+            _, points = self._cached('undirected', self._undirected_pass)
+            return self.graph.names(points)
+        return self._cached('articulation_points', build)
+
+    def strong_components(self):
+        """Strongly connected components (iterative Tarjan) as lists of cities, largest first"""
+        def build():
+            graph = self.graph
+            n = graph.num_nodes
+            index = [-1] * n
+            low = [0] * n
+            on_stack = bytearray(n)
+            stack = []
+            found = []
+            clock = 0
+            for root in range(n):
+                if index[root] >= 0:
+                    continue
+                index[root] = low[root] = clock
+                clock += 1
+                stack.append(root)
+                on_stack[root] = 1
+                work = [(root, iter(graph.neighbor_ids(root)))]
+                while work:
+                    u, neighbors = work[-1]
+                    for v in neighbors:
+                        if index[v] < 0:
+                            index[v] = low[v] = clock
+                            clock += 1
+                            stack.append(v)
+                            on_stack[v] = 1
+                            work.append((v, iter(graph.neighbor_ids(v))))
+                            break
+                        if on_stack[v] and index[v] < low[u]:
+                            low[u] = index[v]
+                    else:
+                        work.pop()
+                        if work:
+                            parent = work[-1][0]
+                            if low[u] < low[parent]:
+                                low[parent] = low[u]
+                        if low[u] == index[u]:
+                            component = []
+                            while True:
+                                v = stack.pop()
+                                on_stack[v] = 0
+                                component.append(v)
+                                if v == u:
+                                    break
+                            found.append(graph.names(component))
+            return sorted(found, key=len, reverse=True)
+        return self._cached('strong_components', build)
+
+    # ------------------------------------------------------------------
+    # distances
+    # ------------------------------------------------------------------
+
+    def _row(self, node, weighted):
+        return dijkstra_row(self.graph, node)[0] if weighted else _hop_row(self.graph, node)
+
+    def eccentricity(self, city, weighted=True):
+        """(farthest reachable city, its distance in miles or hops) from city"""
+        far, distance = _farthest(self._row(self.graph.index[city], weighted))
+        return self.graph.cities[far], distance
+
+    def diameter(self, sweeps=4, weighted=True):
+        """
+        Double-sweep estimate, starting from the best-connected city of the
+        largest component: each sweep runs from the farthest city of the last.
+        Returns: {'lower', 'upper' (None on one-way graphs), 'ends': (city, city)}
+        """
+        def build():
+            graph = self.graph
+            if not graph.num_nodes:
+                return {'lower': 0, 'upper': 0, 'ends': (None, None)}
+            largest = [graph.index[city] for city in self.components()[0]]
+            source = max(largest, key=graph.degree)
+            lower, ends, smallest = 0, (source, source), INF
+            for _ in range(sweeps):
+                far, distance = _farthest(self._row(source, weighted))
+                smallest = min(smallest, distance)
+                if distance <= lower:
+                    break
+                lower, ends = distance, (source, far)
+                source = far
+            # on a two-way graph every city is within ecc(v) of v, so no two are
+            # more than 2 ecc(v) apart (within one component)
+            upper = 2 * smallest if self.symmetric() and self.is_connected() else None
+            return {'lower': lower, 'upper': upper, 'ends': tuple(graph.names(ends))}
+        return self._cached(('diameter', sweeps, weighted), build)
+
+    def summary(self):
+        """Every metric above in one dict"""
+        components = self.components()
+        strong = self.strong_components()
+        return {
+            'nodes': self.graph.num_nodes,
+            'edges': self.graph.num_edges,
+            'symmetric': self.symmetric(),
+            'degrees': self.degrees(),
+            'components': len(components),
+            'largest_component': len(components[0]) if components else 0,
+            'strong_components': len(strong),
+            'largest_strong_component': len(strong[0]) if strong else 0,
+            'articulation_points': self.articulation_points(),
+            'diameter_miles': self.diameter(),
+            'diameter_hops': self.diameter(weighted=False),
+        }
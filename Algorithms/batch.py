@@ -0,0 +1,189 @@
+"""
+batch.py - Run many (algorithm, start, goal) queries over a process pool
+The graph is written once in the compiled cache format (or the existing
+__graphcache__ file is reused) and every worker mmaps that file read-only,
+so all processes share one page-cache copy instead of each unpickling its
+own graph. Jobs are sent in small chunks and results stream back in
+completion order:
+
+    with BatchExecutor(graph, create_algorithm, heuristic, workers=8) as pool:
+        for result in pool.run([('A_STAR', 'Rochester', 'Buffalo'), ...]):
+            print(result['index'], result['cost'], result['runtime'])
+
+Per-graph preprocessing (CH, landmarks) is built once per worker on its
+first query and reused for the rest of the batch.
+
+Road changes made after the pool started (update_edges) travel with every
+later job, and each worker applies the ones it hasn't seen yet before
+answering, so a change doesn't need a new graph file or new workers.
+"""
+
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.graph_cache import open_cache, save_graph
+from Algorithms.instrumentation import Instrumentation
+
+# state of one worker process, filled in by _init_worker
+_worker = {}
+
+
+def _init_worker(path, factory, heuristic):
+    _worker['graph'] = open_cache(path)
+    _worker['factory'] = factory
+    _worker['heuristic'] = heuristic
+    _worker['algorithms'] = {}
+    _worker['edits'] = 0
+    # ROUTE_TRACE / ROUTE_PROFILE switch on per-query stats in the workers too
+    _worker['instrumentation'] = Instrumentation.from_env()
+
+
+def _algorithm(name):
+    algorithms = _worker['algorithms']
+    if name not in algorithms:
+        algorithms[name] = _worker['factory'](name, _worker['graph'], _worker['heuristic'])
+    return algorithms[name]
+
+
+def _apply_edits(edits):
+    """Catch this worker's graph up with the road changes sent along with a job"""
+    if len(edits) > _worker['edits']:
+        _worker['graph'].update_edges(edits[_worker['edits']:])
+        _worker['edits'] = len(edits)
+        # search objects may hold data built from the old roads (CH, landmarks)
+        _worker['algorithms'] = {}
+
+
+def _run_chunk(chunk, edits=()):
+    """Run a list of (index, algorithm, start, goal) jobs in this worker"""
+    _apply_edits(edits)
+    pid = os.getpid()
+    results = []
+    for index, name, start, goal in chunk:
+        result = {'index': index, 'algorithm': name, 'start': start, 'goal': goal, 'worker': pid}
+        algo = _algorithm(name)
+        if algo is None:
+            result.update(path=None, cost=0, expanded=0, runtime=0.0, cpu=0.0, stops=0,
+                          error=f"Algorithm {name} not available")
+            results.append(result)
+            continue
+        instrumentation = _worker.get('instrumentation')
+        begin_cpu = time.process_time()
+        begin = time.perf_counter()
+        if instrumentation is not None:
+            path, cost, result['stats'] = instrumentation.run(algo, start, goal, name)
+        else:
+            path, cost = algo.search(start, goal)
+        runtime = (time.perf_counter() - begin) * 1000
+        cpu = (time.process_time() - begin_cpu) * 1000
+        result.update(path=path, cost=cost, expanded=algo.expanded_nodes, runtime=runtime,
+                      cpu=cpu, stops=len(path) - 1 if path else 0)
+        results.append(result)
+    return results
+
+
+def _run_one(job, edits=()):
+    return _run_chunk([job], edits)[0]
+
+
+class BatchExecutor:
+    """
+    Process pool answering shortest-path queries on one shared graph.
+    factory(name, graph, heuristic) builds the search object in each worker
+    (main.create_algorithm). It and the heuristic provider are pickled once
+    per worker, not per query.
+    """
+
+    def __init__(self, graph, factory, heuristic=None, workers=None, chunk_size=8):
+        graph = as_compact_graph(graph)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.stats = {}
+        # (from_id, to_id, distance) road changes since the pool started
+        self.edits = ()
+
+        self._temporary = None
+        path = graph.cache_path
+        if path is None or not os.path.exists(path):
+            fd, path = tempfile.mkstemp(prefix='routegraph-', suffix='.bin')
+            os.close(fd)
+            save_graph(graph, path)
+            self._temporary = path
+        self.path = path
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(path, factory, heuristic))
+
+    def submit(self, algorithm, start, goal):
+        """Queue one query, returns a concurrent.futures.Future of its result dict"""
+        return self._pool.submit(_run_one, (0, algorithm, start, goal), self.edits)
+
+    def update_edges(self, changes):
+        """
+        Change roads for every query submitted from now on: changes are
+        (from_id, to_id, distance) like CompactGraph.update_edges. The list of
+        changes is sent with each job, so restart the pool on a fresh graph
+        once it gets long.
+        """
+        self.edits += tuple(changes)
+
+    def run(self, jobs):
+        """
+        Run (algorithm, start, goal) jobs, yielding one result dict per job as
+        soon as its chunk finishes. 'index' is the job's position in jobs;
+        'runtime'/'cpu' are the query's wall/CPU time in ms and 'worker' is
+        the pid that answered it. Jobs that couldn't be answered (unknown
+        algorithm, or a search in their chunk raised) carry an 'error'.
+        Totals end up in self.stats.
+        """
+        jobs = [(i, name, start, goal) for i, (name, start, goal) in enumerate(jobs)]
+        begin = time.perf_counter()
+        chunks = {}
+        for i in range(0, len(jobs), self.chunk_size):
+            chunk = jobs[i:i + self.chunk_size]
+            chunks[self._pool.submit(_run_chunk, chunk, self.edits)] = chunk
+
+        per_worker = {}
+        busy = 0.0
+        for future in as_completed(chunks):
+            try:
+                results = future.result()
+            except Exception as e:
+                # a failed search (or a dead worker) fails its own chunk, not the batch
+                error = f"{type(e).__name__}: {e}"
+                results = [{'index': index, 'algorithm': name, 'start': start, 'goal': goal,
+                            'worker': None, 'path': None, 'cost': 0, 'expanded': 0,
+                            'runtime': 0.0, 'cpu': 0.0, 'stops': 0, 'error': error}
+                           for index, name, start, goal in chunks[future]]
+            for result in results:
+                per_worker[result['worker']] = per_worker.get(result['worker'], 0) + 1
+                busy += result['runtime']
+                yield result
+
+        wall = time.perf_counter() - begin
+        self.stats = {
+            'queries': len(jobs),
+            'workers': self.workers,
+            'wall_ms': wall * 1000,
+            'queries_per_second': len(jobs) / wall if wall > 0 else 0.0,
+            # summed query time / (wall time * workers), how busy the pool was
+            'utilization': busy / (wall * 1000 * self.workers) if wall > 0 else 0.0,
+            'per_worker': per_worker,
+        }
+
+    def close(self):
+        self._pool.shutdown()
+        if self._temporary:
+            try:
+                os.remove(self._temporary)
+            except OSError:
+                pass
+            self._temporary = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
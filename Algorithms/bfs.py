@@ -1,36 +1,60 @@
 from collections import deque
 
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.instrumentation import tree_depth
+
 class BFSAlgorithm:
 
     def __init__(self, graph):
-        self.graph = graph
+        self.graph = as_compact_graph(graph)
         self.expanded_nodes = 0
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
 
-    def search(self, start, goal):
+    def search(self, start_city, goal_city):
         
+        self.expanded_nodes = 0
+        graph = self.graph
+        if start_city not in graph.index or goal_city not in graph.index:
+            return None, 0
+        start = graph.index[start_city]
+        goal = graph.index[goal_city]
+
         visited = set([start])
         queue = deque([start]) #initialize queue with start node
         parent = {start: None}
         visited.add(start)
+        track = self.stats is not None
+        max_frontier = 1
 
         while queue:
             
+            if track and len(queue) > max_frontier:
+                max_frontier = len(queue)
             current_node = queue.popleft() 
             self.expanded_nodes +=1
             if current_node == goal:   #reconstruct
+                if track:
+                    self._report(visited, parent, max_frontier)
                 path = []
-                cost = 0
                 while current_node != None:
                     path.append(current_node)
                     current_node = parent[current_node]
                 path.reverse()
-                for i in range(len(path)-1):
-                    cost += self.graph[path[i]][path[i+1]]
-                return path,cost
+                cost = graph.path_cost(path)
+                return graph.names(path),cost
             
             #add unvisited neighbors to queue
-            for neighbor, distance in self.graph.get(current_node, {}).items():    
+            for neighbor in graph.neighbor_ids(current_node):    
                 if neighbor not in visited:
                     visited.add(neighbor)
                     parent[neighbor] = current_node
-                    queue.append(neighbor)
\ No newline at end of file
+                    queue.append(neighbor)
+
+        if track:
+            self._report(visited, parent, max_frontier)
+        return None, 0
+
+    def _report(self, visited, parent, max_frontier):
+        # the visited check means a city is never queued twice
+        self.stats.update(generated=len(visited), duplicates=0, max_frontier=max_frontier,
+                          max_depth=tree_depth(parent))
@@ -0,0 +1,136 @@
+"""
+bidirectional.py - Bidirectional UCS and bidirectional A*
+Both searches grow one frontier from the start (on the road graph) and one
+from the goal (on the reversed graph), always expanding the side whose
+smallest key is lower. They stop once the two smallest keys add up to at
+least the best meeting cost found so far.
+
+Bidirectional A* uses the averaged potentials
+    p_f(v) = (h(v, goal) - h(v, start)) / 2,   p_b(v) = -p_f(v)
+which keep both searches consistent, so the same stopping rule stays exact.
+The heuristic is scaled down just enough to be consistent on our data.
+expanded_nodes counts the expansions of both sides together.
+"""
+
+import heapq
+import math
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic, consistency_scale
+from Algorithms.instrumentation import tree_depth, unwrap_heuristic
+
+
+class BidirectionalUCSAlgorithm:
+    def __init__(self, graph):
+        self.graph = as_compact_graph(graph)
+        self.expanded_nodes = 0
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
+    def _potentials(self, start, goal):
+        """Per-side key offsets, none for plain UCS"""
+        return None, None
+
+    def search(self, start, goal):
+        """
+        Search for a path from start to goal from both ends at once.
+        Returns: (path, cost) tuple
+        """
+        self.expanded_nodes = 0
+        if start == goal:
+            return ([start], 0)
+
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        source = graph.index[start]
+        target = graph.index[goal]
+
+        graphs = (graph, graph.reversed())
+        potentials = self._potentials(source, target)
+        cost = ({source: 0}, {target: 0})
+        parent = ({source: None}, {target: None})
+        closed = (set(), set())
+        frontier = ([(self._key(potentials[0], source, 0), source)],
+                    [(self._key(potentials[1], target, 0), target)])
+
+        best = math.inf   # best start -> goal cost seen where the searches touch
+        meeting = None
+        track = self.stats is not None
+        stale = 0
+        max_frontier = 2
+
+        while frontier[0] and frontier[1]:
+            if frontier[0][0][0] + frontier[1][0][0] >= best:
+                break
+
+            if track and len(frontier[0]) + len(frontier[1]) > max_frontier:
+                max_frontier = len(frontier[0]) + len(frontier[1])
+            side = 0 if frontier[0][0][0] <= frontier[1][0][0] else 1
+            _, current = heapq.heappop(frontier[side])
+            if current in closed[side]:
+                stale += 1
+                continue
+            closed[side].add(current)
+            self.expanded_nodes += 1
+
+            other = 1 - side
+            current_cost = cost[side][current]
+            for neighbor, distance in graphs[side].edges(current):
+                new_cost = current_cost + distance
+                if new_cost < cost[side].get(neighbor, math.inf):
+                    cost[side][neighbor] = new_cost
+                    parent[side][neighbor] = current
+                    heapq.heappush(frontier[side],
+                                   (self._key(potentials[side], neighbor, new_cost), neighbor))
+                if neighbor in cost[other]:
+                    total = cost[side][neighbor] + cost[other][neighbor]
+                    if total < best:
+                        best = total
+                        meeting = neighbor
+
+        if track:
+            self._report(frontier, cost, parent, stale, max_frontier)
+        if meeting is None:
+            return (None, 0)
+
+        # start ... meeting from the forward parents, meeting ... goal from the backward ones
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parent[0][node]
+        path.reverse()
+        node = parent[1][meeting]
+        while node is not None:
+            path.append(node)
+            node = parent[1][node]
+        return (graph.names(path), best)
+
+    def _report(self, frontier, cost, parent, stale, max_frontier):
+        # every entry pushed was expanded, skipped as stale or is still queued
+        generated = self.expanded_nodes + stale + len(frontier[0]) + len(frontier[1])
+        self.stats.update(generated=generated,
+                          duplicates=generated - len(cost[0]) - len(cost[1]),
+                          max_frontier=max_frontier,
+                          max_depth=max(tree_depth(parent[0]), tree_depth(parent[1])))
+
+    @staticmethod
+    def _key(potential, node, cost):
+        if potential is None:
+            return cost
+        return cost + potential[node]
+
+
+class BidirectionalAStarAlgorithm(BidirectionalUCSAlgorithm):
+    def __init__(self, actualGraph, estimateGraph):
+        super().__init__(actualGraph)
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+        self.scale = consistency_scale(self.graph, unwrap_heuristic(self.heuristic))
+
+    def _potentials(self, start, goal):
+        to_goal = self.heuristic.goal_row(goal)
+        to_start = self.heuristic.goal_row(start)
+        half = self.scale / 2
+        forward = [half * (to_goal[v] - to_start[v]) for v in range(self.graph.num_nodes)]
+        backward = [-p for p in forward]
+        return forward, backward
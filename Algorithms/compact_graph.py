@@ -0,0 +1,371 @@
+"""
+compact_graph.py - Compact integer-indexed graph (CSR layout)
+Cities are mapped to ints and adjacency is stored as three flat arrays:
+offsets, neighbor ids and weights. Row u lives in
+neighbors[offsets[u]:offsets[u+1]] and is sorted by neighbor id. Offsets
+and ids are always int64 ('q', the layout of the compiled cache), however
+the graph was built, so arrays of two graphs compare and hash the same.
+
+The class also behaves like the old dict-of-dicts (graph[city][city] -> miles)
+so code that still works with city names keeps running unchanged.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+_MISSING = object()
+
+
+class NeighborView(Mapping):
+    """Read-only name-keyed view of one adjacency row: {neighbor_name: distance}"""
+
+    def __init__(self, graph, node):
+        self._graph = graph
+        self._node = node
+
+    def __getitem__(self, city):
+        target = self._graph.index.get(city)
+        if target is None:
+            raise KeyError(city)
+        return self._graph.weight(self._node, target)
+
+    def __iter__(self):
+        cities = self._graph.cities
+        for neighbor in self._graph.neighbor_ids(self._node):
+            yield cities[neighbor]
+
+    def __len__(self):
+        return self._graph.degree(self._node)
+
+    def __repr__(self):
+        return f"NeighborView({dict(self.items())!r})"
+
+
+class CompactGraph(Mapping):
+    """CSR graph - city names map to ids 0..N-1, edges live in flat arrays"""
+
+    def __init__(self, cities, offsets, neighbors, weights):
+        self.cities = list(cities)
+        self.index = {city: i for i, city in enumerate(self.cities)}
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.weights = weights
+        self._orders = {}
+        self._reversed = None
+        # per-graph cache for data other modules derive from it once
+        self.derived = {}
+        # compiled copy on disk, if any (set by graph_cache.py)
+        self.cache_path = None
+
+    @classmethod
+    def from_edges(cls, cities, edges):
+        """
+        Build from an iterable of (from_id, to_id, distance) triples.
+        Later duplicates of the same edge overwrite earlier ones.
+        """
+        cities = list(cities)
+        rows = [[] for _ in cities]
+        for u, v, w in edges:
+            rows[u].append((v, w))
+        return cls._from_rows(cities, rows)
+
+    @classmethod
+    def from_arrays(cls, cities, src, dst, weights):
+        """
+        Build from three parallel flat arrays of edges (counting sort into CSR).
+        This is what the streaming loaders use, so no per-edge tuples are kept.
+        """
+        cities = list(cities)
+        n = len(cities)
+        offsets = array('q', [0]) * (n + 1)
+        for u in src:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        position = array('q', offsets)
+        neighbors = array('q', [0]) * len(src)
+        sorted_weights = array('d', [0.0]) * len(src)
+        for u, v, w in zip(src, dst, weights):
+            i = position[u]
+            neighbors[i] = v
+            sorted_weights[i] = w
+            position[u] = i + 1
+
+        # rows from a distance matrix are already in id order - only fall back
+        # to the slow path when a row is out of order or has duplicate edges
+        for u in range(n):
+            for i in range(offsets[u] + 1, offsets[u + 1]):
+                if neighbors[i - 1] >= neighbors[i]:
+                    rows = [list(zip(neighbors[offsets[r]:offsets[r + 1]],
+                                     sorted_weights[offsets[r]:offsets[r + 1]]))
+                            for r in range(n)]
+                    return cls._from_rows(cities, rows)
+        return cls(cities, offsets, neighbors, sorted_weights)
+
+    @classmethod
+    def from_dict(cls, graph, cities=None):
+        """
+        Build from the old {city: {neighbor: distance}} format.
+        If cities is given, those names get ids 0..len(cities)-1 in that order.
+        """
+        cities = list(cities) if cities else []
+        index = {city: i for i, city in enumerate(cities)}
+
+        def node_id(city):
+            if city not in index:
+                index[city] = len(cities)
+                cities.append(city)
+            return index[city]
+
+        edges = []
+        for city_from, row in graph.items():
+            u = node_id(city_from)
+            for city_to, distance in row.items():
+                edges.append((u, node_id(city_to), distance))
+        return cls.from_edges(cities, edges)
+
+    @classmethod
+    def _from_rows(cls, cities, rows):
+        offsets = array('q', [0])
+        neighbors = array('q')
+        weights = array('d')
+        for row in rows:
+            # dict() drops duplicate edges, keeping the last one seen
+            for v, w in sorted(dict(row).items()):
+                neighbors.append(v)
+                weights.append(w)
+            offsets.append(len(neighbors))
+        return cls(cities, offsets, neighbors, weights)
+
+    def __reduce__(self):
+        # pickle as plain arrays (an mmap'd graph holds memoryviews, which can't be pickled)
+        return (CompactGraph, (self.cities, array('q', self.offsets),
+                               array('q', self.neighbors), array('d', self.weights)))
+
+    def with_edges(self, changes):
+        """
+        Return a new graph with some directed edges changed.
+        changes: iterable of (from_id, to_id, distance), distance None removes the edge
+        """
+        changes = {(u, v): w for u, v, w in changes}
+        src, dst, weights = array('q'), array('q'), array('d')
+        for u in range(self.num_nodes):
+            for v, w in self.edges(u):
+                w = changes.pop((u, v), w)
+                if w is not None:
+                    src.append(u)
+                    dst.append(v)
+                    weights.append(w)
+        for (u, v), w in changes.items():
+            if w is not None:
+                src.append(u)
+                dst.append(v)
+                weights.append(w)
+        return CompactGraph.from_arrays(self.cities, src, dst, weights)
+
+    def update_edges(self, changes):
+        """
+        Change some directed edges in place (live road updates).
+        changes: iterable of (from_id, to_id, distance), distance None removes the edge
+        A new length is written straight into the weights array; adding or
+        removing an edge shifts the rest of the arrays by one slot and the
+        offsets after its row. The cached reverse graph gets the same edits,
+        the neighbor orders and the derived cache are dropped.
+        Returns: [(from_id, to_id, old distance, new distance)], None for no edge
+        """
+        self._make_writable()
+        applied = [(u, v, self._set_edge(u, v, w), w) for u, v, w in changes]
+        self._edited()
+        reverse = self._reversed
+        if reverse is not None:
+            reverse._make_writable()
+            for u, v, _, w in applied:
+                reverse._set_edge(v, u, w)
+            reverse._edited()
+        return applied
+
+    def _make_writable(self):
+        # a graph mapped from the compiled cache holds read-only memoryviews
+        if not isinstance(self.weights, array):
+            self.offsets = array('q', self.offsets)
+            self.neighbors = array('q', self.neighbors)
+            self.weights = array('d', self.weights)
+            self.__dict__.pop('_mmap', None)
+        # the file on disk no longer matches
+        self.cache_path = None
+
+    def _set_edge(self, u, v, w):
+        """Set (or remove, w None) edge u -> v, returns its old distance or None"""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        i = bisect_left(self.neighbors, v, lo, hi)
+        found = i < hi and self.neighbors[i] == v
+        old = self.weights[i] if found else None
+        if found and w is not None:
+            self.weights[i] = w
+            return old
+        if found:
+            del self.neighbors[i]
+            del self.weights[i]
+            shift = -1
+        elif w is not None:
+            self.neighbors.insert(i, v)
+            self.weights.insert(i, w)
+            shift = 1
+        else:
+            return old
+        offsets = self.offsets
+        for r in range(u + 1, len(offsets)):
+            offsets[r] += shift
+        return old
+
+    def _edited(self):
+        self._orders = {}
+        self.derived = {}
+
+    def reversed(self):
+        """Graph with every edge flipped (for backward searches), built once"""
+        if self._reversed is None:
+            src, dst = array('q'), array('q')
+            for u in range(self.num_nodes):
+                for v in self.neighbor_ids(u):
+                    src.append(v)
+                    dst.append(u)
+            self._reversed = CompactGraph.from_arrays(self.cities, src, dst,
+                                                      array('d', self.weights))
+            self._reversed._reversed = self
+        return self._reversed
+
+    def reindex(self, cities):
+        """Return a copy whose ids follow the given city order (extra cities go last)"""
+        known = set(cities)
+        order = list(cities) + [c for c in self.cities if c not in known]
+        new_id = {city: i for i, city in enumerate(order)}
+        remap = [new_id[city] for city in self.cities]
+        rows = [[] for _ in order]
+        for u in range(self.num_nodes):
+            rows[remap[u]] = [(remap[v], w) for v, w in self.edges(u)]
+        return CompactGraph._from_rows(order, rows)
+
+    # ------------------------------------------------------------------
+    # id-based API used by the search algorithms
+    # ------------------------------------------------------------------
+
+    @property
+    def num_nodes(self):
+        return len(self.cities)
+
+    @property
+    def num_edges(self):
+        return len(self.neighbors)
+
+    def id_of(self, city):
+        return self.index[city]
+
+    def name_of(self, node):
+        return self.cities[node]
+
+    def names(self, nodes):
+        """Convert a list of ids back to city names"""
+        cities = self.cities
+        return [cities[node] for node in nodes]
+
+    def degree(self, node):
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def neighbor_ids(self, node):
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+    def edges(self, node):
+        """(neighbor_id, distance) pairs for one node, in id order"""
+        lo, hi = self.offsets[node], self.offsets[node + 1]
+        return zip(self.neighbors[lo:hi], self.weights[lo:hi])
+
+    def weight(self, u, v, default=_MISSING):
+        """Distance of edge u -> v (binary search within row u)"""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        i = bisect_left(self.neighbors, v, lo, hi)
+        if i < hi and self.neighbors[i] == v:
+            return self.weights[i]
+        if default is _MISSING:
+            raise KeyError((self.cities[u], self.cities[v]))
+        return default
+
+    def has_edge(self, u, v):
+        return self.weight(u, v, None) is not None
+
+    def ordered_edges(self, node, order='name'):
+        """
+        (neighbor_id, distance) pairs for one node in a precomputed order.
+        'name' sorts neighbors alphabetically (what DFS/IDS always did), the
+        orderings are built once per graph instead of once per visit.
+        """
+        nbrs, wts = self.ordered_arrays(order)
+        lo, hi = self.offsets[node], self.offsets[node + 1]
+        return zip(nbrs[lo:hi], wts[lo:hi])
+
+    def ordered_arrays(self, order='name'):
+        """
+        (neighbors, weights) arrays laid out like self.neighbors/self.weights
+        (same offsets) but with each row in the given order
+        """
+        if order not in self._orders:
+            if order == 'name':
+                cities = self.cities
+                key = lambda edge: cities[edge[0]]
+            elif order == 'distance':
+                key = lambda edge: edge[1]
+            else:
+                raise ValueError(f"Unknown neighbor order: {order}")
+            nbrs = array('q')
+            wts = array('d')
+            for u in range(self.num_nodes):
+                for v, w in sorted(self.edges(u), key=key):
+                    nbrs.append(v)
+                    wts.append(w)
+            self._orders[order] = (nbrs, wts)
+        return self._orders[order]
+
+    def path_cost(self, path):
+        """Sum of edge distances along a list of ids"""
+        return sum(self.weight(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+    def to_dict(self):
+        """Expand back into a plain {city: {neighbor: distance}} dict"""
+        return {city: dict(self[city]) for city in self}
+
+    # ------------------------------------------------------------------
+    # name-keyed compatibility layer (behaves like the old dict-of-dicts)
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, city):
+        node = self.index.get(city)
+        if node is None:
+            raise KeyError(city)
+        return NeighborView(self, node)
+
+    def __contains__(self, city):
+        return city in self.index
+
+    def __iter__(self):
+        return iter(self.cities)
+
+    def __len__(self):
+        return len(self.cities)
+
+    def __repr__(self):
+        return f"CompactGraph({self.num_nodes} cities, {self.num_edges} edges)"
+
+
+def as_compact_graph(graph, cities=None):
+    """
+    Accept either a CompactGraph or an old dict-of-dicts and return a
+    CompactGraph. If cities is given the result's ids line up with it,
+    which lets a heuristic graph share ids with the road graph.
+    """
+    if isinstance(graph, CompactGraph):
+        if cities is None or graph.cities[:len(cities)] == list(cities):
+            return graph
+        return graph.reindex(cities)
+    return CompactGraph.from_dict(graph, cities)
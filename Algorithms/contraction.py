@@ -0,0 +1,319 @@
+"""
+contraction.py - Contraction hierarchies (CH) for fast point-to-point queries
+Preprocessing contracts the cities one at a time (least important first).
+Removing a city v adds a shortcut u -> w for every pair of neighbors whose
+only shortest connection went through v. Afterwards every edge points from a
+lower-ranked city to a higher-ranked one, and a query is just a small
+bidirectional Dijkstra that only walks "upward" from both ends:
+
+    hierarchy = ContractionHierarchy.build(graph)   # once, offline
+    hierarchy.save('ny.ch')
+    CHAlgorithm(graph, hierarchy).search('Buffalo', 'Sag Harbor')
+
+Shortcuts remember the city they skip, so routes are unpacked back into the
+real city path.
+"""
+
+import heapq
+import math
+import os
+import struct
+from array import array
+from bisect import bisect_left
+
+from Algorithms.compact_graph import CompactGraph, as_compact_graph
+from Algorithms.instrumentation import tree_depth
+
+NO_MIDDLE = -1
+MAGIC = b'NYCH'
+VERSION = 1
+HEADER = struct.Struct('<4sIqqqq')  # magic, version, nodes, up edges, down edges, names length
+
+
+def _witness_cost(out_edges, source, target_bound, skip, limit):
+    """
+    Dijkstra from source over not-yet-contracted cities, ignoring skip.
+    Stops at target_bound or after settling limit cities.
+    Returns: {city: cost} for everything reached
+    """
+    cost = {source: 0.0}
+    frontier = [(0.0, source)]
+    settled = 0
+    while frontier and settled < limit:
+        current_cost, current = heapq.heappop(frontier)
+        if current_cost > cost[current]:
+            continue
+        if current_cost > target_bound:
+            break
+        settled += 1
+        for neighbor, (distance, _) in out_edges[current].items():
+            if neighbor == skip:
+                continue
+            new_cost = current_cost + distance
+            if new_cost < cost.get(neighbor, math.inf):
+                cost[neighbor] = new_cost
+                heapq.heappush(frontier, (new_cost, neighbor))
+    return cost
+
+
+class ContractionHierarchy:
+    """Node ranks plus the upward forward/backward graphs with shortcut middles"""
+
+    def __init__(self, rank, up, up_middle, down, down_middle):
+        self.rank = rank
+        # up: edges u -> w with rank[w] > rank[u]
+        # down: edges stored reversed, w -> u for an original u -> w with rank[u] > rank[w],
+        #       so the backward search from the goal also only goes upward
+        self.up = up
+        self.up_middle = up_middle
+        self.down = down
+        self.down_middle = down_middle
+        self.cities = up.cities
+
+    @classmethod
+    def for_graph(cls, graph):
+        """Hierarchy for graph, built on first use and kept with the graph"""
+        graph = as_compact_graph(graph)
+        if 'contraction_hierarchy' not in graph.derived:
+            graph.derived['contraction_hierarchy'] = cls.build(graph)
+        return graph.derived['contraction_hierarchy']
+
+    @classmethod
+    def build(cls, graph, witness_limit=200):
+        """
+        Contract every city, least important first (lazy edge-difference order).
+        witness_limit caps each witness search; smaller is faster to build but
+        may add a few unnecessary shortcuts (results stay exact).
+        """
+        graph = as_compact_graph(graph)
+        n = graph.num_nodes
+        # live adjacency of the remaining graph: {neighbor: (distance, middle)}
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, w in graph.edges(u):
+                if w < out_edges[u].get(v, (math.inf,))[0]:
+                    out_edges[u][v] = (w, NO_MIDDLE)
+                    in_edges[v][u] = (w, NO_MIDDLE)
+
+        contracted = [False] * n
+        contracted_neighbors = [0] * n
+        up_rows = [None] * n
+        down_rows = [None] * n
+        rank = array('q', [0]) * n
+
+        def shortcuts_for(v):
+            shortcuts = []
+            for u, (w_in, _) in in_edges[v].items():
+                targets = {w: w_in + w_out for w, (w_out, _) in out_edges[v].items() if w != u}
+                if not targets:
+                    continue
+                reached = _witness_cost(out_edges, u, max(targets.values()), v, witness_limit)
+                for w, via_v in targets.items():
+                    if reached.get(w, math.inf) > via_v:
+                        shortcuts.append((u, w, via_v))
+            return shortcuts
+
+        def priority(v):
+            removed = len(in_edges[v]) + len(out_edges[v])
+            return len(shortcuts_for(v)) - removed + contracted_neighbors[v]
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        next_rank = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+            # lazy update: re-check the priority, contract only if it is still the smallest
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            for u, w, cost in shortcuts_for(v):
+                if cost < out_edges[u].get(w, (math.inf,))[0]:
+                    out_edges[u][w] = (cost, v)
+                    in_edges[w][u] = (cost, v)
+
+            # every remaining edge of v leads to a city contracted later (higher rank)
+            up_rows[v] = sorted((w, d, m) for w, (d, m) in out_edges[v].items())
+            down_rows[v] = sorted((u, d, m) for u, (d, m) in in_edges[v].items())
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                contracted_neighbors[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                contracted_neighbors[u] += 1
+            out_edges[v] = {}
+            in_edges[v] = {}
+            contracted[v] = True
+            rank[v] = next_rank
+            next_rank += 1
+
+        up, up_middle = cls._pack(graph.cities, up_rows)
+        down, down_middle = cls._pack(graph.cities, down_rows)
+        return cls(rank, up, up_middle, down, down_middle)
+
+    @staticmethod
+    def _pack(cities, rows):
+        offsets = array('q', [0])
+        neighbors = array('q')
+        weights = array('d')
+        middles = array('q')
+        for row in rows:
+            for v, w, m in row:
+                neighbors.append(v)
+                weights.append(w)
+                middles.append(m)
+            offsets.append(len(neighbors))
+        return CompactGraph(cities, offsets, neighbors, weights), middles
+
+    @property
+    def num_shortcuts(self):
+        return (sum(1 for m in self.up_middle if m != NO_MIDDLE)
+                + sum(1 for m in self.down_middle if m != NO_MIDDLE))
+
+    def _middle(self, u, w):
+        """City skipped by the edge u -> w, or NO_MIDDLE for a real road"""
+        if self.rank[u] < self.rank[w]:
+            graph, middles, row, target = self.up, self.up_middle, u, w
+        else:
+            graph, middles, row, target = self.down, self.down_middle, w, u
+        lo, hi = graph.offsets[row], graph.offsets[row + 1]
+        return middles[bisect_left(graph.neighbors, target, lo, hi)]
+
+    def unpack(self, path):
+        """Expand shortcut edges in a list of ids into the real city path"""
+        result = [path[0]]
+        stack = [(path[i], path[i + 1]) for i in range(len(path) - 2, -1, -1)]
+        while stack:
+            u, w = stack.pop()
+            middle = self._middle(u, w)
+            if middle == NO_MIDDLE:
+                result.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+        return result
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+
+    def save(self, filename):
+        names = '\n'.join(self.cities).encode('utf-8')
+        tmp_path = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.cities), self.up.num_edges,
+                                self.down.num_edges, len(names)))
+            f.write(names)
+            for values, typecode in ((self.rank, 'q'),
+                                     (self.up.offsets, 'q'), (self.up.neighbors, 'q'),
+                                     (self.up.weights, 'd'), (self.up_middle, 'q'),
+                                     (self.down.offsets, 'q'), (self.down.neighbors, 'q'),
+                                     (self.down.weights, 'd'), (self.down_middle, 'q')):
+                f.write(array(typecode, values).tobytes())
+        os.replace(tmp_path, filename)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as f:
+            magic, version, n, up_edges, down_edges, names_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a contraction hierarchy: {filename}")
+            cities = f.read(names_length).decode('utf-8').split('\n') if n else []
+
+            def read(typecode, count):
+                values = array(typecode)
+                values.fromfile(f, count)
+                return values
+
+            rank = read('q', n)
+            up = CompactGraph(cities, read('q', n + 1), read('q', up_edges), read('d', up_edges))
+            up_middle = read('q', up_edges)
+            down = CompactGraph(cities, read('q', n + 1), read('q', down_edges), read('d', down_edges))
+            down_middle = read('q', down_edges)
+        return cls(rank, up, up_middle, down, down_middle)
+
+
+class CHAlgorithm:
+    """Point-to-point queries on a contraction hierarchy"""
+
+    def __init__(self, graph, hierarchy=None):
+        self.graph = as_compact_graph(graph)
+        self.hierarchy = hierarchy or ContractionHierarchy.for_graph(self.graph)
+        self.expanded_nodes = 0
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
+    def search(self, start, goal):
+        """
+        Bidirectional upward Dijkstra, each side stops once its smallest key
+        reaches the best meeting cost.
+        Returns: (path, cost) tuple
+        """
+        self.expanded_nodes = 0
+        if start == goal:
+            return ([start], 0)
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        source = graph.index[start]
+        target = graph.index[goal]
+
+        graphs = (self.hierarchy.up, self.hierarchy.down)
+        cost = ({source: 0.0}, {target: 0.0})
+        parent = ({source: None}, {target: None})
+        frontier = ([(0.0, source)], [(0.0, target)])
+        best = math.inf
+        meeting = None
+        track = self.stats is not None
+        stale = 0
+        max_frontier = 2
+
+        while True:
+            live = [side for side in (0, 1) if frontier[side] and frontier[side][0][0] < best]
+            if not live:
+                break
+            if track and len(frontier[0]) + len(frontier[1]) > max_frontier:
+                max_frontier = len(frontier[0]) + len(frontier[1])
+            side = min(live, key=lambda s: frontier[s][0][0])
+            current_cost, current = heapq.heappop(frontier[side])
+            if current_cost > cost[side][current]:
+                stale += 1
+                continue
+            self.expanded_nodes += 1
+
+            other_cost = cost[1 - side].get(current)
+            if other_cost is not None and current_cost + other_cost < best:
+                best = current_cost + other_cost
+                meeting = current
+
+            for neighbor, distance in graphs[side].edges(current):
+                new_cost = current_cost + distance
+                if new_cost < cost[side].get(neighbor, math.inf):
+                    cost[side][neighbor] = new_cost
+                    parent[side][neighbor] = current
+                    heapq.heappush(frontier[side], (new_cost, neighbor))
+
+        if track:
+            # every entry pushed was expanded, skipped as stale or is still queued
+            generated = self.expanded_nodes + stale + len(frontier[0]) + len(frontier[1])
+            self.stats.update(generated=generated,
+                              duplicates=generated - len(cost[0]) - len(cost[1]),
+                              max_frontier=max_frontier,
+                              max_depth=max(tree_depth(parent[0]), tree_depth(parent[1])))
+        if meeting is None:
+            return (None, 0)
+
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parent[0][node]
+        path.reverse()
+        node = parent[1][meeting]
+        while node is not None:
+            path.append(node)
+            node = parent[1][node]
+        return (graph.names(self.hierarchy.unpack(path)), best)
@@ -0,0 +1,175 @@
+"""
+dense.py - UCS and A* for dense (fully connected) distance matrices
+On a complete graph every expansion touches all N cities anyway, so instead
+of pushing N heap entries per expansion the engine keeps:
+
+    matrix      N x N road distances (inf where there is no road)
+    cost        best known g per city
+    open_key    g (UCS) or g + h (A*) of every open city, inf otherwise
+
+Expanding u relaxes its whole row at once, cost = min(cost, cost[u] + matrix[u]),
+and the next city is the argmin of open_key - O(N) vector work per expansion
+with no heap at all. Uses NumPy when available, plain lists otherwise (same
+results; the lists only save the heap work, so they are ~1.5-2x faster than
+UCS/A* instead of ~20x). The matrix is built once per graph.
+
+Ties on the key go to the lowest city id (the heap searches break them by
+g first), so on exact ties the route can differ while the cost is the same.
+"""
+
+import math
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic
+from Algorithms.instrumentation import tree_depth
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def dense_matrix(graph):
+    """N x N distance matrix of graph (ndarray, or list of rows), kept with the graph"""
+    graph = as_compact_graph(graph)
+    if 'dense_matrix' not in graph.derived:
+        n = graph.num_nodes
+        if NUMPY_AVAILABLE:
+            matrix = np.full((n, n), np.inf)
+            offsets = np.asarray(graph.offsets, dtype=np.int64)
+            sources = np.repeat(np.arange(n), np.diff(offsets))
+            # CompactGraph rows hold each neighbor once, a plain assignment is enough
+            matrix[sources, np.asarray(graph.neighbors, dtype=np.int64)] = np.asarray(graph.weights)
+        else:
+            matrix = []
+            for u in range(n):
+                row = [math.inf] * n
+                for v, w in graph.edges(u):
+                    row[v] = w
+                matrix.append(row)
+        graph.derived['dense_matrix'] = matrix
+    return graph.derived['dense_matrix']
+
+
+class DenseUCSAlgorithm:
+    """Uniform Cost Search (Dijkstra) with whole-row relaxation"""
+
+    def __init__(self, graph):
+        self.graph = as_compact_graph(graph)
+        self.matrix = dense_matrix(self.graph)
+        self.expanded_nodes = 0
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
+    def _heuristic_row(self, goal):
+        """h for every city, None means h = 0"""
+        return None
+
+    def search(self, start, goal):
+        """
+        Search for a path from start to goal.
+        Returns: (path, cost) tuple
+        """
+        self.expanded_nodes = 0
+        if start == goal:
+            return ([start], 0)
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        source = graph.index[start]
+        target = graph.index[goal]
+        h = self._heuristic_row(target)
+
+        if NUMPY_AVAILABLE:
+            found, cost, parent = self._search_numpy(source, target, h)
+        else:
+            found, cost, parent = self._search_lists(source, target, h)
+        if self.stats is not None:
+            tree = {v: int(u) for v, u in enumerate(parent) if u >= 0}
+            reached = len(tree) + 1
+            self.stats.update(duplicates=self.stats.generated - reached, max_depth=tree_depth(tree))
+        if not found:
+            return (None, 0)
+
+        path = [target]
+        while path[-1] != source:
+            path.append(int(parent[path[-1]]))
+        return (graph.names(path[::-1]), float(cost[target]))
+
+    def _search_numpy(self, source, target, h):
+        n = self.graph.num_nodes
+        matrix = self.matrix
+        h = np.zeros(n) if h is None else np.asarray(h, dtype=float)
+        cost = np.full(n, np.inf)
+        parent = np.full(n, -1, dtype=np.int64)
+        open_key = np.full(n, np.inf)
+        cost[source] = 0.0
+        open_key[source] = h[source]
+        stats = self.stats
+        if stats is not None:
+            stats.update(generated=1, max_frontier=1)
+
+        while True:
+            current = int(np.argmin(open_key))
+            if open_key[current] == np.inf:
+                return False, cost, parent
+            self.expanded_nodes += 1
+            if current == target:
+                return True, cost, parent
+            open_key[current] = np.inf
+
+            candidate = cost[current] + matrix[current]
+            # a cheaper g re-opens a city even if it was closed (h may be inconsistent)
+            better = candidate < cost
+            if better.any():
+                cost[better] = candidate[better]
+                parent[better] = current
+                open_key[better] = candidate[better] + h[better]
+                if stats is not None:
+                    stats.generated += int(better.sum())
+                    stats.max_frontier = max(stats.max_frontier, int(np.isfinite(open_key).sum()))
+
+    def _search_lists(self, source, target, h):
+        n = self.graph.num_nodes
+        inf = math.inf
+        h = [0.0] * n if h is None else h
+        cost = [inf] * n
+        parent = [-1] * n
+        open_key = [inf] * n
+        cost[source] = 0.0
+        open_key[source] = h[source]
+        stats = self.stats
+        if stats is not None:
+            stats.update(generated=1, max_frontier=1)
+
+        while True:
+            current = min(range(n), key=open_key.__getitem__)
+            if open_key[current] == inf:
+                return False, cost, parent
+            self.expanded_nodes += 1
+            if current == target:
+                return True, cost, parent
+            open_key[current] = inf
+
+            current_cost = cost[current]
+            for v, w in enumerate(self.matrix[current]):
+                new_cost = current_cost + w
+                if new_cost < cost[v]:
+                    cost[v] = new_cost
+                    parent[v] = current
+                    open_key[v] = new_cost + h[v]
+                    if stats is not None:
+                        stats.generated += 1
+            if stats is not None:
+                stats.max_frontier = max(stats.max_frontier, n - open_key.count(inf))
+
+
+class DenseAStarAlgorithm(DenseUCSAlgorithm):
+    """A* with whole-row relaxation, open cities keyed by g + h"""
+
+    def __init__(self, actualGraph, estimateGraph):
+        super().__init__(actualGraph)
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+
+    def _heuristic_row(self, goal):
+        return self.heuristic.goal_row(goal)
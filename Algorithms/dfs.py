@@ -1,40 +1,174 @@
+import math
+import time
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic, consistency_scale
+from Algorithms.instrumentation import unwrap_heuristic
+
+# check the time budget once every this many steps
+CLOCK_INTERVAL = 1024
+
+
 class DFSAlgorithm:
-    def __init__(self, graph):
-        self.graph = graph
+    """
+    Depth-first search over simple paths with an explicit stack (no
+    recursion limit) and a bytearray of the cities on the current path.
+
+    order picks which neighbor is tried first:
+        'name'       alphabetical (the classic behavior)
+        'distance'   nearest road first
+        'heuristic'  closest to the goal first (needs a heuristic)
+    'name' and 'distance' orders are precomputed once per graph, the
+    heuristic order once per city per search.
+
+    branch_and_bound=True keeps searching after the first route and prunes
+    every branch that can't beat the best one so far (g + a consistent
+    scaling of h). solutions() streams each improvement, search() returns
+    the best route found within time_budget ms (all of it if None).
+    """
+
+    def __init__(self, graph, order='name', heuristic=None, branch_and_bound=False,
+                 time_budget=None):
+        self.graph = as_compact_graph(graph)
+        if order not in ('name', 'distance', 'heuristic'):
+            raise ValueError(f"Unknown neighbor order: {order}")
+        if order == 'heuristic' and heuristic is None:
+            raise ValueError("order='heuristic' needs a heuristic")
+        self.order = order
+        self.heuristic = as_heuristic(heuristic, self.graph.cities)
+        self.has_heuristic = heuristic is not None
+        self.branch_and_bound = branch_and_bound
+        self.time_budget = time_budget
         self.expanded_nodes = 0
-    
+        # True when the last search explored everything it had to (the
+        # branch-and-bound result is then optimal), False if the budget ran out
+        self.complete = True
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
     def search(self, start, goal):
         """
         Search for a path from start to goal using DFS.
         Returns: (path, cost) tuple
         """
+        best = (None, 0)
+        for path, cost, _ in self.solutions(start, goal):
+            best = (path, cost)
+            if not self.branch_and_bound:
+                break
+        return best
+
+    def solutions(self, start, goal, time_budget=None):
+        """
+        Yield (path, cost, ms since start) for every route found: just the
+        first one in plain mode, each strictly cheaper one with branch and bound
+        """
         self.expanded_nodes = 0
-        path = []
-        
-        result_path, total_cost = self._dfs_recursive(start, goal, path, 0)
-        
-        return result_path, total_cost
-    
-    def _dfs_recursive(self, current, goal, path, cost):
-        """Recursive DFS algorithm"""
-        path.append(current)
+        self.complete = True
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        began = time.perf_counter()
+        deadline = began + time_budget / 1000 if time_budget is not None else None
+
+        source = graph.index[start]
+        target = graph.index[goal]
+        successors = self._successors(target)
+        lower = None
+        if self.branch_and_bound and self.has_heuristic:
+            # h scaled down until consistent, so g + lower[v] never overestimates
+            scale = consistency_scale(graph, unwrap_heuristic(self.heuristic))
+            h = self.heuristic.goal_row(target)
+            lower = [scale * h[v] for v in range(graph.num_nodes)]
+        best = math.inf
+
         self.expanded_nodes += 1
-        
-        if current == goal:
-            return (path.copy(), cost)
-        
-        # Explore neighbors in sorted order
-        neighbors = sorted(self.graph.get(current, {}).keys())
-        
-        for neighbor in neighbors:
-            if neighbor not in path:
-                edge_cost = self.graph[current][neighbor]
-                result, total_cost = self._dfs_recursive(
-                    neighbor, goal, path, cost + edge_cost
-                )
-                if result:
-                    return (result, total_cost)
-        
-        # Backtrack if the path doesn't work
-        path.pop()
-        return (None, 0)
\ No newline at end of file
+        if source == target:
+            yield [start], 0, (time.perf_counter() - began) * 1000
+            return
+
+        stats = self.stats
+        if stats is not None:
+            reached = bytearray(graph.num_nodes)
+            reached[source] = 1
+
+        on_path = bytearray(graph.num_nodes)
+        on_path[source] = 1
+        path = [source]
+        costs = [0]
+        # per city on the path: its neighbor/weight sequences and the next index to try
+        frames = [successors(source)]
+        steps = 0
+
+        while path:
+            steps += 1
+            if deadline is not None and steps % CLOCK_INTERVAL == 0 and time.perf_counter() > deadline:
+                self.complete = False
+                break
+
+            nbrs, wts, i, end = frames[-1]
+            g = costs[-1]
+            while i < end:
+                neighbor = nbrs[i]
+                new_cost = g + wts[i]
+                i += 1
+                if on_path[neighbor]:
+                    continue
+                if self.branch_and_bound:
+                    bound = new_cost + lower[neighbor] if lower is not None else new_cost
+                    if bound >= best:
+                        continue
+                break
+            else:
+                # nothing left to try here - backtrack
+                frames.pop()
+                costs.pop()
+                on_path[path.pop()] = 0
+                continue
+
+            frames[-1] = (nbrs, wts, i, end)
+            self.expanded_nodes += 1
+            if stats is not None:
+                self._visit(stats, reached, neighbor, len(path))
+            if neighbor == target:
+                best = new_cost
+                yield (graph.names(path + [neighbor]), new_cost,
+                       (time.perf_counter() - began) * 1000)
+                if not self.branch_and_bound:
+                    return
+                continue
+
+            path.append(neighbor)
+            costs.append(new_cost)
+            on_path[neighbor] = 1
+            frames.append(successors(neighbor))
+
+    def _visit(self, stats, reached, node, depth):
+        """Instrumented searches: every visit after a city's first is a duplicate"""
+        stats.generated = self.expanded_nodes
+        if reached[node]:
+            stats.duplicates += 1
+        reached[node] = 1
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+            stats.max_frontier = depth + 1
+
+    def _successors(self, target):
+        """Function giving (neighbors, weights, first index, end index) for a city"""
+        graph = self.graph
+        if self.order != 'heuristic':
+            nbrs, wts = graph.ordered_arrays(self.order)
+            offsets = graph.offsets
+            return lambda node: (nbrs, wts, offsets[node], offsets[node + 1])
+
+        h = self.heuristic.goal_row(target)
+        rows = {}
+
+        def successors(node):
+            if node not in rows:
+                edges = sorted(graph.edges(node), key=lambda edge: (h[edge[0]], edge[0]))
+                rows[node] = ([v for v, _ in edges], [w for _, w in edges])
+            nbrs, wts = rows[node]
+            return (nbrs, wts, 0, len(nbrs))
+
+        return successors
@@ -0,0 +1,151 @@
+"""
+generators.py - Synthetic road networks for benchmarking (30 to ~1M cities)
+Every generator places its cities at lat/lon points inside a NY-sized box and
+weights each road by its Haversine length times a detour factor >= 1, so the
+returned HaversineHeuristic is admissible (on the real data it is not
+quite, see heuristics.py).
+
+    graph, heuristic = make_graph('geometric', 10000, seed=1)
+"""
+
+import math
+import random
+from array import array
+
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.heuristics import HaversineHeuristic
+
+# roughly the bounding box of New York State
+LAT_RANGE = (40.5, 45.0)
+LON_RANGE = (-79.8, -71.8)
+
+
+class _RoadBuilder:
+    """Collects two-way roads into flat arrays for CompactGraph.from_arrays"""
+
+    def __init__(self, latitudes, longitudes, rng, detour=(1.05, 1.4)):
+        self.n = len(latitudes)
+        self.cities = [f"City{i}" for i in range(self.n)]
+        self.heuristic = HaversineHeuristic(self.cities, latitudes, longitudes)
+        self.rng = rng
+        self.detour = detour
+        self.src, self.dst, self.weights = array('q'), array('q'), array('d')
+
+    def road(self, u, v):
+        distance = self.heuristic.estimate(u, v) * self.rng.uniform(*self.detour)
+        distance = max(distance, 0.01)
+        self.src.extend((u, v))
+        self.dst.extend((v, u))
+        self.weights.extend((distance, distance))
+
+    def build(self):
+        graph = CompactGraph.from_arrays(self.cities, self.src, self.dst, self.weights)
+        return graph, self.heuristic
+
+
+def _random_points(n, rng):
+    return ([rng.uniform(*LAT_RANGE) for _ in range(n)],
+            [rng.uniform(*LON_RANGE) for _ in range(n)])
+
+
+def grid_graph(n, seed=0):
+    """Square-ish grid, each city joined to its 4 neighbors"""
+    rng = random.Random(seed)
+    cols = max(1, int(math.sqrt(n)))
+    rows = math.ceil(n / cols)
+    lat_step = (LAT_RANGE[1] - LAT_RANGE[0]) / max(rows, 1)
+    lon_step = (LON_RANGE[1] - LON_RANGE[0]) / max(cols, 1)
+    latitudes = [LAT_RANGE[0] + (i // cols) * lat_step for i in range(n)]
+    longitudes = [LON_RANGE[0] + (i % cols) * lon_step for i in range(n)]
+    builder = _RoadBuilder(latitudes, longitudes, rng)
+    for i in range(n):
+        if (i % cols) + 1 < cols and i + 1 < n:
+            builder.road(i, i + 1)
+        if i + cols < n:
+            builder.road(i, i + cols)
+    return builder.build()
+
+
+def geometric_graph(n, seed=0, k=4):
+    """Random points, each joined to its k nearest neighbors (grid-bucketed lookup)"""
+    rng = random.Random(seed)
+    latitudes, longitudes = _random_points(n, rng)
+    builder = _RoadBuilder(latitudes, longitudes, rng)
+    # about 2 cities per bucket, search the 3x3 block around each city
+    buckets_per_side = max(1, int(math.sqrt(n / 2)))
+    lat_size = (LAT_RANGE[1] - LAT_RANGE[0]) / buckets_per_side
+    lon_size = (LON_RANGE[1] - LON_RANGE[0]) / buckets_per_side
+
+    def bucket(i):
+        return (int((latitudes[i] - LAT_RANGE[0]) / lat_size),
+                int((longitudes[i] - LON_RANGE[0]) / lon_size))
+
+    buckets = {}
+    for i in range(n):
+        buckets.setdefault(bucket(i), []).append(i)
+    # nearest[i*k:(i+1)*k] = i's neighbors, used to add mutual pairs only once
+    nearest = array('q', [-1]) * (n * k)
+    for i in range(n):
+        bx, by = bucket(i)
+        radius = 1
+        while True:
+            candidates = [j for dx in range(-radius, radius + 1)
+                          for dy in range(-radius, radius + 1)
+                          for j in buckets.get((bx + dx, by + dy), ()) if j != i]
+            if len(candidates) >= k or radius > buckets_per_side:
+                break
+            radius += 1
+        candidates.sort(key=lambda j: builder.heuristic.estimate(i, j))
+        for slot, j in enumerate(candidates[:k]):
+            nearest[i * k + slot] = j
+            if j < i and i in nearest[j * k:(j + 1) * k]:
+                continue
+            builder.road(i, j)
+    return builder.build()
+
+
+def scale_free_graph(n, seed=0, m=2):
+    """Barabasi-Albert preferential attachment (a few hub cities with many roads)"""
+    rng = random.Random(seed)
+    latitudes, longitudes = _random_points(n, rng)
+    builder = _RoadBuilder(latitudes, longitudes, rng)
+    # every endpoint appears once per road, so sampling it is degree-proportional
+    endpoints = []
+    for i in range(min(n, m + 1)):
+        for j in range(i):
+            builder.road(i, j)
+            endpoints.extend((i, j))
+    for i in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(endpoints))
+        for j in targets:
+            builder.road(i, j)
+            endpoints.extend((i, j))
+    return builder.build()
+
+
+def complete_graph(n, seed=0):
+    """Fully connected, like actualDistance.csv"""
+    rng = random.Random(seed)
+    latitudes, longitudes = _random_points(n, rng)
+    builder = _RoadBuilder(latitudes, longitudes, rng)
+    for i in range(n):
+        for j in range(i):
+            builder.road(i, j)
+    return builder.build()
+
+
+GENERATORS = {
+    'grid': grid_graph,
+    'geometric': geometric_graph,
+    'scalefree': scale_free_graph,
+    'complete': complete_graph,
+}
+
+
+def make_graph(kind, n, seed=0):
+    """Returns: (CompactGraph, HaversineHeuristic) for one of GENERATORS"""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown graph kind: {kind} (choose from {', '.join(GENERATORS)})")
+    return GENERATORS[kind](n, seed)
@@ -1,68 +1,161 @@
 
 import heapq
 
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic
+from Algorithms.instrumentation import tree_depth
+
 class GFSAlgorithm:
     """
     Greedy Best-First Search (GBFS)
     GFS/GBFS uses the heuristic/straight line distance to guide the search towards a specific goal,
     but it tracks actual road distance for the path cost.
+
+    A city's priority is only its heuristic, so it never changes: every city
+    goes on the frontier once as (h, city_id) (the id breaks ties) and the
+    route to it is kept as a parent pointer, switched to a cheaper expanded
+    parent while the city waits. Memory is O(number of cities) instead of
+    one path copy per push.
+
+    goal_directed=True generates successors lazily: an expanded city's
+    neighbors are sorted by heuristic and only its best unvisited one sits
+    on the frontier, the next is added when that one is popped. Same
+    expansion order, but the heap stays the size of the expanded set
+    (useful on dense graphs).
     """
-    
-    def __init__(self, actual_graph, heuristic_graph):
+
+    def __init__(self, actual_graph, heuristic_graph, goal_directed=False):
         """
         mow initalize wiht both of the graphs
         """
-        self.actual_graph = actual_graph
-        self.heuristic_graph = heuristic_graph
+        self.actual_graph = as_compact_graph(actual_graph)
+        # heuristic_graph can be a heuristic provider or the old straight-line
+        # matrix, either way it shares ids with the road graph
+        self.heuristic = as_heuristic(heuristic_graph, self.actual_graph.cities)
+        self.goal_directed = goal_directed
         self.expanded_nodes = 0
-    
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
     def search(self, start, goal):
         """
         this works to return the paht tuple where the path is the list of
-        cities from start to goal and the cost is the actual road distance 
+        cities from start to goal and the cost is the actual road distance
         traveled
         """
+        self.expanded_nodes = 0
         if start == goal:
             return ([start], 0)
-        
-        if start not in self.actual_graph or start not in self.heuristic_graph:
+
+        graph = self.actual_graph
+        if start not in graph.index or goal not in graph.index:
             return (None, 0)
-        
-        self.expanded_nodes = 0
-        
+
+        start_id = graph.index[start]
+        goal_id = graph.index[goal]
+
         # getting the heuristic value for a city (straight-line distance to goal)
-        def h(city):
-            return self.heuristic_graph.get(city, {}).get(goal, float('inf'))
-        
-        # priority queue now: (heuristic_value, current_city, path_so_far, actual_cost_so_far)
-        frontier = [(h(start), start, [start], 0)]
+        goal_row = self.heuristic.goal_row(goal_id)
+
+        # actual road cost and parent of every city reached so far
+        cost_so_far = {start_id: 0}
+        came_from = {}
         visited = set()
-        
+
+        if self.goal_directed:
+            found = self._lazy_search(start_id, goal_id, goal_row, cost_so_far, came_from, visited)
+        else:
+            found = self._search(start_id, goal_id, goal_row, cost_so_far, came_from, visited)
+        if self.stats is not None:
+            self.stats.update(max_depth=tree_depth(came_from))
+
+        if not found:
+            return (None, 0)
+        path = [goal_id]
+        while path[-1] in came_from:
+            path.append(came_from[path[-1]])
+        return (graph.names(path[::-1]), cost_so_far[goal_id])
+
+    def _search(self, start_id, goal_id, goal_row, cost_so_far, came_from, visited):
+        graph = self.actual_graph
+        # priority queue now: (heuristic_value, city_id), one entry per city
+        frontier = [(goal_row[start_id], start_id)]
+        track = self.stats is not None
+        max_frontier = 1
+
         while frontier:
-            _, current, path, actual_cost = heapq.heappop(frontier)
-            
-            # skip if already visited
+            if track and len(frontier) > max_frontier:
+                max_frontier = len(frontier)
+            _, current = heapq.heappop(frontier)
+            visited.add(current)
+            self.expanded_nodes += 1
+
+            # goal check
+            if current == goal_id:
+                break
+
+            actual_cost = cost_so_far[current]
+            for neighbor, actual_edge_cost in graph.edges(current):
+                if neighbor in visited:
+                    continue
+                new_actual_cost = actual_cost + actual_edge_cost
+                if neighbor not in cost_so_far:
+                    # priority is ONLY the heuristic (straight-line distance to goal)
+                    heapq.heappush(frontier, (goal_row[neighbor], neighbor))
+                elif new_actual_cost >= cost_so_far[neighbor]:
+                    continue
+                cost_so_far[neighbor] = new_actual_cost
+                came_from[neighbor] = current
+
+        if track:
+            # every city goes on the frontier once
+            self.stats.update(generated=len(cost_so_far), duplicates=0, max_frontier=max_frontier)
+        return goal_id in visited
+
+    def _lazy_search(self, start_id, goal_id, goal_row, cost_so_far, came_from, visited):
+        graph = self.actual_graph
+        # (heuristic_value, city_id, cost through parent, parent, parent's successors, position)
+        frontier = [(goal_row[start_id], start_id, 0, -1, None, 0)]
+        track = self.stats is not None
+        generated = 1
+        duplicates = 0
+        max_frontier = 1
+
+        def push_next(parent, successors, position):
+            """Push parent's first unvisited successor at or after position"""
+            nonlocal generated
+            while position < len(successors) and successors[position] in visited:
+                position += 1
+            if position < len(successors):
+                neighbor = successors[position]
+                new_actual_cost = cost_so_far[parent] + graph.weight(parent, neighbor)
+                heapq.heappush(frontier, (goal_row[neighbor], neighbor, new_actual_cost,
+                                          parent, successors, position))
+                generated += 1
+
+        while frontier:
+            if track and len(frontier) > max_frontier:
+                max_frontier = len(frontier)
+            _, current, actual_cost, parent, successors, position = heapq.heappop(frontier)
+            # the parent's next best unvisited neighbor takes its place on the frontier
+            if successors is not None:
+                push_next(parent, successors, position + 1)
             if current in visited:
+                duplicates += 1
                 continue
-            
+
             visited.add(current)
             self.expanded_nodes += 1
-            
+            # entries for the same city pop cheapest first, so this is its cheapest expanded parent
+            if parent >= 0:
+                cost_so_far[current] = actual_cost
+                came_from[current] = parent
+
             # goal check
-            if current == goal:
-                return (path, actual_cost)
-            
-            # expand neighbors, prioritized by heuristic value (straight-line distance to goal)
-            for neighbor in self.actual_graph.get(current, {}):
-                if neighbor not in visited:
-                    # get the ACTUAL road distance HERE for cost calculation
-                    actual_edge_cost = self.actual_graph[current][neighbor]
-                    new_path = path + [neighbor]
-                    new_actual_cost = actual_cost + actual_edge_cost
-                    
-                    # priority is ONLY the heuristic (straight-line distance to goal)
-                    h_value = h(neighbor)
-                    heapq.heappush(frontier, (h_value, neighbor, new_path, new_actual_cost))
-        
-        # no path found
-        return (None, 0)
\ No newline at end of file
+            if current == goal_id:
+                break
+
+            push_next(current, sorted(graph.neighbor_ids(current), key=lambda v: (goal_row[v], v)), 0)
+
+        if track:
+            self.stats.update(generated=generated, duplicates=duplicates, max_frontier=max_frontier)
+        return goal_id in visited
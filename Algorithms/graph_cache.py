@@ -0,0 +1,196 @@
+"""
+graph_cache.py - Compiled binary graph cache with memory-mapped reload
+The first load of a CSV writes __graphcache__/<name>.bin next to it:
+
+    header      magic, version, node/edge counts, source mtime/size/hash,
+                loader options (format, directed, ...)
+    city names  utf-8, newline separated
+    offsets     int64[N+1]
+    neighbors   int64[E]
+    weights     float64[E]
+
+Later loads mmap that file read-only and hand memoryview slices of it to
+CompactGraph, so there is no parsing and every process on the host shares
+the same page-cache copy. The cache is rebuilt whenever the source CSV
+changes (mtime + size, with a content hash as the tie breaker) or it is
+loaded with other options. A touched but unchanged CSV gets its new mtime
+written into the header, so the hash is only read once per touch.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.graph_loader import detect_format, load_compact_graph
+
+CACHE_DIR = '__graphcache__'
+MAGIC = b'NYRG'
+VERSION = 2
+# magic, version, nodes, edges, source mtime_ns, source size, names length, source hash,
+# loader options hash
+HEADER = struct.Struct('<4sIqqqqq32s16s')
+# where source mtime_ns sits in the header
+MTIME_OFFSET = struct.calcsize('<4sIqq')
+NO_OPTIONS = bytes(16)
+
+
+def cache_path(filename):
+    """Where the compiled copy of filename lives"""
+    folder, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, CACHE_DIR, name + '.bin')
+
+
+def _source_hash(filename):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def options_key(fmt, **options):
+    """Hash of the loader options a cache was parsed with (fmt already resolved)"""
+    text = repr((fmt, sorted(options.items())))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+def write_cache(graph, filename, path=None, options=NO_OPTIONS):
+    """Write graph as the compiled cache for source file filename (options: options_key())"""
+    path = path or cache_path(filename)
+    stat = os.stat(filename)
+    save_graph(graph, path, stat.st_mtime_ns, stat.st_size, _source_hash(filename), options)
+    graph.cache_path = path
+    return path
+
+
+def save_graph(graph, path, mtime_ns=0, size=0, digest=bytes(32), options=NO_OPTIONS):
+    """
+    Write any CompactGraph in the compiled format (source fields are only
+    needed when the file is a cache of a CSV). open_cache() reads it back.
+    """
+    names = '\n'.join(graph.cities).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, graph.num_nodes, graph.num_edges,
+                         mtime_ns, size, len(names), digest, options)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(names + _padding(len(names)))
+        f.write(array('q', graph.offsets).tobytes())
+        f.write(array('q', graph.neighbors).tobytes())
+        f.write(array('d', graph.weights).tobytes())
+    # atomic swap so other processes never see a half-written cache
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(buffer):
+    if len(buffer) < HEADER.size:
+        return None
+    fields = HEADER.unpack_from(buffer, 0)
+    if fields[0] != MAGIC or fields[1] != VERSION:
+        return None
+    return fields
+
+
+def is_cache_valid(filename, path=None, options=NO_OPTIONS):
+    """
+    True if the cache exists and was compiled from the current source file
+    with the same loader options (see options_key)
+    """
+    path = path or cache_path(filename)
+    try:
+        with open(path, 'rb') as f:
+            fields = _read_header(f.read(HEADER.size))
+        stat = os.stat(filename)
+    except OSError:
+        return False
+    if fields is None:
+        return False
+    _, _, _, _, mtime_ns, size, _, digest, cached_options = fields
+    if size != stat.st_size or cached_options != options:
+        return False
+    if mtime_ns == stat.st_mtime_ns:
+        return True
+    # touched but maybe not edited - compare contents
+    if digest != _source_hash(filename):
+        return False
+    # same contents: remember the new mtime so the next load skips the hash
+    try:
+        with open(path, 'r+b') as f:
+            f.seek(MTIME_OFFSET)
+            f.write(struct.pack('<q', stat.st_mtime_ns))
+    except OSError:
+        pass
+    return True
+
+
+def open_cache(path):
+    """mmap a compiled cache and wrap it in a CompactGraph without copying the arrays"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    fields = _read_header(mapped)
+    if fields is None:
+        mapped.close()
+        raise ValueError(f"Not a graph cache: {path}")
+    _, _, num_nodes, num_edges, _, _, names_length, _, _ = fields
+
+    view = memoryview(mapped)
+    position = HEADER.size
+    names = bytes(view[position:position + names_length]).decode('utf-8')
+    cities = names.split('\n') if num_nodes else []
+    position += names_length + len(_padding(names_length))
+
+    def take(count, typecode):
+        nonlocal position
+        end = position + 8 * count
+        section = view[position:end].cast(typecode)
+        position = end
+        return section
+
+    offsets = take(num_nodes + 1, 'q')
+    neighbors = take(num_edges, 'q')
+    weights = take(num_edges, 'd')
+
+    graph = CompactGraph(cities, offsets, neighbors, weights)
+    graph._mmap = mapped  # keep the mapping alive as long as the graph
+    graph.cache_path = path
+    return graph
+
+
+def load_cached_graph(filename, fmt='auto', **kwargs):
+    """
+    Load filename through the binary cache: mmap it when it is up to date,
+    otherwise parse the CSV and (re)write the cache for the next run.
+    kwargs go to the loader (e.g. directed=True for an edge list)
+    """
+    if sys.byteorder != 'little':
+        return load_compact_graph(filename, fmt, **kwargs)
+
+    if fmt == 'auto':
+        fmt = detect_format(filename)
+    options = options_key(fmt, **kwargs)
+    path = cache_path(filename)
+    if is_cache_valid(filename, path, options):
+        try:
+            return open_cache(path)
+        except (OSError, ValueError):
+            pass
+
+    graph = load_compact_graph(filename, fmt, **kwargs)
+    try:
+        write_cache(graph, filename, path, options)
+    except OSError as e:
+        print(f"Note: could not write graph cache ({e})")
+    return graph
@@ -0,0 +1,178 @@
+"""
+graph_loader.py - Streaming CSV loaders that build a CompactGraph directly
+Two input formats are supported:
+  - distance matrix: first row/column are city names, rest are distances
+    (the format of actualDistance.csv / straightLineDistance.csv)
+  - edge list: one "from,to,distance" row per road (optional header row)
+
+Rows are read one at a time from csv.reader and only the positive edges are
+kept, in flat arrays, so the raw text is never held in memory. When NumPy is
+installed, matrix rows are parsed in blocks of chunk_rows at a time.
+"""
+
+import csv
+from array import array
+
+from Algorithms.compact_graph import CompactGraph
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EDGE_LIST_HEADERS = {'from', 'to', 'distance', 'source', 'target', 'weight', 'miles'}
+
+
+def _parse_cell(cell):
+    """Parse one distance cell, invalid/empty cells count as 'no edge'"""
+    try:
+        return float(cell)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _parse_row(cells):
+    """Parse a whole row of cells at once, falling back cell by cell on bad input"""
+    try:
+        return array('d', map(float, cells))
+    except ValueError:
+        return array('d', map(_parse_cell, cells))
+
+
+def detect_format(filename):
+    """Return 'edges' for a from,to,distance file and 'matrix' otherwise"""
+    with open(filename, newline='', encoding='utf-8') as csvfile:
+        first = next(csv.reader(csvfile), None)
+    if not first:
+        raise ValueError("CSV file is empty")
+    if len(first) != 3:
+        return 'matrix'
+    if {cell.strip().lower() for cell in first} <= EDGE_LIST_HEADERS:
+        return 'edges'
+    # a headerless edge list has a number in its third column, while
+    # a 2-city matrix header has a city name there
+    try:
+        float(first[2])
+        return 'edges'
+    except ValueError:
+        return 'matrix'
+
+
+def load_distance_matrix(filename, chunk_rows=1024):
+    """
+    Stream a city x city distance matrix into a CompactGraph.
+    Self-loops and non-positive or invalid distances are skipped.
+    """
+    src = array('q')
+    dst = array('q')
+    weights = array('d')
+
+    with open(filename, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("CSV file is empty")
+
+        # Header may or may not have a blank corner cell - keep every name
+        cities = [city.strip() for city in header if city.strip()]
+        index = {city: i for i, city in enumerate(cities)}
+        width = len(cities)
+
+        def add_row(u, values):
+            for j, distance in enumerate(values):
+                if distance > 0 and j != u:
+                    src.append(u)
+                    dst.append(j)
+                    weights.append(distance)
+
+        def flush(chunk):
+            if NUMPY_AVAILABLE:
+                try:
+                    block = np.array([cells for _, cells in chunk], dtype=float)
+                except ValueError:
+                    block = None  # ragged or invalid cells, parse row by row
+                if block is not None and block.ndim == 2:
+                    ids = np.array([u for u, _ in chunk])
+                    mask = block > 0
+                    in_header = ids < block.shape[1]
+                    mask[np.nonzero(in_header)[0], ids[in_header]] = False
+                    rows, cols = np.nonzero(mask)
+                    src.extend(ids[rows].tolist())
+                    dst.extend(cols.tolist())
+                    weights.extend(block[rows, cols].tolist())
+                    return
+            for u, cells in chunk:
+                add_row(u, _parse_row(cells))
+
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            city_from = row[0].strip()
+            if not city_from:
+                continue
+            if city_from not in index:
+                # row label missing from the header - give it an id anyway
+                index[city_from] = len(cities)
+                cities.append(city_from)
+            chunk.append((index[city_from], row[1:width + 1]))
+            if len(chunk) >= chunk_rows:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+    return CompactGraph.from_arrays(cities, src, dst, weights)
+
+
+def load_edge_list(filename, directed=False):
+    """
+    Stream a sparse from,to,distance file into a CompactGraph.
+    Roads are two-way unless directed=True.
+    """
+    cities = []
+    index = {}
+    src = array('q')
+    dst = array('q')
+    weights = array('d')
+
+    def node_id(city):
+        node = index.get(city)
+        if node is None:
+            node = index[city] = len(cities)
+            cities.append(city)
+        return node
+
+    with open(filename, newline='', encoding='utf-8') as csvfile:
+        for row in csv.reader(csvfile):
+            if len(row) < 3:
+                continue
+            city_from, city_to = row[0].strip(), row[1].strip()
+            distance = _parse_cell(row[2])
+            if distance <= 0 or city_from == city_to:
+                # also skips the header row, its distance cell is not a number
+                continue
+            u, v = node_id(city_from), node_id(city_to)
+            src.append(u)
+            dst.append(v)
+            weights.append(distance)
+            if not directed:
+                src.append(v)
+                dst.append(u)
+                weights.append(distance)
+
+    if not cities:
+        raise ValueError("CSV file has no edges")
+    return CompactGraph.from_arrays(cities, src, dst, weights)
+
+
+def load_compact_graph(filename, fmt='auto', **kwargs):
+    """Load a matrix or edge-list CSV (fmt='matrix'/'edges'/'auto') as a CompactGraph"""
+    if fmt == 'auto':
+        fmt = detect_format(filename)
+    if fmt == 'matrix':
+        return load_distance_matrix(filename, **kwargs)
+    if fmt == 'edges':
+        return load_edge_list(filename, **kwargs)
+    raise ValueError(f"Unknown graph format: {fmt}")
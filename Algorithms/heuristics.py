@@ -0,0 +1,249 @@
+"""
+heuristics.py - Straight-line heuristic providers for the informed searches
+(A*, GFS, IDA*). A provider answers "estimated miles from node to goal"
+using node ids of the road graph:
+
+    provider.goal_row(goal)        -> h for every node, indexable by id
+    provider.estimate(node, goal)  -> h for a single node
+
+HaversineHeuristic keeps only lat/lon per city (O(N) memory) and computes a
+goal's row on demand, in one vectorized batch, with a small LRU cache of
+recent goals. MatrixHeuristic wraps the old N x N straight-line matrix.
+"""
+
+import csv
+import math
+from array import array
+from collections import OrderedDict
+
+from Algorithms.compact_graph import as_compact_graph
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+class GoalRowCache:
+    """Bounded LRU cache of per-goal heuristic rows"""
+
+    def __init__(self, max_goals):
+        self.max_goals = max_goals
+        self._rows = OrderedDict()
+
+    def get(self, goal, build):
+        row = self._rows.get(goal)
+        if row is not None:
+            self._rows.move_to_end(goal)
+            return row
+        row = build(goal)
+        if self.max_goals > 0:
+            self._rows[goal] = row
+            if len(self._rows) > self.max_goals:
+                self._rows.popitem(last=False)
+        return row
+
+    def clear(self):
+        self._rows.clear()
+
+
+class HaversineHeuristic:
+    """
+    Great-circle distance between city coordinates. Not admissible on the
+    bundled NY data: some road distances in actualDistance.csv are shorter
+    than the straight line (74 city pairs, e.g. Saratoga Springs -> Buffalo
+    is 200 road miles but 257.8 in a straight line), the same as with
+    straightLineDistance.csv
+    """
+
+    def __init__(self, cities, latitudes, longitudes, max_goals=64,
+                 radius=EARTH_RADIUS_MILES):
+        self.cities = list(cities)
+        self.index = {city: i for i, city in enumerate(self.cities)}
+        # stored in radians, cos(lat) is reused by every distance
+        self.lat = array('d', map(math.radians, latitudes))
+        self.lon = array('d', map(math.radians, longitudes))
+        self.cos_lat = array('d', map(math.cos, self.lat))
+        self.radius = radius
+        self.max_goals = max_goals
+        self._cache = GoalRowCache(max_goals)
+
+    @classmethod
+    def from_csv(cls, filename, cities=None, max_goals=64):
+        """
+        Load City,Latitude,Longitude rows. If cities (the road graph's city
+        order) is given, ids follow it so rows can be indexed by road-graph id.
+        """
+        coords = {}
+        with open(filename, newline='', encoding='utf-8') as csvfile:
+            for row in csv.reader(csvfile):
+                if len(row) < 3:
+                    continue
+                try:
+                    coords[row[0].strip()] = (float(row[1]), float(row[2]))
+                except ValueError:
+                    continue  # header row
+        names = list(cities) if cities is not None else list(coords)
+        missing = [city for city in names if city not in coords]
+        if missing:
+            raise ValueError(f"No coordinates for: {', '.join(missing)}")
+        return cls(names,
+                   [coords[city][0] for city in names],
+                   [coords[city][1] for city in names],
+                   max_goals)
+
+    def aligned(self, cities):
+        """Return a provider whose ids follow the given city order"""
+        cities = list(cities)
+        if cities == self.cities:
+            return self
+        ids = [self.index[city] for city in cities]
+        return HaversineHeuristic(cities,
+                                  [math.degrees(self.lat[i]) for i in ids],
+                                  [math.degrees(self.lon[i]) for i in ids],
+                                  self.max_goals, self.radius)
+
+    def estimate(self, node, goal):
+        """Distance for one pair, computed lazily without building a row"""
+        if node == goal:
+            return 0.0
+        dlat = self.lat[goal] - self.lat[node]
+        dlon = self.lon[goal] - self.lon[node]
+        a = (math.sin(dlat / 2) ** 2
+             + self.cos_lat[node] * self.cos_lat[goal] * math.sin(dlon / 2) ** 2)
+        return 2 * self.radius * math.asin(min(1.0, math.sqrt(a)))
+
+    def goal_row(self, goal):
+        """Distances from every node to goal, computed in one batch and cached"""
+        return self._cache.get(goal, self._build_row)
+
+    def _build_row(self, goal):
+        goal_lat, goal_lon, goal_cos = self.lat[goal], self.lon[goal], self.cos_lat[goal]
+        if NUMPY_AVAILABLE:
+            lat = np.frombuffer(self.lat, dtype=float)
+            lon = np.frombuffer(self.lon, dtype=float)
+            cos_lat = np.frombuffer(self.cos_lat, dtype=float)
+            a = (np.sin((goal_lat - lat) / 2) ** 2
+                 + cos_lat * goal_cos * np.sin((goal_lon - lon) / 2) ** 2)
+            row = 2 * self.radius * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            row[goal] = 0.0
+            return array('d', row.tobytes())
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        scale = 2 * self.radius
+        row = array('d', (
+            scale * asin(min(1.0, sqrt(sin((goal_lat - lat) / 2) ** 2
+                                       + cos * goal_cos * sin((goal_lon - lon) / 2) ** 2)))
+            for lat, lon, cos in zip(self.lat, self.lon, self.cos_lat)
+        ))
+        row[goal] = 0.0
+        return row
+
+
+class MatrixHeuristic:
+    """Adapter for the precomputed straight-line matrix (straightLineDistance.csv)"""
+
+    def __init__(self, graph, cities=None, max_goals=64):
+        self.graph = as_compact_graph(graph, cities)
+        self.cities = self.graph.cities
+        self.max_goals = max_goals
+        self._cache = GoalRowCache(max_goals)
+
+    def aligned(self, cities):
+        if list(cities) == self.cities[:len(cities)]:
+            return self
+        return MatrixHeuristic(self.graph, cities, self.max_goals)
+
+    def estimate(self, node, goal):
+        if node == goal:
+            return 0.0
+        return self.graph.weight(node, goal, 0.0)
+
+    def goal_row(self, goal):
+        return self._cache.get(goal, self._build_row)
+
+    def _build_row(self, goal):
+        row = array('d', [0.0]) * self.graph.num_nodes
+        for node in range(self.graph.num_nodes):
+            if node != goal:
+                row[node] = self.graph.weight(node, goal, 0.0)
+        return row
+
+
+class ZeroHeuristic:
+    """h = 0 everywhere (turns A* into UCS) - used when no estimate is given"""
+
+    def aligned(self, cities):
+        return self
+
+    def estimate(self, node, goal):
+        return 0.0
+
+    def goal_row(self, goal):
+        return _Zeros()
+
+
+class _Zeros:
+    def __getitem__(self, node):
+        return 0.0
+
+
+class MaxHeuristic:
+    """Pointwise max of several providers (admissible if every one of them is)"""
+
+    def __init__(self, *providers, max_goals=64):
+        self.providers = providers
+        self.max_goals = max_goals
+        self._cache = GoalRowCache(max_goals)
+
+    def aligned(self, cities):
+        aligned = tuple(provider.aligned(cities) for provider in self.providers)
+        if all(a is p for a, p in zip(aligned, self.providers)):
+            return self
+        return MaxHeuristic(*aligned, max_goals=self.max_goals)
+
+    def estimate(self, node, goal):
+        return max(provider.estimate(node, goal) for provider in self.providers)
+
+    def goal_row(self, goal):
+        return self._cache.get(goal, self._build_row)
+
+    def _build_row(self, goal):
+        rows = [provider.goal_row(goal) for provider in self.providers]
+        if len(rows) == 1:
+            return rows[0]
+        return array('d', map(max, *rows))
+
+
+def consistency_scale(graph, heuristic):
+    """
+    Largest factor (<= 1) that makes heuristic consistent on graph, i.e.
+    scale * h(u, v) <= road distance for every edge. Our road data has a few
+    roads shorter than the straight line, which the bidirectional searches'
+    potentials can't tolerate. One pass over the edges, cached per graph.
+    """
+    cached = graph.derived.get(('consistency_scale', id(heuristic)))
+    if cached is not None and cached[0] is heuristic:
+        return cached[1]
+    scale = 1.0
+    for u in range(graph.num_nodes):
+        for v, distance in graph.edges(u):
+            estimate = heuristic.estimate(u, v)
+            if estimate > distance:
+                scale = min(scale, distance / estimate)
+    graph.derived[('consistency_scale', id(heuristic))] = (heuristic, scale)
+    return scale
+
+
+def as_heuristic(estimate, cities):
+    """
+    Turn whatever was passed as the heuristic into a provider aligned with
+    the road graph's ids: a provider, a straight-line graph/dict, or None
+    """
+    if estimate is None:
+        return ZeroHeuristic()
+    if hasattr(estimate, 'goal_row'):
+        return estimate.aligned(cities)
+    return MatrixHeuristic(estimate, cities)
@@ -1,57 +1,163 @@
 import math
-import csv
+import time
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic
 
 class IDAAlgorithm:
-    def __init__(self, actualGraph, estimateGraph=None):
-        self.graph = actualGraph
-        self.heuristicValues = estimateGraph
+    """
+    IDA* with an explicit stack (no recursion limit on deep paths).
+    - cities on the current path are flagged in a bytearray, O(1) cycle check
+    - successors are generated once per visit, sorted by f = g + h, and only
+      the ones within the bound are kept (the smallest f above it becomes a
+      candidate for the next bound)
+    - a transposition table remembers the best g each city was reached with
+      in this iteration, reaching it again with g >= that is pruned. It holds
+      at most table_size cities, later ones are simply not recorded
+    self.iterations has one entry per threshold: bound, expanded, pruned, ms
+    """
+
+    def __init__(self, actualGraph, estimateGraph=None, table_size=1 << 16):
+        self.graph = as_compact_graph(actualGraph)
+        # heuristic provider or straight-line matrix, sharing our node ids
+        # (no estimate at all means h = 0)
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+        self.table_size = table_size
+        self._h = None
         self.expanded_nodes = 0
-    
+        self.iterations = []
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+        self._deepest = 0
+
     def search(self, start, goal):
         """
         Search for a path from start to goal using IDA*.
         Returns: (path, cost) tuple
         """
         self.expanded_nodes = 0
+        self.iterations = []
+        if start not in self.graph.index or goal not in self.graph.index:
+            return None, 0
+        start = self.graph.index[start]
+        goal = self.graph.index[goal]
+        self._h = self.heuristic.goal_row(goal)
         bound = self._heuristic(start, goal)
-        path = [start]
-        
+        on_path = bytearray(self.graph.num_nodes)
+        self._deepest = 0
+
         while True:
-            t, found_cost, found_path = self._ida_search(path, 0, bound, goal)
-            if t == "FOUND":
-                return found_path, found_cost
-            if t == math.inf:
+            begin = time.perf_counter()
+            expanded_before = self.expanded_nodes
+            found_path, found_cost, next_bound, pruned = self._iteration(start, goal, bound, on_path)
+            self.iterations.append({
+                'bound': bound,
+                'expanded': self.expanded_nodes - expanded_before,
+                'pruned': pruned,
+                'ms': (time.perf_counter() - begin) * 1000,
+            })
+            if found_path is not None:
+                if self.stats is not None:
+                    self._report()
+                return self.graph.names(found_path), found_cost
+            if next_bound == math.inf:
+                if self.stats is not None:
+                    self._report()
                 return None, 0
-            bound = t
-    
+            bound = next_bound
+
+    def _report(self):
+        pruned = sum(iteration['pruned'] for iteration in self.iterations)
+        repeated = self.expanded_nodes - self.iterations[-1]['expanded']
+        # every successor within the bound is either visited or pruned by the table;
+        # duplicates are the table hits plus the visits repeated from earlier thresholds
+        self.stats.update(generated=self.expanded_nodes + pruned, duplicates=pruned + repeated,
+                          max_frontier=self._deepest + 1, max_depth=self._deepest)
+
     def _heuristic(self, current_city, goal_city):
         """Heuristic function - estimate from current to goal"""
-        if goal_city == current_city:
-            return 0
-        return self.heuristicValues[goal_city][current_city]
-    
-    def _ida_search(self, path, g, bound, goalCity):
-        current_city = path[-1]
+        return self._h[current_city]
+
+    def _successors(self, node, g, bound, on_path):
+        """
+        Neighbors off the current path with f <= bound, sorted by (f, id).
+        Returns: (list of (f, neighbor, g), smallest f above the bound)
+        """
+        h = self._h
+        within = []
+        over = math.inf
+        for neighbor, cost in self.graph.edges(node):
+            if on_path[neighbor]:
+                continue
+            new_g = g + cost
+            f = new_g + h[neighbor]
+            if f <= bound:
+                within.append((f, neighbor, new_g))
+            elif f < over:
+                over = f
+        within.sort()
+        return within, over
+
+    def _iteration(self, start, goal, bound, on_path):
+        """
+        One depth-first pass with threshold bound.
+        Returns: (path ids or None, cost, next bound, transposition prunes)
+        """
+        if start == goal:
+            self.expanded_nodes += 1
+            return [start], 0, bound, 0
+
+        best_g = {start: 0}
+        pruned = 0
+        track = self.stats is not None
+        # one frame per city on the path: its sorted successors and the next one to try
+        path = [start]
+        successor_stack = []
+        position = []
+        on_path[start] = 1
         self.expanded_nodes += 1
-        
-        f = g + self._heuristic(current_city, goalCity)
-        if f > bound:
-            return f, None, None
-        if current_city == goalCity:
-            return "FOUND", g, list(path)
-
-        min_excess = math.inf
-        
-        for neighbor, cost in self.graph.get(current_city, {}).items():
-            if neighbor in path:  
+        successors, next_bound = self._successors(start, 0, bound, on_path)
+        successor_stack.append(successors)
+        position.append(0)
+
+        while path:
+            successors = successor_stack[-1]
+            i = position[-1]
+            while i < len(successors):
+                _, neighbor, g = successors[i]
+                i += 1
+                # the path is back to this frame's, so only the table needs checking
+                seen = best_g.get(neighbor)
+                if seen is not None and g >= seen:
+                    pruned += 1
+                    continue
+                if seen is not None or len(best_g) < self.table_size:
+                    best_g[neighbor] = g
+                break
+            else:
+                # every successor tried - backtrack
+                position.pop()
+                successor_stack.pop()
+                on_path[path.pop()] = 0
                 continue
+
+            position[-1] = i
+            self.expanded_nodes += 1
+            if neighbor == goal:
+                found = path + [neighbor]
+                if track:
+                    self._deepest = max(self._deepest, len(path))
+                for node in path:
+                    on_path[node] = 0
+                return found, g, next_bound, pruned
+
             path.append(neighbor)
-            t, found_cost, found_path = self._ida_search(path, g + cost, bound, goalCity)
-            path.pop()
-            
-            if t == "FOUND":
-                return "FOUND", found_cost, found_path
-            if isinstance(t, (int, float)) and t < min_excess:
-                min_excess = t
-        
-        return min_excess, None, None
\ No newline at end of file
+            if track and len(path) > self._deepest + 1:
+                self._deepest = len(path) - 1
+            on_path[neighbor] = 1
+            successors, over = self._successors(neighbor, g, bound, on_path)
+            if over < next_bound:
+                next_bound = over
+            successor_stack.append(successors)
+            position.append(0)
+
+        return None, 0, next_bound, pruned
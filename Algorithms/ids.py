@@ -4,109 +4,144 @@ Works with fully connected graph (all cities have direct connections)
 IDS finds paths with fewest hops, not shortest distance
 """
 
-import csv
 import time
 
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.graph_cache import load_cached_graph
+from Algorithms.graph_loader import load_compact_graph
+
 class IDSAlgorithm:
-    """IDS Implementation"""
+    """
+    IDS Implementation
+    Each depth-limited pass walks an explicit stack: one shared path list,
+    a bytearray marking the cities on it and, per level, a position into the
+    graph's precomputed alphabetical neighbor arrays. No recursion and no
+    per-call copies, so the depth is limited by max_depth only.
+    self.depth_stats has one entry per depth limit tried:
+        depth, generated (cities visited), expanded (visits whose neighbors
+        were looped over), cutoffs (visits stopped by the limit), ms
+    """
     
     def __init__(self, graph):
-        self.graph = graph
+        self.graph = as_compact_graph(graph)
         self.expanded_nodes = 0
+        self.depth_stats = []
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
     
-    def dls(self, current, goal, depth_limit, path, cost):
-        """Depth-limited search helper function"""
-        self.expanded_nodes += 1
+    def dls(self, start, goal, depth_limit, on_path):
+        """
+        Depth-limited search from start, every city on a path is visited at
+        most once (on_path must be all zeros and is left that way).
+        Returns: (path ids or None, cost, stats dict)
+        """
+        graph = self.graph
+        # neighbors in alphabetical order (precomputed once per graph)
+        nbrs, wts = graph.ordered_arrays('name')
+        offsets = graph.offsets
+        stats = {'depth': depth_limit, 'generated': 0, 'expanded': 0, 'cutoffs': 0}
         
-        if current == goal:
-            return (path + [current], cost)
-        
-        if depth_limit == 0:
-            return (None, 0)
-        
-        neighbors = sorted(self.graph.get(current, {}).keys())
-        
-        for neighbor in neighbors:
-            if neighbor not in path:  # Avoid cycles
-                edge_cost = self.graph[current][neighbor]
-                result, total_cost = self.dls(
-                    neighbor, goal, depth_limit - 1,
-                    path + [current], cost + edge_cost
-                )
-                if result:
-                    return (result, total_cost)
-        
-        return (None, 0)
+        path = []
+        costs = []
+        # position[i] = next index into nbrs to try for path[i]
+        position = []
+        current, cost = start, 0
+        while True:
+            # visit current
+            stats['generated'] += 1
+            if current == goal:
+                path.append(current)
+                for node in path:
+                    on_path[node] = 0
+                return path, cost, stats
+            if len(path) == depth_limit:
+                stats['cutoffs'] += 1
+            else:
+                stats['expanded'] += 1
+                path.append(current)
+                costs.append(cost)
+                position.append(offsets[current])
+                on_path[current] = 1
+            
+            # find the next city to visit, backtracking when a level runs out
+            current = None
+            while path:
+                node = path[-1]
+                i, end = position[-1], offsets[node + 1]
+                while i < end and on_path[nbrs[i]]:
+                    i += 1
+                if i < end:
+                    position[-1] = i + 1
+                    current = nbrs[i]
+                    cost = costs[-1] + wts[i]
+                    break
+                on_path[path.pop()] = 0
+                costs.pop()
+                position.pop()
+            if current is None:
+                return None, 0, stats
     
-    def search(self, start, goal, max_depth=50):
-        """Run IDS algorithm - finds path with fewest stops"""
+    def search(self, start, goal, max_depth=None):
+        """
+        Run IDS algorithm - finds path with fewest stops
+        max_depth defaults to the number of cities (the longest simple path)
+        """
         self.expanded_nodes = 0
+        self.depth_stats = []
+        
+        if start not in self.graph.index or goal not in self.graph.index:
+            return (None, 0)
+        start = self.graph.index[start]
+        goal = self.graph.index[goal]
+        if max_depth is None:
+            max_depth = self.graph.num_nodes
         
+        on_path = bytearray(self.graph.num_nodes)
         for depth in range(max_depth):
-            result, total_cost = self.dls(start, goal, depth, [], 0)
+            begin = time.perf_counter()
+            result, total_cost, stats = self.dls(start, goal, depth, on_path)
+            stats['ms'] = (time.perf_counter() - begin) * 1000
+            self.depth_stats.append(stats)
+            self.expanded_nodes += stats['generated']
             if result:
-                return (result, total_cost)
+                if self.stats is not None:
+                    self._report(result)
+                return (self.graph.names(result), total_cost)
+            if not stats['cutoffs']:
+                # nothing was cut off, deeper limits cannot find more
+                break
         
+        if self.stats is not None:
+            self._report(None)
         return (None, 0)
+    
+    def _report(self, result):
+        # a pass with cutoffs reached exactly its limit, one without stayed below it
+        deepest = max([s['depth'] for s in self.depth_stats if s['cutoffs']] +
+                      [len(result) - 1 if result else 0])
+        last = self.depth_stats[-1]['generated'] if self.depth_stats else 0
+        # duplicates: visits repeated from the shallower passes
+        self.stats.update(generated=self.expanded_nodes, duplicates=self.expanded_nodes - last,
+                          max_frontier=deepest + 1, max_depth=deepest)
 
 
-def load_graph(filename='data.csv'):
+def load_graph(filename='data.csv', fmt='auto', use_cache=True):
     """
     Load graph from CSV file - FULLY CONNECTED format
     Expects format: first row/column are city names, rest are distances
+    (a sparse from,to,distance edge list also works, see graph_loader.py)
+    Rows are streamed straight into a CompactGraph, which still supports
+    graph[city_from][city_to] lookups like the old dict. With use_cache the
+    compiled copy in __graphcache__/ is mmap'd instead of re-parsing the CSV
     """
-    cities = []
-    graph = {}
-    
     try:
-        with open(filename, newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            lines = list(reader)
-            
-            if not lines:
-                raise ValueError("CSV file is empty")
-            
-            # First row is header with city names
-            header = lines[0]
-            # Get ALL city names from header (don't skip first column)
-            cities = [city.strip() for city in header if city.strip()]
-            
-            # Build adjacency dictionary from remaining rows
-            for row in lines[1:]:
-                if not row or len(row) == 0:
-                    continue
-                
-                city_from = row[0].strip()
-                if not city_from:
-                    continue
-                
-                distances = row[1:]  # Skip first column (city name)
-                graph[city_from] = {}
-                
-                # Map distances to cities
-                # The distances align with ALL cities in the header (including the first one)
-                for i, distance_str in enumerate(distances):
-                    if i >= len(cities):
-                        break
-                    
-                    city_to = cities[i]
-                    
-                    # Skip self-loops (city to itself)
-                    if city_from == city_to:
-                        continue
-                    
-                    try:
-                        distance = float(distance_str.strip())
-                        # Add edge for any positive distance
-                        if distance > 0:
-                            graph[city_from][city_to] = distance
-                    except (ValueError, AttributeError):
-                        # Skip empty or invalid values
-                        continue
+        if use_cache:
+            graph = load_cached_graph(filename, fmt)
+        else:
+            graph = load_compact_graph(filename, fmt)
+        cities = graph.cities
         
         print(f"Graph loaded: {len(cities)} cities")
-        total_connections = sum(len(neighbors) for neighbors in graph.values())
-        print(f"Total connections: {total_connections}")
+        print(f"Total connections: {graph.num_edges}")
         
         return graph, cities
         
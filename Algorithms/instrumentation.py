@@ -0,0 +1,271 @@
+"""
+instrumentation.py - Per-query search statistics, profiling hooks and traces
+Every *Algorithm has a `stats` attribute that is None by default. A search
+only fills it in when it is set: most numbers are read off the search's own
+structures once at the end, and the few that need tracking inside the loop
+sit behind one `track` flag, so an uninstrumented search does no extra work.
+
+    instrumentation = Instrumentation(profile='cprofile', trace_path='traces.jsonl')
+    path, cost, record = instrumentation.run(algo, 'Rochester', 'Buffalo', 'A_STAR')
+
+record holds:
+    generated        cities put on the frontier (or visited, for the DFS family)
+    expanded         cities whose neighbors were looked at (expanded_nodes)
+    duplicates       frontier entries for a city that was already there / done
+                     (counted among generated; paths dropped before they
+                     became an entry are not duplicates)
+    max_frontier     largest frontier (stack depth for the DFS family)
+    max_depth        most edges from the start in the search tree
+    heuristic_calls  h values read
+    phases           {name: {'wall_ms', 'cpu_ms'}}, e.g. heuristic, search
+    profile          top functions, with profile='cprofile' or 'sample'
+
+Set ROUTE_TRACE=<file.jsonl> and/or ROUTE_PROFILE=cprofile|sample to switch
+it on for main.py, batch and server queries without editing code.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_TOP = 15
+
+
+class SearchStats:
+    """Counters for one search, filled in by the algorithm"""
+
+    FIELDS = ('generated', 'expanded', 'duplicates', 'max_frontier', 'max_depth',
+              'heuristic_calls')
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.phases = {}
+
+    def update(self, **counters):
+        for field, value in counters.items():
+            setattr(self, field, value)
+
+    def add_phase(self, name, wall, cpu):
+        """Add wall/CPU seconds to a phase"""
+        phase = self.phases.setdefault(name, {'wall_ms': 0.0, 'cpu_ms': 0.0})
+        phase['wall_ms'] += wall * 1000
+        phase['cpu_ms'] += cpu * 1000
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def as_dict(self):
+        result = {field: getattr(self, field) for field in self.FIELDS}
+        result['phases'] = self.phases
+        return result
+
+
+def tree_depth(parent, nodes=None):
+    """Deepest node of a search tree given as a {node: parent} dict"""
+    depth = {}
+    deepest = 0
+    for node in (parent if nodes is None else nodes):
+        chain = []
+        while node in parent and node not in depth and parent[node] is not None:
+            chain.append(node)
+            node = parent[node]
+        base = depth.get(node, 0)
+        for offset, step in enumerate(reversed(chain), 1):
+            depth[step] = base + offset
+        if chain:
+            deepest = max(deepest, base + len(chain))
+    return deepest
+
+
+class _CountingRow:
+    """A goal row that counts every value read from it"""
+
+    def __init__(self, row, stats):
+        self.row = row
+        self.stats = stats
+
+    def __getitem__(self, node):
+        self.stats.heuristic_calls += 1
+        return self.row[node]
+
+    def __len__(self):
+        return len(self.row)
+
+    def __iter__(self):
+        self.stats.heuristic_calls += len(self.row)
+        return iter(self.row)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        self.stats.heuristic_calls += len(self.row)
+        return np.asarray(self.row, dtype=dtype)
+
+
+class CountingHeuristic:
+    """Wraps a heuristic provider: counts lookups, times goal-row building"""
+
+    def __init__(self, provider, stats):
+        self.provider = provider
+        self.stats = stats
+
+    def aligned(self, cities):
+        return self
+
+    def goal_row(self, goal):
+        with self.stats.phase('heuristic'):
+            row = self.provider.goal_row(goal)
+        return _CountingRow(row, self.stats)
+
+    def estimate(self, node, goal):
+        self.stats.heuristic_calls += 1
+        return self.provider.estimate(node, goal)
+
+
+def unwrap_heuristic(heuristic):
+    """The provider behind a CountingHeuristic (anything else is returned as is)"""
+    return getattr(heuristic, 'provider', heuristic)
+
+
+class _Sampler:
+    """Samples the calling thread's stack every interval seconds"""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            key = f"{os.path.basename(code.co_filename)}:{frame.f_lineno}({code.co_name})"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        top = sorted(self.counts.items(), key=lambda item: -item[1])[:PROFILE_TOP]
+        return [{'location': key, 'samples': count,
+                 'fraction': count / self.samples if self.samples else 0.0}
+                for key, count in top]
+
+
+def _profile_rows(profiler):
+    """Top functions of a cProfile run by cumulative time"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({function})",
+                     'calls': calls, 'tottime_ms': total * 1000, 'cumtime_ms': cumulative * 1000})
+    rows.sort(key=lambda row: -row['cumtime_ms'])
+    return rows[:PROFILE_TOP]
+
+
+class Instrumentation:
+    """
+    Runs searches with stats attached.
+    profile: None, 'cprofile' or 'sample' (stack sampling every sample_interval s)
+    trace_path: append one JSON line per query to this file
+    """
+
+    def __init__(self, profile=None, trace_path=None, sample_interval=0.001):
+        if profile not in (None, 'cprofile', 'sample'):
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.profile = profile
+        self.trace_path = trace_path
+        self.sample_interval = sample_interval
+
+    @classmethod
+    def from_env(cls):
+        """Instrumentation configured by ROUTE_TRACE / ROUTE_PROFILE, or None if neither is set"""
+        trace_path = os.environ.get('ROUTE_TRACE') or None
+        profile = os.environ.get('ROUTE_PROFILE') or None
+        if trace_path is None and profile is None:
+            return None
+        return cls(profile, trace_path)
+
+    def run(self, algo, start, goal, name=None, setup=None):
+        """
+        algo.search(start, goal) with stats attached.
+        setup: optional (wall, cpu) seconds already spent building algo
+        Returns: (path, cost, record dict)
+        """
+        stats = SearchStats()
+        if setup is not None:
+            stats.add_phase('setup', *setup)
+        heuristic = getattr(algo, 'heuristic', None)
+        algo.stats = stats
+        if heuristic is not None:
+            algo.heuristic = CountingHeuristic(heuristic, stats)
+
+        profiler = None
+        profile_rows = None
+        if self.profile == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif self.profile == 'sample':
+            profiler = _Sampler(self.sample_interval)
+            profiler.start()
+        try:
+            with stats.phase('total'):
+                path, cost = algo.search(start, goal)
+        finally:
+            # stop the profiler even when the search raised (a sampler is a thread)
+            if self.profile == 'cprofile':
+                profiler.disable()
+            elif self.profile == 'sample':
+                profile_rows = profiler.stop()
+            algo.stats = None
+            if heuristic is not None:
+                algo.heuristic = heuristic
+
+        stats.expanded = algo.expanded_nodes
+        if 'heuristic' in stats.phases:
+            total, spent = stats.phases['total'], stats.phases['heuristic']
+            stats.add_phase('search', (total['wall_ms'] - spent['wall_ms']) / 1000,
+                            (total['cpu_ms'] - spent['cpu_ms']) / 1000)
+        else:
+            stats.phases['search'] = dict(stats.phases['total'])
+
+        record = {
+            'algorithm': name or type(algo).__name__,
+            'start': start,
+            'goal': goal,
+            'found': path is not None,
+            'cost': cost,
+            'stops': len(path) - 1 if path else 0,
+            **stats.as_dict(),
+        }
+        if self.profile == 'cprofile':
+            record['profile'] = _profile_rows(profiler)
+        elif self.profile == 'sample':
+            record['profile'] = profile_rows
+        if self.trace_path:
+            self.export(record)
+        return path, cost, record
+
+    def export(self, record):
+        """Append one query record to the JSON-lines trace file"""
+        line = json.dumps(dict(record, time=time.time(), pid=os.getpid()))
+        with open(self.trace_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
@@ -0,0 +1,122 @@
+"""
+landmarks.py - ALT (A*, Landmarks, Triangle inequality) heuristic
+Preprocessing picks K landmark cities by farthest-point selection and stores
+the road distance from and to every landmark for every city. For any city v
+and goal t the triangle inequality gives a lower bound on d(v, t):
+
+    h(v, t) = max over landmarks L of  d(L, t) - d(L, v)  and  d(v, L) - d(t, L)
+
+Unlike the straight-line distance this is always admissible and consistent
+for road miles, and usually much tighter. LandmarkHeuristic is a heuristic
+provider (see heuristics.py), so A*, GFS, IDA* and the bidirectional
+searches take it directly, alone or combined with Haversine via MaxHeuristic.
+"""
+
+import math
+from array import array
+
+from Algorithms.all_pairs import dijkstra_row
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import GoalRowCache
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def select_landmarks(graph, count, first=0):
+    """
+    Farthest-point selection: each new landmark is the city whose road
+    distance to the closest landmark chosen so far is largest.
+    Returns: (landmark ids, distances from each, distances to each)
+    """
+    n = graph.num_nodes
+    count = min(count, n)
+    reverse = graph.reversed()
+    landmarks, dist_from, dist_to = [], [], []
+    closest = [math.inf] * n
+    candidate = first
+    while len(landmarks) < count:
+        from_row, _ = dijkstra_row(graph, candidate)
+        to_row, _ = dijkstra_row(reverse, candidate)
+        landmarks.append(candidate)
+        dist_from.append(array('d', from_row))
+        dist_to.append(array('d', to_row))
+        best = -1.0
+        for v in range(n):
+            # round trip, so one-way streets don't hide far-away cities
+            d = from_row[v] + to_row[v]
+            if d < closest[v]:
+                closest[v] = d
+            if closest[v] > best and closest[v] != math.inf:
+                best = closest[v]
+                candidate = v
+        if best <= 0:
+            break  # every city already is a landmark
+    return landmarks, dist_from, dist_to
+
+
+class LandmarkHeuristic:
+    """Triangle-inequality lower bounds from K landmarks"""
+
+    def __init__(self, graph, count=8, max_goals=64):
+        self.graph = as_compact_graph(graph)
+        self.cities = self.graph.cities
+        self.count = count
+        self.max_goals = max_goals
+        self.landmarks, self.dist_from, self.dist_to = select_landmarks(self.graph, count)
+        self._cache = GoalRowCache(max_goals)
+
+    @classmethod
+    def for_graph(cls, graph, count=8):
+        """Landmarks for graph, preprocessed on first use and kept with the graph"""
+        graph = as_compact_graph(graph)
+        key = ('landmarks', count)
+        if key not in graph.derived:
+            graph.derived[key] = cls(graph, count)
+        return graph.derived[key]
+
+    def aligned(self, cities):
+        if list(cities) == self.cities[:len(cities)]:
+            return self
+        return LandmarkHeuristic(self.graph.reindex(cities), self.count, self.max_goals)
+
+    def estimate(self, node, goal):
+        best = 0.0
+        for from_l, to_l in zip(self.dist_from, self.dist_to):
+            forward = from_l[goal] - from_l[node]
+            backward = to_l[node] - to_l[goal]
+            # unreachable landmarks give inf - inf, which is no bound at all
+            if forward > best and forward != math.inf:
+                best = forward
+            if backward > best and backward != math.inf:
+                best = backward
+        return best
+
+    def goal_row(self, goal):
+        return self._cache.get(goal, self._build_row)
+
+    def _build_row(self, goal):
+        n = self.graph.num_nodes
+        if NUMPY_AVAILABLE:
+            with np.errstate(invalid='ignore'):
+                from_l = np.array(self.dist_from)
+                to_l = np.array(self.dist_to)
+                bounds = np.concatenate((from_l[:, goal, None] - from_l,
+                                         to_l - to_l[:, goal, None]))
+                bounds[~np.isfinite(bounds)] = 0.0
+                row = np.maximum(bounds.max(axis=0), 0.0) if len(bounds) else np.zeros(n)
+            return array('d', row.tobytes())
+        row = array('d', [0.0]) * n
+        for from_l, to_l in zip(self.dist_from, self.dist_to):
+            to_goal, from_goal = from_l[goal], to_l[goal]
+            for v in range(n):
+                forward = to_goal - from_l[v]
+                backward = to_l[v] - from_goal
+                if forward > row[v] and forward != math.inf:
+                    row[v] = forward
+                if backward > row[v] and backward != math.inf:
+                    row[v] = backward
+        return row
@@ -0,0 +1,439 @@
+"""
+memory_bounded.py - Memory-bounded informed search: SMA* and beam search
+A* keeps every city it touches (frontier, costs and parents), so one long
+query on a big graph can use a lot of memory. These two put a cap on it.
+
+SMAStarAlgorithm(graph, heuristic, memory_limit)
+    Simplified memory-bounded A*. The search tree holds at most memory_limit
+    nodes. When it is full, the shallowest leaf with the highest f is
+    dropped and its f is remembered by its parent. The parent generates it
+    again later, but only if everything else turns out worse. It finds the
+    A* route whenever that route fits in memory_limit - 1 edges; otherwise
+    it gives up (no route).
+
+BeamSearchAlgorithm(graph, heuristic, beam_width)
+    A* one layer at a time, keeping only the beam_width best f per layer
+    (chosen with a heap of beam_width entries, the other successors are
+    never stored). It holds at most beam_width nodes per layer of the route
+    plus a best-g table of BEAM_TABLE_LAYERS x beam_width cities, is fast,
+    and gives no guarantee on the cost; it can also walk into a dead end
+    and miss a reachable goal.
+
+The frontier heaps drop stale entries lazily, and are compacted whenever
+they hold more than HEAP_FACTOR x memory_limit entries, so the heaps stay
+proportional to the node budget too. Once the best-g table below is full,
+SMA* can no longer tell repeated cities apart and may regenerate the same
+paths over and over: it then gives up after max_regenerations more
+regenerations (table_size by default).
+
+Both remember the best g per city in a table of at most table_size cities,
+the same as IDA*. It is a plain city -> g dict and much smaller per entry
+than a search node, but it is what keeps SMA* from filling its budget with
+copies of the same city reached along different paths. A path that reaches a
+city with a worse g is pruned. Without a table entry, a city is only
+checked against its own path. The beam only enters cities that made it into
+a beam and keeps the most recent ones, so a city whose path was dropped can
+still be reached along another one.
+self.memory_stats holds peak_nodes, peak_entries (heap entries), evicted,
+pruned, regenerated and gave_up for SMA*, and peak_nodes (an upper bound,
+ancestors are shared), peak_table (best-g entries) and pruned for the beam.
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from itertools import count
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import as_heuristic
+
+# SMA* compacts its heaps past this many entries per node of the budget
+HEAP_FACTOR = 4
+# the beam remembers the cities of about this many of its last layers
+BEAM_TABLE_LAYERS = 8
+
+
+class _Node:
+    """A node of the SMA* search tree"""
+
+    __slots__ = ('city', 'g', 'f', 'depth', 'parent', 'children', 'next_edge', 'forgotten',
+                 'version', 'open')
+
+    def __init__(self, city, g, f, depth, parent, next_edge):
+        self.city = city
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.children = {}          # city -> _Node, successors still in memory
+        self.next_edge = next_edge  # CSR index of the next successor to generate
+        self.forgotten = math.inf   # smallest f of the dropped successors
+        self.version = 0
+        self.open = False
+
+
+def _on_path(node, city):
+    while node is not None:
+        if node.city == city:
+            return True
+        node = node.parent
+    return False
+
+
+class SMAStarAlgorithm:
+    """SMA*: A* in at most memory_limit search-tree nodes"""
+
+    def __init__(self, actualGraph, estimateGraph=None, memory_limit=10000, table_size=1 << 16,
+                 max_regenerations=None):
+        self.graph = as_compact_graph(actualGraph)
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+        if memory_limit < 2:
+            raise ValueError("memory_limit must be at least 2 nodes")
+        self.memory_limit = memory_limit
+        self.table_size = table_size
+        self.max_regenerations = table_size if max_regenerations is None else max_regenerations
+        self.expanded_nodes = 0
+        self.memory_stats = {}
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
+    def search(self, start, goal):
+        """
+        Search for a path from start to goal within the node budget.
+        Returns: (path, cost) tuple
+        """
+        self.expanded_nodes = 0
+        self.memory_stats = {}
+        if start == goal:
+            return ([start], 0)
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        source = graph.index[start]
+        target = graph.index[goal]
+        h = self.heuristic.goal_row(target)
+        offsets, nbrs, wts = graph.offsets, graph.neighbors, graph.weights
+        limit = self.memory_limit
+        table_size = self.table_size
+
+        best_g = {source: 0}
+        # open nodes by (f, deepest first) to expand, open leaves by (f, shallowest first) to drop
+        best = []
+        worst = []
+        sequence = count()
+        stats = {'peak_nodes': 1, 'peak_entries': 1, 'evicted': 0, 'pruned': 0, 'regenerated': 0,
+                 'gave_up': False}
+        self.memory_stats = stats
+        used = 1
+        deepest = 0
+        # search nodes created, and how many of those were for a city already in the table
+        generated = 1
+        duplicates = 0
+        max_entries = HEAP_FACTOR * limit
+        # regenerations left once best_g is full
+        regenerations = self.max_regenerations
+
+        def enqueue(node):
+            node.open = True
+            node.version += 1
+            heapq.heappush(best, (node.f, -node.depth, next(sequence), node.version, node))
+            if not node.children:
+                file_leaf(node)
+
+        def file_leaf(node):
+            heapq.heappush(worst, (-node.f, node.depth, next(sequence), node.version, node))
+
+        def compact():
+            """Drop the stale heap entries (of evicted, closed or re-queued nodes)"""
+            best[:] = [entry for entry in best if entry[4].open and entry[3] == entry[4].version]
+            heapq.heapify(best)
+            filed = set()
+            leaves = []
+            for entry in worst:
+                node = entry[4]
+                if (node.open and entry[3] == node.version and not node.children
+                        and id(node) not in filed):
+                    filed.add(id(node))
+                    leaves.append(entry)
+            worst[:] = leaves
+            heapq.heapify(worst)
+
+        def backup(node):
+            """A node whose successors were all generated is worth its best child"""
+            while node is not None and node.next_edge >= offsets[node.city + 1]:
+                f = min([child.f for child in node.children.values()] + [node.forgotten])
+                if f == node.f:
+                    break
+                node.f = f
+                if node.open:
+                    enqueue(node)
+                node = node.parent
+
+        def evict(keep):
+            """Drop the shallowest worst-f open leaf, False if there is none"""
+            skipped = []
+            leaf = None
+            while worst:
+                entry = heapq.heappop(worst)
+                node = entry[4]
+                if not node.open or entry[3] != node.version or node.children:
+                    # a node that loses its last child is filed again then
+                    continue
+                if node.parent is None or node is keep:
+                    skipped.append(entry)
+                    continue
+                leaf = node
+                break
+            for entry in skipped:
+                heapq.heappush(worst, entry)
+            if leaf is None:
+                return False
+            leaf.open = False
+            parent = leaf.parent
+            # stale heap entries may still hold the leaf, they must not hold its ancestors
+            leaf.parent = None
+            del parent.children[leaf.city]
+            parent.forgotten = min(parent.forgotten, leaf.f)
+            if not parent.open:
+                enqueue(parent)
+            elif not parent.children:
+                file_leaf(parent)
+            stats['evicted'] += 1
+            return True
+
+        def remove_dead(node):
+            """Delete childless, fully generated nodes with nothing forgotten (no route through them)"""
+            nonlocal used
+            while (node.parent is not None and not node.children and node.forgotten == math.inf
+                   and node.next_edge >= offsets[node.city + 1]):
+                node.open = False
+                parent = node.parent
+                node.parent = None
+                del parent.children[node.city]
+                used -= 1
+                backup(parent)
+                if parent.open and not parent.children:
+                    file_leaf(parent)
+                node = parent
+
+        root = _Node(source, 0, h[source], 0, None, offsets[source])
+        enqueue(root)
+
+        while best:
+            entries = len(best) + len(worst)
+            if entries > max_entries:
+                compact()
+                entries = len(best) + len(worst)
+            stats['peak_entries'] = max(stats['peak_entries'], entries)
+            f, _, _, version, node = heapq.heappop(best)
+            if not node.open or version != node.version:
+                continue
+            if f == math.inf:
+                break
+            if node.city == target:
+                path = []
+                goal_node = node
+                while node is not None:
+                    path.append(node.city)
+                    node = node.parent
+                if self.stats is not None:
+                    self._report(stats, generated, duplicates, deepest)
+                return (graph.names(path[::-1]), goal_node.g)
+
+            end = offsets[node.city + 1]
+            if node.next_edge >= end:
+                # only forgotten successors are left, generate them again
+                node.next_edge = offsets[node.city]
+                node.forgotten = math.inf
+                stats['regenerated'] += 1
+                if len(best_g) >= table_size:
+                    regenerations -= 1
+                    if regenerations < 0:
+                        stats['gave_up'] = True
+                        break
+            self.expanded_nodes += 1
+
+            # the next successor: not in memory and not dominated by a cheaper known g
+            child = None
+            i = node.next_edge
+            while i < end:
+                v = nbrs[i]
+                g = node.g + wts[i]
+                i += 1
+                if v in node.children:
+                    continue
+                seen = best_g.get(v)
+                if seen is not None:
+                    if g > seen:
+                        stats['pruned'] += 1
+                        continue
+                    best_g[v] = g
+                    duplicates += 1
+                elif len(best_g) < table_size:
+                    best_g[v] = g
+                elif _on_path(node, v):
+                    continue
+                generated += 1
+                # pathmax: a child is never cheaper than its parent
+                f = max(node.f, g + h[v])
+                if v != target and node.depth + 2 >= limit:
+                    f = math.inf   # no room below it for a route
+                child = _Node(v, g, f, node.depth + 1, node, offsets[v])
+                break
+            node.next_edge = i
+
+            if child is not None:
+                node.children[child.city] = child
+                while used >= limit and evict(child):
+                    used -= 1
+                if used >= limit:
+                    # nothing can go - forget the new child straight away
+                    del node.children[child.city]
+                    node.forgotten = min(node.forgotten, child.f)
+                else:
+                    used += 1
+                    stats['peak_nodes'] = max(stats['peak_nodes'], used)
+                    deepest = max(deepest, child.depth)
+                    enqueue(child)
+
+            if node.next_edge >= end:
+                backup(node)
+                if node.forgotten == math.inf:
+                    # every successor is in memory, the node itself needs no more turns
+                    node.open = False
+                    remove_dead(node)
+                    continue
+            if node.open:
+                enqueue(node)
+
+        if self.stats is not None:
+            self._report(stats, generated, duplicates, deepest)
+        return (None, 0)
+
+    def _report(self, stats, generated, duplicates, deepest):
+        # duplicates count nodes that were created; pruned paths are in memory_stats
+        self.stats.update(generated=generated, duplicates=duplicates,
+                          max_frontier=stats['peak_nodes'], max_depth=deepest)
+
+
+class BeamSearchAlgorithm:
+    """Layered A* keeping the beam_width best nodes per layer"""
+
+    def __init__(self, actualGraph, estimateGraph=None, beam_width=16, table_size=None):
+        self.graph = as_compact_graph(actualGraph)
+        self.heuristic = as_heuristic(estimateGraph, self.graph.cities)
+        if beam_width < 1:
+            raise ValueError("beam_width must be at least 1")
+        self.beam_width = beam_width
+        self.table_size = BEAM_TABLE_LAYERS * beam_width if table_size is None else table_size
+        self.expanded_nodes = 0
+        self.memory_stats = {}
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
+
+    def search(self, start, goal):
+        """
+        Search for a path from start to goal, layer by layer.
+        Returns: (path, cost) tuple, the cheapest route the beam came across
+        """
+        self.expanded_nodes = 0
+        self.memory_stats = {}
+        if start == goal:
+            return ([start], 0)
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        source = graph.index[start]
+        target = graph.index[goal]
+        h = self.heuristic.goal_row(target)
+        width = self.beam_width
+        table_size = self.table_size
+
+        # a node is (city, g, parent node), the beam is a list of (f, tie, node).
+        # best_g only holds cities that made it into a beam, the most recent
+        # table_size of them, so a city dropped by the beam stays open
+        best_g = OrderedDict([(source, 0)])
+        sequence = count()
+        layer = [(h[source], next(sequence), (source, 0, None))]
+        best_cost = math.inf
+        best_node = None
+        stats = {'peak_nodes': 1, 'peak_table': 1, 'pruned': 0}
+        self.memory_stats = stats
+        generated = 1
+        duplicates = 0
+        depth = 0
+
+        while layer:
+            # the next beam: a max-heap of (-f, -tie, node), at most width entries,
+            # and the entry of each city in it (one per city, the lowest g)
+            beam = []
+            slot = {}
+            for _, _, node in layer:
+                city, g, _ = node
+                if g >= best_cost:
+                    continue
+                self.expanded_nodes += 1
+                for v, w in graph.edges(city):
+                    new_g = g + w
+                    if new_g >= best_cost:
+                        continue
+                    seen = best_g.get(v)
+                    if seen is not None:
+                        if new_g >= seen:
+                            stats['pruned'] += 1
+                            continue
+                        duplicates += 1
+                    elif self._on_path(node, v):
+                        continue
+                    generated += 1
+                    child = (v, new_g, node)
+                    if v == target:
+                        best_cost = new_g
+                        best_node = child
+                        continue
+                    entry = (-(new_g + h[v]), -next(sequence), child)
+                    old = slot.get(v)
+                    if old is not None:
+                        if new_g >= old[2][1]:
+                            stats['pruned'] += 1
+                            continue
+                        duplicates += 1
+                        beam.remove(old)
+                        heapq.heapify(beam)
+                    elif len(beam) >= width:
+                        if entry <= beam[0]:
+                            continue
+                        del slot[heapq.heappop(beam)[2][0]]
+                    heapq.heappush(beam, entry)
+                    slot[v] = entry
+
+            layer = sorted((-f, -tie, node) for f, tie, node in beam
+                           if node[1] < best_cost)
+            for _, _, node in layer:
+                best_g[node[0]] = node[1]
+                best_g.move_to_end(node[0])
+            stats['peak_table'] = max(stats['peak_table'], len(best_g))
+            while len(best_g) > table_size:
+                best_g.popitem(last=False)
+            if layer:
+                depth += 1
+            # the beam, plus every ancestor it keeps alive (at most one per layer and beam slot)
+            stats['peak_nodes'] = max(stats['peak_nodes'], len(layer) * (depth + 1))
+
+        if self.stats is not None:
+            self.stats.update(generated=generated, duplicates=duplicates,
+                              max_frontier=stats['peak_nodes'], max_depth=depth)
+        if best_node is None:
+            return (None, 0)
+        path = []
+        node = best_node
+        while node is not None:
+            path.append(node[0])
+            node = node[2]
+        return (graph.names(path[::-1]), best_cost)
+
+    @staticmethod
+    def _on_path(node, city):
+        while node is not None:
+            if node[0] == city:
+                return True
+            node = node[2]
+        return False
@@ -0,0 +1,126 @@
+"""
+path_tree.py - Shortest-path tree produced by a one-to-all / one-to-many search
+One UCS (Dijkstra) or A* run from the start city settles every destination at
+once, the tree keeps the parent pointers so any route can be read back later.
+
+A tree over every city (search_all with no goals) can follow road changes:
+repair() fixes only the part of the tree a change touches (dynamic SSSP).
+A road that got longer or closed cuts off the subtree hanging from it; those
+cities are relabelled from their cheapest neighbor still in the tree, and
+together with the ends of roads that got shorter they seed a Dijkstra pass
+that stops as soon as no distance improves any more.
+"""
+
+import heapq
+import math
+import time
+
+
+class ShortestPathTree:
+    """Result of UCSAlgorithm.search_all / AStarAlgorithm.search_all"""
+
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = source
+        self.cost = {source: 0}
+        self.parent = {}
+        # node id -> (nodes expanded so far, ms since the search started)
+        # recorded when the node's shortest distance became final
+        self.settled = {}
+        self.expanded_nodes = 0
+        self.runtime = 0.0
+        # True if every reachable city is settled (the tree can be repaired)
+        self.complete = False
+
+    def __contains__(self, city):
+        node = self.graph.index.get(city)
+        return node is not None and node in self.settled
+
+    def path_ids(self, node):
+        """Node ids from the source to node, or None if node was never settled"""
+        if node not in self.settled:
+            return None
+        path = [node]
+        while node in self.parent:
+            node = self.parent[node]
+            path.append(node)
+        return path[::-1]
+
+    def path_to(self, city):
+        """(path, cost) to a city, same shape as search() returns"""
+        node = self.graph.index.get(city)
+        path = self.path_ids(node) if node is not None else None
+        if path is None:
+            return (None, 0)
+        return (self.graph.names(path), self.cost[node])
+
+    def settled_cities(self):
+        """Cities in the order their shortest distance was found"""
+        return self.graph.names(self.settled)
+
+    def repair(self, graph, changes):
+        """
+        Bring the tree up to date with graph, the road graph after changes.
+        changes: (from_id, to_id, old distance, new distance) per changed
+        directed edge, None for an edge that doesn't exist (before/after)
+        Returns: number of cities whose route was recomputed
+        """
+        if not self.complete:
+            raise ValueError("Only a tree over every city can be repaired")
+        start_time = time.perf_counter()
+        inf = math.inf
+        cost, parent, settled = self.cost, self.parent, self.settled
+        changes = [(u, v, inf if old is None else old, inf if new is None else new)
+                   for u, v, old, new in changes]
+
+        # cities whose tree route used a road that got longer or closed
+        cut = [v for u, v, old, new in changes if new > old and parent.get(v) == u]
+        dropped = set()
+        if cut:
+            children = {}
+            for child, node in parent.items():
+                children.setdefault(node, []).append(child)
+            while cut:
+                node = cut.pop()
+                if node not in dropped:
+                    dropped.add(node)
+                    cut.extend(children.get(node, ()))
+            for node in dropped:
+                del cost[node]
+                parent.pop(node, None)
+                settled.pop(node, None)
+
+        frontier = []
+
+        def relabel(node, via, new_cost):
+            cost[node] = new_cost
+            parent[node] = via
+            heapq.heappush(frontier, (new_cost, node))
+
+        reverse = graph.reversed() if dropped else None
+        for node in dropped:
+            for neighbor, distance in reverse.edges(node):
+                if neighbor in cost and cost[neighbor] + distance < cost.get(node, inf):
+                    relabel(node, neighbor, cost[neighbor] + distance)
+        for u, v, old, new in changes:
+            if new < old and u in cost and cost[u] + new < cost.get(v, inf):
+                relabel(v, u, cost[u] + new)
+
+        expanded = 0
+        recomputed = set()
+        while frontier:
+            current_cost, current = heapq.heappop(frontier)
+            if current_cost > cost[current]:
+                continue
+            expanded += 1
+            recomputed.add(current)
+            settled[current] = (expanded, (time.perf_counter() - start_time) * 1000)
+            for neighbor, distance in graph.edges(current):
+                new_cost = current_cost + distance
+                if new_cost < cost.get(neighbor, inf):
+                    relabel(neighbor, current, new_cost)
+
+        self.graph = graph
+        self.expanded_nodes = expanded
+        self.runtime = (time.perf_counter() - start_time) * 1000
+        return len(recomputed | dropped)
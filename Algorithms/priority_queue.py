@@ -0,0 +1,314 @@
+"""
+priority_queue.py - Frontier priority queues for UCS and A*
+All of them hold node ids with a priority (plus an optional tie-breaker) and
+share one interface:
+
+    queue = make_queue('binary')
+    queue.push(node, priority, tie)   # insert, or lower the key of a queued node
+    priority, node = queue.pop()      # smallest (priority, tie, node)
+    len(queue), node in queue
+
+Backends:
+    heapq    heapq with lazy deletion: a better key pushes a second entry and
+             the old one is skipped when popped (what the searches always did)
+    binary   indexed binary heap with real decrease-key, one entry per node
+    pairing  pairing heap, O(1) insert/decrease-key, O(log n) amortized pop
+    bucket   Dial's bucket queue on integer keys round(priority * scale). Pops must
+             be (nearly) monotone like in UCS; ties inside a bucket come out
+             in any order, so results are exact only when every priority is a
+             multiple of 1 / scale (our mileages have one decimal: scale=10)
+
+queue.stats() counts pushes, decrease-keys, pops, stale pops (lazy entries
+thrown away) and the peak number of entries held.
+"""
+
+import heapq
+
+
+class _QueueStats:
+    def __init__(self):
+        self.pushes = 0
+        self.decreases = 0
+        self.pops = 0
+        self.stale = 0
+        self.peak = 0
+
+    def stats(self):
+        return {
+            'pushes': self.pushes,
+            'decreases': self.decreases,
+            'pops': self.pops,
+            'stale_pops': self.stale,
+            'heap_ops': self.pushes + self.decreases + self.pops + self.stale,
+            'peak_frontier': self.peak,
+        }
+
+
+class LazyHeapQueue(_QueueStats):
+    """heapq with lazy deletion, the entries of a node pile up until popped"""
+
+    def __init__(self):
+        super().__init__()
+        self.heap = []
+        self.key = {}
+
+    def __len__(self):
+        return len(self.key)
+
+    def __contains__(self, node):
+        return node in self.key
+
+    def push(self, node, priority, tie=0):
+        old = self.key.get(node)
+        if old is not None:
+            if (priority, tie) >= old:
+                return
+            self.decreases += 1
+        else:
+            self.pushes += 1
+        self.key[node] = (priority, tie)
+        heapq.heappush(self.heap, (priority, tie, node))
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def pop(self):
+        while True:
+            priority, tie, node = heapq.heappop(self.heap)
+            if self.key.get(node) == (priority, tie):
+                del self.key[node]
+                self.pops += 1
+                return priority, node
+            self.stale += 1
+
+
+class BinaryHeapQueue(_QueueStats):
+    """Indexed binary heap: every node is in the heap at most once"""
+
+    def __init__(self):
+        super().__init__()
+        self.heap = []       # (priority, tie, node) entries
+        self.position = {}   # node -> index in self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, node):
+        return node in self.position
+
+    def push(self, node, priority, tie=0):
+        entry = (priority, tie, node)
+        index = self.position.get(node)
+        if index is None:
+            self.pushes += 1
+            self.heap.append(entry)
+            self._sift_up(len(self.heap) - 1, entry)
+            if len(self.heap) > self.peak:
+                self.peak = len(self.heap)
+        elif entry < self.heap[index]:
+            self.decreases += 1
+            self._sift_up(index, entry)
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.position[top[2]]
+        if heap:
+            self._sift_down(0, last)
+        self.pops += 1
+        return top[0], top[2]
+
+    def _sift_up(self, index, entry):
+        heap, position = self.heap, self.position
+        while index:
+            parent = (index - 1) >> 1
+            above = heap[parent]
+            if entry >= above:
+                break
+            heap[index] = above
+            position[above[2]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _sift_down(self, index, entry):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            below = heap[child]
+            if entry <= below:
+                break
+            heap[index] = below
+            position[below[2]] = index
+            index = child
+        heap[index] = entry
+        position[entry[2]] = index
+
+
+class PairingHeapQueue(_QueueStats):
+    """
+    Pairing heap. Each node is a list [key, node, first child, next sibling,
+    previous sibling or parent] so cutting it out on decrease-key is O(1)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root = None
+        self.items = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, node):
+        return node in self.items
+
+    @staticmethod
+    def _meld(a, b):
+        """Make the larger root the first child of the smaller one"""
+        if b[0] < a[0]:
+            a, b = b, a
+        child = a[2]
+        b[3] = child
+        if child is not None:
+            child[4] = b
+        b[4] = a
+        a[2] = b
+        return a
+
+    def push(self, node, priority, tie=0):
+        key = (priority, tie, node)
+        item = self.items.get(node)
+        if item is None:
+            self.pushes += 1
+            item = [key, node, None, None, None]
+            self.items[node] = item
+            self.root = item if self.root is None else self._meld(self.root, item)
+            if len(self.items) > self.peak:
+                self.peak = len(self.items)
+            return
+        if key >= item[0]:
+            return
+        self.decreases += 1
+        item[0] = key
+        if item is self.root:
+            return
+        # cut the subtree out of its parent's child list and meld it back at the top
+        prev, following = item[4], item[3]
+        if prev[2] is item:
+            prev[2] = following
+        else:
+            prev[3] = following
+        if following is not None:
+            following[4] = prev
+        item[3] = item[4] = None
+        self.root = self._meld(self.root, item)
+
+    def pop(self):
+        root = self.root
+        del self.items[root[1]]
+        self.pops += 1
+        # two-pass pairing: meld children left to right in pairs, then right to left
+        pairs = []
+        child = root[2]
+        while child is not None:
+            second = child[3]
+            if second is None:
+                child[3] = child[4] = None
+                pairs.append(child)
+                break
+            following = second[3]
+            child[3] = child[4] = second[3] = second[4] = None
+            pairs.append(self._meld(child, second))
+            child = following
+        merged = None
+        while pairs:
+            tree = pairs.pop()
+            merged = tree if merged is None else self._meld(tree, merged)
+        self.root = merged
+        return root[0][0], root[1]
+
+
+class BucketQueue(_QueueStats):
+    """
+    Bucket (Dial) queue over integer keys round(priority * scale), scanned
+    upward from the smallest filled bucket. A key below the last popped
+    bucket (an inconsistent heuristic) is filed in that bucket. Decrease-key
+    files the node again, the old entry is skipped when its bucket is reached.
+    """
+
+    def __init__(self, scale=10.0):
+        super().__init__()
+        self.scale = scale
+        self.buckets = {}
+        self.current = None   # no filled bucket is below this one
+        self.floor = None     # last popped bucket
+        self.key = {}         # node -> (bucket, priority) of its live entry
+        self.entries = 0
+
+    def __len__(self):
+        return len(self.key)
+
+    def __contains__(self, node):
+        return node in self.key
+
+    def push(self, node, priority, tie=0):
+        old = self.key.get(node)
+        if old is not None:
+            if priority >= old[1]:
+                return
+            self.decreases += 1
+        else:
+            self.pushes += 1
+        bucket = round(priority * self.scale)
+        if self.floor is not None and bucket < self.floor:
+            bucket = self.floor
+        if self.current is None or bucket < self.current:
+            self.current = bucket
+        self.key[node] = (bucket, priority)
+        self.buckets.setdefault(bucket, []).append(node)
+        self.entries += 1
+        if self.entries > self.peak:
+            self.peak = self.entries
+
+    def pop(self):
+        while True:
+            bucket = self.buckets.get(self.current)
+            if not bucket:
+                self.buckets.pop(self.current, None)
+                self.current += 1
+                continue
+            node = bucket.pop()
+            self.entries -= 1
+            live = self.key.get(node)
+            if live is None or live[0] != self.current:
+                self.stale += 1
+                continue
+            del self.key[node]
+            self.pops += 1
+            self.floor = self.current
+            if not self.key:
+                # only stale entries left, forget them
+                self.buckets.clear()
+                self.entries = 0
+                self.current = None
+            return live[1], node
+
+
+QUEUES = {
+    'heapq': LazyHeapQueue,
+    'binary': BinaryHeapQueue,
+    'pairing': PairingHeapQueue,
+    'bucket': BucketQueue,
+}
+
+
+def make_queue(kind='heapq'):
+    """New empty queue of one of the QUEUES kinds"""
+    if kind not in QUEUES:
+        raise ValueError(f"Unknown queue: {kind} (choose from {', '.join(QUEUES)})")
+    return QUEUES[kind]()
@@ -0,0 +1,384 @@
+"""
+rendering.py - Graphviz rendering with a cached layout, off the main thread
+The expensive part of drawing the road network is neato's layout, and the
+city positions are the same for every picture of the same graph. So
+GraphRenderer lays the graph out once and keeps the positions in
+graph.derived and in __graphcache__/layout-<digest>.json (keyed by the
+graph's contents, so a changed graph gets a new layout). Every render
+after that (full network or a route overlay) pins the cities at those
+positions and runs neato -n, which only draws.
+
+Renders run on a small thread pool (the work happens in the Graphviz
+subprocess) and return futures. Asking for a file that is still being
+rendered returns the pending future instead of rendering it again.
+
+Large graphs are drawn at a lower level of detail, so a render never
+has more than max_elements nodes + edges:
+
+    backbone   instead of every road: each city's k nearest neighbors plus
+               a minimum spanning tree (so the picture stays connected),
+               plus the route. Big graphs are also laid out on this
+               backbone only (sfdp above SFDP_NODES cities)
+    clusters   if the cities alone still don't fit, the ones off the route
+               are merged per cell of a grid over the layout into one
+               "N cities" node, and backbone edges between cells are merged
+               too (shortest kept, the rest dropped past the cap)
+
+    renderer = GraphRenderer(graph)
+    renderer.render(filename='full_network')
+    renderer.render(path, filename='route', show_all_edges=False)
+    renderer.wait()
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import shlex
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.graph_cache import CACHE_DIR
+
+try:
+    import graphviz
+    GRAPHVIZ_AVAILABLE = True
+except ImportError:
+    GRAPHVIZ_AVAILABLE = False
+
+# neato settings of the one full layout run
+LAYOUT_ATTRS = {
+    'overlap': 'false',
+    'sep': '+4.0',
+    'nodesep': '4.0',
+    'ranksep': '4.0',
+    'len': '2.5',
+    'K': '5.0',
+}
+POINTS_PER_INCH = 72
+# above this many cities the layout uses the multiscale sfdp engine
+SFDP_NODES = 500
+
+
+def graph_digest(graph):
+    """Content hash of a graph (cities and CSR arrays)"""
+    graph = as_compact_graph(graph)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\n'.join(graph.cities).encode('utf-8'))
+    for values in (graph.offsets, graph.neighbors, graph.weights):
+        digest.update(memoryview(values).cast('B'))
+    return digest.hexdigest()
+
+
+def _undirected_edges(graph):
+    """Each road once as (u, v, miles) with u < v (or the only direction present)"""
+    for u in range(graph.num_nodes):
+        for v, w in graph.edges(u):
+            if u < v or not graph.has_edge(v, u):
+                yield u, v, w
+
+
+def backbone_edges(graph, k=3):
+    """
+    Sparse skeleton of the graph: every city's k shortest roads plus a
+    minimum spanning forest (Prim). Kept with the graph.
+    Returns: {(u, v): miles} with u < v
+    """
+    graph = as_compact_graph(graph)
+    key = ('render_backbone', k)
+    if key in graph.derived:
+        return graph.derived[key]
+    edges = {}
+
+    def add(u, v, w):
+        pair = (u, v) if u < v else (v, u)
+        if w < edges.get(pair, math.inf):
+            edges[pair] = w
+
+    for u in range(graph.num_nodes):
+        for w, v in heapq.nsmallest(k, ((w, v) for v, w in graph.edges(u))):
+            add(u, v, w)
+
+    # spanning forest over the roads taken as undirected
+    in_tree = bytearray(graph.num_nodes)
+    for root in range(graph.num_nodes):
+        if in_tree[root]:
+            continue
+        frontier = [(0.0, root, root)]
+        while frontier:
+            w, v, parent = heapq.heappop(frontier)
+            if in_tree[v]:
+                continue
+            in_tree[v] = 1
+            if v != parent:
+                add(parent, v, w)
+            for neighbor, distance in graph.edges(v):
+                if not in_tree[neighbor]:
+                    heapq.heappush(frontier, (distance, neighbor, v))
+    graph.derived[key] = edges
+    return edges
+
+
+def compute_layout(graph, edges=None):
+    """
+    Run neato (sfdp on big graphs) once and read the city positions (in
+    points) from its plain output. edges: (u, v) pairs to lay out with,
+    every road by default
+    Returns: {city: (x, y)}
+    """
+    graph = as_compact_graph(graph)
+    cities = graph.cities
+    dot = graphviz.Graph(engine='sfdp' if graph.num_nodes > SFDP_NODES else 'neato')
+    dot.attr(**LAYOUT_ATTRS)
+    for city in cities:
+        dot.node(city, city, shape='circle', fontsize='10', width='0.8')
+    if edges is None:
+        edges = ((u, v) for u, v, _ in _undirected_edges(graph))
+    for u, v in edges:
+        dot.edge(cities[u], cities[v])
+
+    positions = {}
+    for line in dot.pipe(format='plain').decode('utf-8').splitlines():
+        parts = shlex.split(line)
+        if parts and parts[0] == 'node':
+            positions[parts[1]] = (float(parts[2]) * POINTS_PER_INCH,
+                                   float(parts[3]) * POINTS_PER_INCH)
+    return positions
+
+
+class GraphRenderer:
+    """Draws one graph from a layout computed once, renders run in the background"""
+
+    def __init__(self, graph, workers=2, cache_dir=None, max_elements=2000, k=3):
+        self.graph = as_compact_graph(graph)
+        self.max_elements = max_elements
+        self.k = k
+        if cache_dir is None:
+            cache_dir = (os.path.dirname(self.graph.cache_path) if self.graph.cache_path
+                         else CACHE_DIR)
+        self.cache_dir = cache_dir
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+        self._lock = threading.Lock()          # guards _pending
+        self._layout_lock = threading.Lock()   # one layout run at a time
+        self._pending = {}
+
+    def detailed(self):
+        """True if every city and road fits in max_elements"""
+        return self.graph.num_nodes + self.graph.num_edges // 2 <= self.max_elements
+
+    def layout(self):
+        """City positions in points, computed on first use per graph"""
+        with self._layout_lock:
+            if 'graphviz_layout' not in self.graph.derived:
+                self.graph.derived['graphviz_layout'] = self._load_or_compute()
+            return self.graph.derived['graphviz_layout']
+
+    def _layout_file(self):
+        suffix = '' if self.detailed() else f"-k{self.k}"
+        return os.path.join(self.cache_dir, f"layout-{graph_digest(self.graph)}{suffix}.json")
+
+    def _load_or_compute(self):
+        path = self._layout_file()
+        try:
+            with open(path, encoding='utf-8') as f:
+                positions = {city: tuple(xy) for city, xy in json.load(f).items()}
+            if set(positions) == set(self.graph.cities):
+                return positions
+        except (OSError, ValueError):
+            pass
+        edges = None if self.detailed() else backbone_edges(self.graph, self.k)
+        positions = compute_layout(self.graph, edges)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(positions, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only directory - the layout is still kept in memory
+        return positions
+
+    def build(self, path=None, show_all_edges=False):
+        """graphviz.Graph of the network (path highlighted) with every city pinned"""
+        if self.detailed():
+            return self._build_full(path, show_all_edges)
+        return self._build_lod(path, show_all_edges)
+
+    def _new_dot(self):
+        dot = graphviz.Graph(comment='NY State Cities', engine='neato')
+        dot.attr(splines='true', outputorder='edgesfirst')
+        return dot
+
+    @staticmethod
+    def _city_node(dot, city, position, path, on_path):
+        x, y = position
+        pos = f"{x:.2f},{y:.2f}!"
+        if path and city == path[0]:
+            # Start node - green
+            dot.node(city, city, pos=pos, shape='circle', style='filled',
+                     fillcolor='lightgreen', fontsize='14', width='1.2')
+        elif path and city == path[-1]:
+            # Goal node - red
+            dot.node(city, city, pos=pos, shape='doublecircle', style='filled',
+                     fillcolor='lightcoral', fontsize='14', width='1.2')
+        elif city in on_path:
+            # Path node - yellow
+            dot.node(city, city, pos=pos, shape='circle', style='filled',
+                     fillcolor='yellow', fontsize='12', width='1.0')
+        else:
+            # Regular node - light blue
+            dot.node(city, city, pos=pos, shape='circle', style='filled',
+                     fillcolor='lightblue', fontsize='10', width='0.8')
+
+    def _path_edges(self, dot, path):
+        """Draw the route in red, returns the (u, v) id pairs drawn with u < v"""
+        graph = self.graph
+        added = set()
+        for city_from, city_to in zip(path or (), (path or ())[1:]):
+            u, v = graph.index[city_from], graph.index[city_to]
+            distance = graph.weight(u, v, None)
+            pair = (u, v) if u < v else (v, u)
+            if distance is not None and pair not in added:
+                dot.edge(city_from, city_to, label=f'{distance:.1f}', color='red',
+                         penwidth='3.0', fontsize='12', fontcolor='red')
+                added.add(pair)
+        return added
+
+    def _build_full(self, path, show_all_edges):
+        """Every city and road (the graph fits in max_elements)"""
+        graph = self.graph
+        positions = self.layout()
+        on_path = set(path or ())
+        dot = self._new_dot()
+        for city in graph.cities:
+            self._city_node(dot, city, positions[city], path, on_path)
+
+        added = self._path_edges(dot, path)
+        if path and not show_all_edges:
+            return dot
+
+        cities = graph.cities
+        for u, v, distance in _undirected_edges(graph):
+            if ((u, v) if u < v else (v, u)) in added:
+                continue
+            if path:
+                dot.edge(cities[u], cities[v], label=f'{distance:.1f}', color='gray',
+                         penwidth='0.5', fontsize='8', fontcolor='gray')
+            elif distance < 100:
+                # labels only on the shorter roads to reduce clutter
+                dot.edge(cities[u], cities[v], label=f'{distance:.0f}', color='gray70',
+                         penwidth='1.0', fontsize='8')
+            else:
+                dot.edge(cities[u], cities[v], color='gray80', penwidth='0.5')
+        return dot
+
+    def _build_lod(self, path, show_all_edges):
+        """Backbone edges, and cities clustered if even they don't fit"""
+        graph = self.graph
+        cities = graph.cities
+        positions = self.layout()
+        on_path = set(path or ())
+        route = [graph.index[city] for city in path or ()]
+        dot = self._new_dot()
+
+        backbone = backbone_edges(graph, self.k) if show_all_edges or not path else {}
+        if graph.num_nodes + len(route) + len(backbone) <= self.max_elements:
+            # every city, backbone roads instead of all of them
+            for city in cities:
+                self._city_node(dot, city, positions[city], path, on_path)
+            added = self._path_edges(dot, path)
+            for (u, v), distance in backbone.items():
+                if (u, v) not in added:
+                    dot.edge(cities[u], cities[v], color='gray80', penwidth='0.5')
+            return dot
+
+        # cities off the route merged per grid cell, about a third of the budget each
+        # for cluster nodes and for edges
+        cells = max(1, (self.max_elements - 2 * len(route)) // 3)
+        xs = [positions[city][0] for city in cities]
+        ys = [positions[city][1] for city in cities]
+        left, bottom = min(xs), min(ys)
+        side = max(max(xs) - left, max(ys) - bottom, 1.0) / max(1, math.isqrt(cells))
+        on_route = set(route)
+        members = {}
+        for node in range(graph.num_nodes):
+            if node not in on_route:
+                cell = (int((xs[node] - left) // side), int((ys[node] - bottom) // side))
+                members.setdefault(cell, []).append(node)
+
+        # representative element of every city: its own name or its cluster's
+        rep = {node: cities[node] for node in route}
+        for cell, nodes in members.items():
+            if len(nodes) == 1:
+                rep[nodes[0]] = cities[nodes[0]]
+                self._city_node(dot, cities[nodes[0]], positions[cities[nodes[0]]], path, on_path)
+                continue
+            name = f"cluster {cell[0]},{cell[1]}"
+            x = sum(xs[node] for node in nodes) / len(nodes)
+            y = sum(ys[node] for node in nodes) / len(nodes)
+            dot.node(name, f"{len(nodes)} cities", pos=f"{x:.2f},{y:.2f}!", shape='box',
+                     style='filled,rounded', fillcolor='lightsteelblue', fontsize='9',
+                     width=f"{0.4 + 0.1 * math.log2(len(nodes)):.2f}")
+            for node in nodes:
+                rep[node] = name
+        for node in route:
+            self._city_node(dot, cities[node], positions[cities[node]], path, on_path)
+        added = self._path_edges(dot, path)
+
+        merged = {}
+        for (u, v), distance in backbone.items():
+            if (u, v) in added:
+                continue
+            a, b = rep[u], rep[v]
+            if a == b:
+                continue
+            pair = (a, b) if a < b else (b, a)
+            if distance < merged.get(pair, math.inf):
+                merged[pair] = distance
+        room = self.max_elements - len(members) - len(route) - len(added)
+        for (a, b), _ in heapq.nsmallest(max(0, room), merged.items(), key=lambda item: item[1]):
+            dot.edge(a, b, color='gray80', penwidth='0.5')
+        return dot
+
+    def render(self, path=None, filename='graph_visualization', format='png',
+               show_all_edges=False):
+        """
+        Render in the background. Returns a Future of the output file path.
+        A render of the same file, path and flags that is still running is
+        shared; a different one to the same file starts after it finishes
+        """
+        key = (filename, format)
+        request = (tuple(path) if path else None, bool(show_all_edges))
+        with self._lock:
+            pending_request, pending = self._pending.get(key, (None, None))
+            if pending is not None and not pending.done():
+                if pending_request == request:
+                    return pending
+                future = self._pool.submit(self._render_after, pending, path, filename, format,
+                                           show_all_edges)
+            else:
+                future = self._pool.submit(self._render, path, filename, format, show_all_edges)
+            self._pending[key] = (request, future)
+            return future
+
+    def _render_after(self, previous, path, filename, format, show_all_edges):
+        # submitted later to the same FIFO pool, so previous is already running
+        previous.exception()
+        return self._render(path, filename, format, show_all_edges)
+
+    def _render(self, path, filename, format, show_all_edges):
+        dot = self.build(path, show_all_edges)
+        # neato -n: keep the pinned positions, only route the edges and draw
+        return dot.render(filename, format=format, cleanup=True, neato_no_op=True)
+
+    def wait(self):
+        """Block until every submitted render has finished"""
+        with self._lock:
+            pending = [future for _, future in self._pending.values()]
+        for future in pending:
+            future.exception()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,156 @@
+"""
+sparsify.py - Sparse road network from a (fully connected) distance matrix
+With every pair of cities connected, each expansion of UCS / A* / GFS looks
+at all N-1 other cities. Most of those edges are never on a shortest route:
+the road Rochester -> New York City is no shorter than going through
+Syracuse. sparsify() keeps only the edges that are needed:
+
+    1. triangle pruning   drop u -> v when some u -> x -> v is no longer.
+                          Every distance stays exactly the same.
+    2. k nearest          with k, start from each city's k shortest roads
+                          (kept both ways) instead of from nothing
+    3. stretch repair     go through the remaining edges shortest first and
+                          put an edge back only if the kept roads can't get
+                          from u to v within stretch x its length (a greedy
+                          spanner). Every distance ends up within stretch x the
+                          original, stretch=1.0 keeps them all exact.
+
+    sparse, report = sparsify(graph)                 # exact distances
+    sparse, report = sparsify(graph, k=4, stretch=1.1)
+    distance_error(graph, sparse)                    # measured stretch
+
+stretch=math.inf skips step 3 (plain k nearest, no bound on the error).
+Two-way graphs are pruned two-way, so the result stays two-way.
+"""
+
+import heapq
+import math
+import random
+
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.analysis import GraphAnalysis
+from Algorithms.compact_graph import CompactGraph, as_compact_graph
+
+EPSILON = 1e-9
+
+
+def triangle_prune(graph):
+    """
+    Edges u -> v with no two-hop route u -> x -> v of at most the same length.
+    Each dropped edge is replaced by strictly shorter ones, so dropping them
+    all at once keeps every distance.
+    Returns: {(u, v): miles} of the edges kept
+    """
+    graph = as_compact_graph(graph)
+    kept = {}
+    for u in range(graph.num_nodes):
+        row = dict(graph.edges(u))
+        dominated = set()
+        for x, w_ux in row.items():
+            for v, w_xv in graph.edges(x):
+                if v != u and v in row and w_ux + w_xv <= row[v] + EPSILON:
+                    dominated.add(v)
+        for v, w in row.items():
+            if v not in dominated:
+                kept[(u, v)] = w
+    return kept
+
+
+def _within(adjacent, source, target, limit):
+    """True if the kept roads reach target from source in at most limit miles"""
+    best = {source: 0.0}
+    frontier = [(0.0, source)]
+    while frontier:
+        d, u = heapq.heappop(frontier)
+        if u == target:
+            return True
+        if d > best[u]:
+            continue
+        for v, w in adjacent[u].items():
+            nd = d + w
+            if nd <= limit and nd < best.get(v, INF):
+                best[v] = nd
+                heapq.heappush(frontier, (nd, v))
+    return False
+
+
+def sparsify(graph, k=None, stretch=1.0):
+    """
+    Sparse copy of graph (see the module docstring for the steps).
+    k: seed with each city's k nearest roads (None = no seeding)
+    stretch: allowed distance ratio, >= 1.0 (inf = no repair)
+    Returns: (CompactGraph, report dict)
+    """
+    graph = as_compact_graph(graph)
+    if stretch < 1.0:
+        raise ValueError("stretch must be at least 1.0")
+    two_way = GraphAnalysis.for_graph(graph).symmetric()
+    candidates = triangle_prune(graph)
+
+    adjacent = [{} for _ in range(graph.num_nodes)]
+
+    def keep(u, v, w):
+        adjacent[u][v] = w
+        if two_way:
+            adjacent[v][u] = w
+
+    seeded = 0
+    if k is not None:
+        for u in range(graph.num_nodes):
+            row = [(w, v) for v, w in graph.edges(u) if (u, v) in candidates]
+            for w, v in heapq.nsmallest(k, row):
+                if v not in adjacent[u]:
+                    keep(u, v, w)
+                    seeded += 1
+
+    repaired = 0
+    if stretch != math.inf:
+        for (u, v), w in sorted(candidates.items(), key=lambda item: item[1]):
+            if v in adjacent[u] or (two_way and u > v):
+                continue
+            if not _within(adjacent, u, v, stretch * w + EPSILON):
+                keep(u, v, w)
+                repaired += 1
+
+    sparse = CompactGraph.from_edges(
+        graph.cities, ((u, v, w) for u in range(graph.num_nodes) for v, w in adjacent[u].items()))
+    report = {
+        'edges_before': graph.num_edges,
+        'edges_after': sparse.num_edges,
+        'reduction': 1 - sparse.num_edges / graph.num_edges if graph.num_edges else 0.0,
+        'triangle_pruned': graph.num_edges - len(candidates),
+        'seeded': seeded * (2 if two_way else 1),
+        'repaired': repaired * (2 if two_way else 1),
+        'k': k,
+        'stretch': stretch,
+    }
+    return sparse, report
+
+
+def distance_error(graph, sparse, sample=32, seed=0):
+    """
+    Measured stretch of sparse against graph, from sample start cities
+    (all of them if sample is None or larger than the graph).
+    Returns: {'max_stretch', 'mean_stretch', 'disconnected', 'pairs'}
+    """
+    graph = as_compact_graph(graph)
+    sparse = as_compact_graph(sparse, graph.cities)
+    sources = list(range(graph.num_nodes))
+    if sample is not None and sample < len(sources):
+        sources = random.Random(seed).sample(sources, sample)
+    worst, total, pairs, disconnected = 1.0, 0.0, 0, 0
+    for source in sources:
+        exact, _ = dijkstra_row(graph, source)
+        approx, _ = dijkstra_row(sparse, source)
+        for v, d in enumerate(exact):
+            if v == source or d == INF or d == 0:
+                continue
+            if approx[v] == INF:
+                disconnected += 1
+                continue
+            ratio = approx[v] / d
+            worst = max(worst, ratio)
+            total += ratio
+            pairs += 1
+    return {'max_stretch': worst, 'mean_stretch': total / pairs if pairs else 1.0,
+            'disconnected': disconnected, 'pairs': pairs}
@@ -1,28 +1,44 @@
-import heapq
+import time
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.instrumentation import tree_depth
+from Algorithms.path_tree import ShortestPathTree
+from Algorithms.priority_queue import make_queue
 
 class UCSAlgorithm:
-    def __init__(self, graph):
-        self.graph = graph
+    def __init__(self, graph, queue='heapq'):
+        self.graph = as_compact_graph(graph)
+        # frontier backend, see priority_queue.py ('heapq', 'binary', 'pairing', 'bucket')
+        self.queue = queue
+        self.queue_stats = {}
         self.expanded_nodes = 0
+        self.stats = None  # SearchStats while instrumented, see instrumentation.py
     
     def search(self, start, goal):
         """
         Search for a path from start to goal using Uniform Cost Search.
         Returns: (path, cost) tuple
         """
+        self.expanded_nodes = 0
         if start == goal:
             return ([start], 0)
             
-        self.expanded_nodes = 0
         
-        # Priority queue: (cost, current_city)
-        frontier = [(0, start)]
-        cost_so_far = {start: 0}
+        graph = self.graph
+        if start not in graph.index or goal not in graph.index:
+            return (None, 0)
+        start_id = graph.index[start]
+        goal_id = graph.index[goal]
+        
+        # Priority queue of city ids keyed by cost
+        frontier = make_queue(self.queue)
+        frontier.push(start_id, 0)
+        cost_so_far = {start_id: 0}
         came_from = {}
         expanded = set()  # Track which nodes we've already expanded
         
         while frontier:
-            current_cost, current = heapq.heappop(frontier)
+            current_cost, current = frontier.pop()
             
             # Skip if already expanded
             if current in expanded:
@@ -33,18 +49,21 @@ class UCSAlgorithm:
             self.expanded_nodes += 1
             
             # Goal test when popping
-            if current == goal:
+            if current == goal_id:
                 # Reconstruct path
                 path = []
-                node = goal
+                node = goal_id
                 while node in came_from:
                     path.append(node)
                     node = came_from[node]
-                path.append(start)
-                return (path[::-1], current_cost)
+                path.append(start_id)
+                self.queue_stats = frontier.stats()
+                if self.stats is not None:
+                    self._report(cost_so_far, came_from)
+                return (graph.names(path[::-1]), current_cost)
             
             # Expand neighbors
-            for neighbor, distance in self.graph.get(current, {}).items():
+            for neighbor, distance in graph.edges(current):
                 # Skip if already expanded
                 if neighbor in expanded:
                     continue
@@ -55,7 +74,73 @@ class UCSAlgorithm:
                 if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = new_cost
                     came_from[neighbor] = current
-                    heapq.heappush(frontier, (new_cost, neighbor))
+                    frontier.push(neighbor, new_cost)
         
         # No path found
-        return (None, 0)
\ No newline at end of file
+        self.queue_stats = frontier.stats()
+        if self.stats is not None:
+            self._report(cost_so_far, came_from)
+        return (None, 0)
+
+    def _report(self, cost_so_far, came_from):
+        queue_stats = self.queue_stats
+        generated = queue_stats['pushes'] + queue_stats['decreases']
+        self.stats.update(generated=generated, duplicates=generated - len(cost_so_far),
+                          max_frontier=queue_stats['peak_frontier'],
+                          max_depth=tree_depth(came_from))
+    
+    def search_all(self, start, goals=None):
+        """
+        One-to-many / one-to-all Uniform Cost Search (Dijkstra).
+        Runs a single search from start and stops once every city in goals
+        (all cities if None) is settled.
+        Returns: ShortestPathTree, use tree.path_to(city) for each route
+        """
+        graph = self.graph
+        self.expanded_nodes = 0
+        start_time = time.perf_counter()
+        
+        start_id = graph.index[start]
+        tree = ShortestPathTree(graph, start_id)
+        if goals is None:
+            remaining = graph.num_nodes
+        else:
+            targets = {graph.index[city] for city in goals if city in graph.index}
+            remaining = len(targets)
+        
+        frontier = make_queue(self.queue)
+        frontier.push(start_id, 0)
+        cost_so_far = tree.cost
+        came_from = tree.parent
+        expanded = tree.settled
+        
+        while frontier and remaining:
+            current_cost, current = frontier.pop()
+            
+            if current in expanded:
+                continue
+            
+            self.expanded_nodes += 1
+            expanded[current] = (self.expanded_nodes,
+                                 (time.perf_counter() - start_time) * 1000)
+            if goals is None or current in targets:
+                remaining -= 1
+            
+            for neighbor, distance in graph.edges(current):
+                if neighbor in expanded:
+                    continue
+                    
+                new_cost = current_cost + distance
+                
+                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    frontier.push(neighbor, new_cost)
+        
+        self.queue_stats = frontier.stats()
+        if self.stats is not None:
+            self._report(cost_so_far, came_from)
+        tree.expanded_nodes = self.expanded_nodes
+        tree.runtime = (time.perf_counter() - start_time) * 1000
+        tree.complete = goals is None
+        return tree
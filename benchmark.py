@@ -0,0 +1,336 @@
+"""
+benchmark.py - Non-interactive benchmark for the route-planner search algorithms
+Runs every selected algorithm over all (or a sample of) start/goal pairs on
+the NY data or a synthetic graph, and writes JSON/CSV so results can be
+compared across commits.
+
+Each query is warmed up, then timed `repeat` times with perf_counter_ns.
+Reported per algorithm: median/p95/p99 latency, expanded nodes, path cost,
+optimality gap against UCS, peak traced memory of a single query, for
+IDS/IDA* the number of deepening iterations and for UCS/A* the priority
+queue operations and peak frontier size (--queue picks the backend).
+One more, untimed, instrumented run per query adds generated nodes,
+duplicate frontier entries, search depth and heuristic lookups (see
+Algorithms/instrumentation.py; --trace/--profile export it per query).
+--sparse also runs every query on the sparse road network from
+Algorithms/sparsify.py and reports its edge reduction, distance error and
+per-algorithm speedup (the optimality gap stays against the full graph).
+
+Examples:
+    python benchmark.py
+    python benchmark.py --graph geometric --nodes 10000 --pairs 200 --output bench.json
+    python benchmark.py --algorithms UCS A_STAR BI_A_STAR --format csv --output bench.csv
+    python benchmark.py --algorithms UCS A_STAR GFS --sparse --k 4 --stretch 1.1
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+with redirect_stdout(io.StringIO()):
+    # main.py prints a warning for every optional piece that is missing
+    from main import NYRouteGraph, create_algorithm, load_heuristic
+
+from Algorithms.generators import GENERATORS, make_graph
+from Algorithms.instrumentation import Instrumentation
+from Algorithms.priority_queue import QUEUES
+from Algorithms.sparsify import distance_error, sparsify
+
+DEFAULT_ALGORITHMS = ['DFS', 'BFS', 'IDS', 'UCS', 'GFS', 'A_STAR', 'IDA_STAR']
+# exponential-time searches are skipped on graphs larger than --exhaustive-limit
+EXHAUSTIVE = {'DFS', 'IDS', 'IDA_STAR', 'IDA_STAR_ALT'}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_benchmark_graph(args):
+    """Returns: (CompactGraph, heuristic provider, description)"""
+    if args.graph == 'ny':
+        with redirect_stdout(io.StringIO()):
+            route_graph = NYRouteGraph(args.csv)
+            heuristic = load_heuristic(route_graph)
+        return route_graph.graph, heuristic, f"ny:{args.csv}"
+    graph, heuristic = make_graph(args.graph, args.nodes, args.seed)
+    return graph, heuristic, f"{args.graph}:{args.nodes}:seed{args.seed}"
+
+
+def query_pairs(graph, sample, seed):
+    """All ordered start != goal pairs, or a random sample of them"""
+    n = graph.num_nodes
+    if sample and sample < n * (n - 1):
+        rng = random.Random(seed)
+        pairs = []
+        while len(pairs) < sample:
+            u, v = rng.randrange(n), rng.randrange(n)
+            if u != v:
+                pairs.append((graph.cities[u], graph.cities[v]))
+        return pairs
+    return [(a, b) for a in graph.cities for b in graph.cities if a != b]
+
+
+def time_query(algo, start, goal, repeat, warmup):
+    """Returns: (path, cost, expanded, list of runtimes in ns)"""
+    for _ in range(warmup):
+        algo.search(start, goal)
+    times = []
+    for _ in range(repeat):
+        begin = time.perf_counter_ns()
+        path, cost = algo.search(start, goal)
+        times.append(time.perf_counter_ns() - begin)
+    return path, cost, algo.expanded_nodes, times
+
+
+def peak_memory(algo, start, goal):
+    """Peak bytes allocated by one query (traced separately, tracing slows it down)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    algo.search(start, goal)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(graph, heuristic, algorithms, pairs, repeat=5, warmup=1,
+                  exhaustive_limit=200, measure_memory=True, queue='heapq', instrumentation=None,
+                  reference_graph=None):
+    """
+    Benchmark each algorithm on every pair. instrumentation (an Instrumentation,
+    None skips that pass) collects the search stats. reference_graph: graph
+    whose UCS costs are optimal (graph itself by default)
+    Returns: list of per-algorithm summaries
+    """
+    # UCS costs are the optimal reference for the optimality gap
+    reference = {}
+    ucs = create_algorithm('UCS', reference_graph if reference_graph is not None else graph)
+    for start, goal in pairs:
+        reference[(start, goal)] = ucs.search(start, goal)[1]
+
+    summaries = []
+    for name in algorithms:
+        if name in EXHAUSTIVE and graph.num_nodes > exhaustive_limit:
+            summaries.append({'algorithm': name, 'skipped': f"graph larger than {exhaustive_limit} nodes"})
+            continue
+        algo = create_algorithm(name, graph, heuristic, queue)
+        if algo is None:
+            summaries.append({'algorithm': name, 'skipped': 'not available'})
+            continue
+        # build any per-graph preprocessing (CH, landmarks) outside the timings
+        begin = time.perf_counter_ns()
+        algo.search(*pairs[0])
+        first_query_ns = time.perf_counter_ns() - begin
+
+        latencies, expanded, costs, gaps, peaks, passes = [], [], [], [], [], []
+        heap_ops, frontiers = [], []
+        records = []
+        found = 0
+        for start, goal in pairs:
+            path, cost, nodes, times = time_query(algo, start, goal, repeat, warmup)
+            latencies.append(sorted(times)[len(times) // 2])
+            expanded.append(nodes)
+            # iterative deepening: how many depth limits / f-bounds it took
+            iterations = getattr(algo, 'depth_stats', None) or getattr(algo, 'iterations', None)
+            if iterations:
+                passes.append(len(iterations))
+            # UCS / A* frontier work (priority_queue.py)
+            queue_stats = getattr(algo, 'queue_stats', None)
+            if queue_stats:
+                heap_ops.append(queue_stats['heap_ops'])
+                frontiers.append(queue_stats['peak_frontier'])
+            if path:
+                found += 1
+                costs.append(cost)
+                optimal = reference[(start, goal)]
+                if optimal:
+                    gaps.append((cost - optimal) / optimal)
+            if measure_memory:
+                peaks.append(peak_memory(algo, start, goal))
+            if instrumentation is not None:
+                records.append(instrumentation.run(algo, start, goal, name)[2])
+
+        latencies.sort()
+        ms = 1e-6
+        summaries.append({
+            'algorithm': name,
+            'queries': len(pairs),
+            'found': found,
+            'first_query_ms': first_query_ns * ms,
+            'median_ms': percentile(latencies, 0.50) * ms,
+            'p95_ms': percentile(latencies, 0.95) * ms,
+            'p99_ms': percentile(latencies, 0.99) * ms,
+            'mean_expanded': sum(expanded) / len(expanded),
+            'mean_iterations': sum(passes) / len(passes) if passes else None,
+            'mean_heap_ops': sum(heap_ops) / len(heap_ops) if heap_ops else None,
+            'max_frontier': max(frontiers) if frontiers else None,
+            'mean_cost': sum(costs) / len(costs) if costs else None,
+            'mean_optimality_gap': sum(gaps) / len(gaps) if gaps else None,
+            'max_optimality_gap': max(gaps) if gaps else None,
+            'optimal_fraction': sum(1 for g in gaps if g <= 1e-9) / len(gaps) if gaps else None,
+            'peak_kib': max(peaks) / 1024 if peaks else None,
+            **search_stats(records),
+        })
+    return summaries
+
+
+def search_stats(records):
+    """Summary of the instrumented runs' records"""
+    if not records:
+        return {}
+    count = len(records)
+    return {
+        'mean_generated': sum(r['generated'] for r in records) / count,
+        'mean_duplicates': sum(r['duplicates'] for r in records) / count,
+        'max_depth': max(r['max_depth'] for r in records),
+        'mean_heuristic_calls': sum(r['heuristic_calls'] for r in records) / count,
+    }
+
+
+def add_speedup(sparse_results, results):
+    """Dense median / sparse median per algorithm, on the sparse summaries"""
+    dense = {r['algorithm']: r for r in results if 'skipped' not in r}
+    for r in sparse_results:
+        if 'skipped' in r or r['algorithm'] not in dense:
+            continue
+        r['dense_median_ms'] = dense[r['algorithm']]['median_ms']
+        r['speedup'] = r['dense_median_ms'] / r['median_ms'] if r['median_ms'] else None
+    return sparse_results
+
+
+def write_report(report, output, fmt):
+    if fmt == 'json':
+        text = json.dumps(report, indent=2)
+    else:
+        buffer = io.StringIO()
+        fields = ['commit', 'graph'] + sorted({k for r in report['results'] for k in r})
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for row in report['results']:
+            writer.writerow({'commit': report['meta']['commit'],
+                             'graph': report['meta']['graph'], **row})
+        text = buffer.getvalue()
+    if output:
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Benchmark written to {output}")
+    else:
+        print(text)
+
+
+def print_table(results):
+    print(f"{'Algorithm':<14} {'Median ms':<11} {'p95 ms':<10} {'p99 ms':<10} "
+          f"{'Expanded':<10} {'Heap ops':<10} {'Frontier':<9} {'Gap %':<8} {'Peak KiB'}",
+          file=sys.stderr)
+    print("-" * 100, file=sys.stderr)
+    for r in results:
+        if 'skipped' in r:
+            print(f"{r['algorithm']:<14} skipped: {r['skipped']}", file=sys.stderr)
+            continue
+        gap = r['mean_optimality_gap']
+        gap = f"{gap * 100:.2f}" if gap is not None else '-'
+        peak = f"{r['peak_kib']:.1f}" if r['peak_kib'] is not None else '-'
+        heap_ops = f"{r['mean_heap_ops']:.1f}" if r['mean_heap_ops'] is not None else '-'
+        frontier = r['max_frontier'] if r['max_frontier'] is not None else '-'
+        print(f"{r['algorithm']:<14} {r['median_ms']:<11.4f} {r['p95_ms']:<10.4f} "
+              f"{r['p99_ms']:<10.4f} {r['mean_expanded']:<10.1f} {heap_ops:<10} "
+              f"{frontier:<9} {gap:<8} {peak}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the route-planner search algorithms")
+    parser.add_argument('--graph', default='ny', choices=['ny'] + list(GENERATORS),
+                        help="NY data or a synthetic graph kind")
+    parser.add_argument('--csv', default='actualDistance.csv', help="road CSV for --graph ny")
+    parser.add_argument('--nodes', type=int, default=1000, help="size of a synthetic graph")
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_ALGORITHMS)
+    parser.add_argument('--pairs', type=int, default=0,
+                        help="sample this many start/goal pairs (0 = all pairs)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--exhaustive-limit', type=int, default=200,
+                        help="skip DFS/IDS/IDA* on graphs with more nodes than this")
+    parser.add_argument('--queue', default='heapq', choices=list(QUEUES),
+                        help="frontier priority queue for UCS / A*")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--no-stats', action='store_true', help="skip the instrumented pass")
+    parser.add_argument('--trace', help="append every instrumented query to this JSON-lines file")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'],
+                        help="profile the instrumented pass (top functions go in the trace)")
+    parser.add_argument('--sparse', action='store_true',
+                        help="also benchmark the sparse road network (Algorithms/sparsify.py)")
+    parser.add_argument('--k', type=int, help="--sparse: seed with each city's k nearest roads")
+    parser.add_argument('--stretch', type=float, default=1.0,
+                        help="--sparse: allowed distance error factor (1.0 = exact)")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    graph, heuristic, description = load_benchmark_graph(args)
+    pairs = query_pairs(graph, args.pairs, args.seed)
+    instrumentation = None if args.no_stats else Instrumentation(args.profile, args.trace)
+    results = run_benchmark(graph, heuristic, args.algorithms, pairs, args.repeat,
+                            args.warmup, args.exhaustive_limit, not args.no_memory, args.queue,
+                            instrumentation)
+    print_table(results)
+
+    sparse_report = None
+    if args.sparse:
+        sparse, sparse_report = sparsify(graph, args.k, args.stretch)
+        sparse_report.update(distance_error(graph, sparse))
+        print(f"\nSparse graph: {sparse_report['edges_after']} of {sparse_report['edges_before']} "
+              f"edges ({sparse_report['reduction'] * 100:.1f}% fewer), "
+              f"max stretch {sparse_report['max_stretch']:.4f}", file=sys.stderr)
+        sparse_results = run_benchmark(sparse, heuristic, args.algorithms, pairs, args.repeat,
+                                       args.warmup, args.exhaustive_limit, not args.no_memory,
+                                       args.queue, instrumentation, reference_graph=graph)
+        print_table(sparse_results)
+        for r in add_speedup(sparse_results, results):
+            if r.get('speedup') is not None:
+                print(f"{r['algorithm']:<14} speedup x{r['speedup']:.2f}", file=sys.stderr)
+        sparse_report['results'] = sparse_results
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'graph': description,
+            'nodes': graph.num_nodes,
+            'edges': graph.num_edges,
+            'pairs': len(pairs),
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'queue': args.queue,
+        },
+        'results': results,
+    }
+    if sparse_report is not None:
+        report['sparse'] = sparse_report
+    write_report(report, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
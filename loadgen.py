@@ -0,0 +1,166 @@
+"""
+loadgen.py - Load generator for server.py
+Opens `concurrency` keep-alive connections to the route server, sends random
+(or --repeat-fraction repeated) route queries as fast as the server answers,
+and reports throughput plus p50/p95/p99 latency.
+
+    python server.py --port 8080 &
+    python loadgen.py --port 8080 --concurrency 32 --requests 5000 --algorithms A_STAR UCS
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlencode
+
+from benchmark import percentile
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection to the server"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, target, body=None):
+        """Returns: (status, decoded JSON payload)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.writer.write(f"{method} {target} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, json.loads(payload) if payload else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+
+def make_queries(cities, algorithms, count, repeat_fraction, seed):
+    """Random route queries, a repeat_fraction of them drawn from a small hot set"""
+    rng = random.Random(seed)
+
+    def random_query():
+        start, goal = rng.sample(cities, 2)
+        return (rng.choice(algorithms), start, goal)
+
+    hot = [random_query() for _ in range(max(1, count // 100))]
+    return [rng.choice(hot) if rng.random() < repeat_fraction else random_query()
+            for _ in range(count)]
+
+
+async def run_load(host, port, queries, concurrency):
+    """Returns: (latencies in ms, status counts, total seconds, cache hits)"""
+    latencies = []
+    statuses = {}
+    cached = 0
+    position = 0
+
+    async def client():
+        nonlocal position, cached
+        connection = Connection(host, port)
+        try:
+            while position < len(queries):
+                algorithm, start, goal = queries[position]
+                position += 1
+                target = '/route?' + urlencode({'algorithm': algorithm, 'start': start, 'goal': goal})
+                begin = time.perf_counter()
+                status, payload = await connection.request('GET', target)
+                latencies.append((time.perf_counter() - begin) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+                if payload and payload.get('cached'):
+                    cached += 1
+        finally:
+            connection.close()
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - begin, cached
+
+
+async def main_async(args):
+    connection = Connection(args.host, args.port)
+    try:
+        _, payload = await connection.request('GET', '/cities')
+    finally:
+        connection.close()
+    queries = make_queries(payload['cities'], args.algorithms, args.requests,
+                           args.repeat_fraction, args.seed)
+
+    latencies, statuses, seconds, cached = await run_load(args.host, args.port, queries,
+                                                          args.concurrency)
+    latencies.sort()
+    connection = Connection(args.host, args.port)
+    try:
+        _, server_stats = await connection.request('GET', '/stats')
+    finally:
+        connection.close()
+
+    report = {
+        'requests': len(latencies),
+        'concurrency': args.concurrency,
+        'seconds': seconds,
+        'requests_per_second': len(latencies) / seconds if seconds > 0 else 0.0,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'cached_responses': cached,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else None,
+        'server': server_stats,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['requests']} requests, concurrency {args.concurrency}, "
+              f"{seconds:.2f} s ({report['requests_per_second']:.1f} req/s)")
+        print(f"latency ms  p50 {report['p50_ms']:.3f}  p95 {report['p95_ms']:.3f}  "
+              f"p99 {report['p99_ms']:.3f}  max {report['max_ms']:.3f}")
+        print(f"statuses {report['statuses']}, served from cache {cached}, "
+              f"server searches {server_stats['searches']}, coalesced {server_stats['coalesced']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the route server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--algorithms', nargs='+', default=['A_STAR'])
+    parser.add_argument('--repeat-fraction', type=float, default=0.5,
+                        help="share of queries drawn from a small hot set (exercises cache/coalescing)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(main_async(args))
+    except ConnectionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
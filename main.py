@@ -3,8 +3,12 @@ main.py - NY State Route Planner
 Imports algorithms from separate files: ids.py, bfs.py, dfs.py, etc.
 Works with FULLY CONNECTED graph (all cities have direct connections)
 Integrated with Graphviz visualization and graph analysis
+(run with --analyze to print the graph analysis at startup, --sparse to
+search a sparse road network with the same shortest distances, --compare
+to check SMA_STAR / BEAM routes against A_STAR)
 """
 
+import os
 import time
 import sys
 
@@ -58,6 +62,74 @@ except ImportError:
     print("WARNING: ucs.py not found")
     UCS_AVAILABLE = False
 
+try:
+    from Algorithms.bidirectional import BidirectionalUCSAlgorithm, BidirectionalAStarAlgorithm
+    BIDIRECTIONAL_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/bidirectional.py not found")
+    BIDIRECTIONAL_AVAILABLE = False
+
+try:
+    from Algorithms.contraction import CHAlgorithm
+    CH_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/contraction.py not found")
+    CH_AVAILABLE = False
+
+try:
+    from Algorithms.landmarks import LandmarkHeuristic
+    ALT_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/landmarks.py not found")
+    ALT_AVAILABLE = False
+
+try:
+    from Algorithms.dense import DenseUCSAlgorithm, DenseAStarAlgorithm
+    DENSE_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/dense.py not found")
+    DENSE_AVAILABLE = False
+
+try:
+    from Algorithms.memory_bounded import SMAStarAlgorithm, BeamSearchAlgorithm
+    MEMORY_BOUNDED_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/memory_bounded.py not found")
+    MEMORY_BOUNDED_AVAILABLE = False
+
+try:
+    from Algorithms.batch import BatchExecutor
+    BATCH_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/batch.py not found")
+    BATCH_AVAILABLE = False
+
+try:
+    from Algorithms.analysis import GraphAnalysis
+    ANALYSIS_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/analysis.py not found")
+    ANALYSIS_AVAILABLE = False
+
+try:
+    from Algorithms.sparsify import sparsify, distance_error
+    SPARSIFY_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/sparsify.py not found")
+    SPARSIFY_AVAILABLE = False
+
+try:
+    from Algorithms.instrumentation import Instrumentation
+    INSTRUMENTATION_AVAILABLE = True
+except ImportError:
+    print("WARNING: Algorithms/instrumentation.py not found")
+    INSTRUMENTATION_AVAILABLE = False
+
+from Algorithms.compact_graph import as_compact_graph
+from Algorithms.heuristics import HaversineHeuristic, MatrixHeuristic
+from Algorithms.all_pairs import DistanceTable
+from Algorithms.rendering import GraphRenderer
+
 try:
     import graphviz
     GRAPHVIZ_AVAILABLE = True
@@ -74,214 +146,339 @@ except ImportError:
 
 
 class NYRouteGraph:
-    """Graph representation of NY cities with distance data - FULLY CONNECTED"""
+    """
+    Graph representation of NY cities with distance data - FULLY CONNECTED
+    self.graph is a CompactGraph (integer ids + CSR arrays) that still
+    supports the old graph[city][neighbor] lookups
+    Roads can be changed while running (update_edge / add_edge /
+    remove_edge); every change bumps self.version
+    """
 
     def __init__(self, csv_filename='actualDistance.csv'):
         self.filename = csv_filename
         self.cities = []
         self.graph = {}
+        self.version = 0
+        self._trees = {}
+        self._distance_table = None
+        self._renderer = None
+        self._render_futures = set()
         self.load_graph()
 
     def load_graph(self):
         """Load graph using the load_graph function from ids.py"""
         if IDS_AVAILABLE:
-            self.graph, self.cities = ids_load_graph(self.filename)
-            if self.graph:
+            graph, cities = ids_load_graph(self.filename)
+            if graph:
+                self.graph = as_compact_graph(graph, cities)
+                self.cities = self.graph.cities
                 print(f"Graph has been loaded: {len(self.cities)} cities")
-                total_edges = sum(len(neighbors) for neighbors in self.graph.values())
-                print(f"Total directed edges: {total_edges}")
+                print(f"Total directed edges: {self.graph.num_edges}")
         else:
             print("Error: Cannot load graph without ids.py")
             sys.exit(1)
 
+    def distance_table(self, **kwargs):
+        """
+        All-pairs distance/next-hop table for this graph, built on first use
+        (see Algorithms/all_pairs.py for the build options)
+        """
+        if self._distance_table is None:
+            self._distance_table = DistanceTable.build(self.graph, **kwargs)
+        return self._distance_table
+
+    def shortest_path_tree(self, start):
+        """
+        UCS tree from start over every city, built on first use and repaired
+        after each road change (hot starts like Rochester)
+        """
+        tree = self._trees.get(start)
+        if tree is None:
+            tree = UCSAlgorithm(self.graph).search_all(start)
+            self._trees[start] = tree
+        return tree
+
+    def route(self, start, goal):
+        """(path, cost) from start's shortest-path tree"""
+        return self.shortest_path_tree(start).path_to(goal)
+
+    def update_edge(self, city_from, city_to, distance, both_ways=False):
+        """
+        Change one road on the live graph: distance None removes it, a road
+        between two cities that had none is added. The cached shortest-path
+        trees and distance table are repaired instead of rebuilt, and the
+        graph itself is edited in place (no copy per change).
+        Returns: {start city: number of cities whose route was recomputed}
+        """
+        for city in (city_from, city_to):
+            if city not in self.graph:
+                raise ValueError(f"Unknown city: {city}")
+        if city_from == city_to:
+            raise ValueError("A road needs two different cities")
+        if distance is not None and distance <= 0:
+            raise ValueError("Road distance must be positive")
+        u, v = self.graph.index[city_from], self.graph.index[city_to]
+        pairs = [(u, v)] + ([(v, u)] if both_ways else [])
+        # renders still running read the graph, let them finish first
+        self._close_renderer()
+        changes = self.graph.update_edges((a, b, distance) for a, b in pairs)
+        self.version += 1
+        table = self._distance_table
+        if table is not None:
+            if table.graph is self.graph:
+                table.repair(changes)
+            else:
+                table.update_edge(city_from, city_to, distance, both_ways)
+        return {start: tree.repair(self.graph, changes) for start, tree in self._trees.items()}
+
+    def add_edge(self, city_from, city_to, distance, both_ways=False):
+        """Add (or change) a road, see update_edge"""
+        return self.update_edge(city_from, city_to, distance, both_ways)
+
+    def remove_edge(self, city_from, city_to, both_ways=False):
+        """Close a road, see update_edge"""
+        return self.update_edge(city_from, city_to, None, both_ways)
+
+    def sparsify(self, k=None, stretch=1.0):
+        """
+        Swap the road graph for a sparse one (see Algorithms/sparsify.py):
+        stretch=1.0 keeps every shortest distance exact
+        Returns: the report, with the measured distance error added
+        """
+        sparse, report = sparsify(self.graph, k, stretch)
+        report.update(distance_error(self.graph, sparse, sample=None))
+        self.graph = sparse
+        self.version += 1
+        self._trees = {}
+        self._distance_table = None
+        self._close_renderer()
+        print(f"Sparse road network: {report['edges_after']} of {report['edges_before']} "
+              f"directed edges kept ({report['reduction'] * 100:.1f}% fewer), "
+              f"max stretch {report['max_stretch']:.3f}")
+        return report
+
+    def analysis(self):
+        """GraphAnalysis of this graph (see Algorithms/analysis.py), results kept with the graph"""
+        return GraphAnalysis.for_graph(self.graph)
+
     def analyze_graph_properties(self):
-        """Analyze and print basic graph properties"""
+        """Analyze and print graph properties (computed on first request, then cached)"""
         print("\n" + "="*80)
         print("Graph Analysis")
         print("="*80)
 
-        # Basic properties
-        number_of_nodes = len(self.cities)
-        number_of_edges = sum(len(neighbors) for neighbors in self.graph.values()) // 2  # undirected!
+        if not ANALYSIS_AVAILABLE:
+            print("Algorithms/analysis.py not available")
+            print("="*80 + "\n")
+            return None
+        analysis = self.analysis()
+        summary = analysis.summary()
 
-        print(f"Number of Nodes: {number_of_nodes}")
-        print(f"Number of Edges: {number_of_edges}")
+        # Basic properties
+        print(f"Number of Nodes: {summary['nodes']}")
+        number_of_edges = summary['edges'] // 2 if summary['symmetric'] else summary['edges']
+        print(f"Number of Edges: {number_of_edges}{'' if summary['symmetric'] else ' (one-way)'}")
 
-        # Degree stats
-        degrees = []
-        for city in self.cities:
-            degrees.append(len(self.graph.get(city, {})))
-        
-        if degrees:
+        if summary['nodes']:
+            degrees = summary['degrees']['out']
             print(f"\nDegree Statistics:")
-            print(f"  Average Degree: {sum(degrees)/len(degrees):.2f}")
-            print(f"  Min Degree: {min(degrees)}")
-            print(f"  Max Degree: {max(degrees)}")
+            print(f"  Average Degree: {degrees['mean']:.2f}")
+            print(f"  Min Degree: {degrees['min']}")
+            print(f"  Max Degree: {degrees['max']}")
+            print("  Distribution: " + ", ".join(f"{degree}: {count}"
+                                                 for degree, count in degrees['histogram'].items()))
 
-            # Find the most connected cities
-            sorted_degrees = sorted([(city, len(self.graph.get(city, {}))) for city in self.cities], 
-                                   key=lambda x: x[1], reverse=True)
             print(f"\nMost Connected Cities:")
-            for city, deg in sorted_degrees[:5]:
+            for city, deg in analysis.most_connected(5):
                 print(f"  {city}: {deg} connections")
-            
-            # Check connectivity
-            is_connected = self.check_connectivity()
-            print(f"\nGraph appears to be fully connected: {is_connected}")
-        
+
+            print(f"\nGraph appears to be fully connected: {analysis.is_connected()}")
+            print(f"Connected components: {summary['components']} "
+                  f"(largest {summary['largest_component']} cities)")
+            print(f"Strongly connected components: {summary['strong_components']} "
+                  f"(largest {summary['largest_strong_component']} cities)")
+            points = summary['articulation_points']
+            print(f"Articulation points: {', '.join(points) if points else 'none'}")
+            for label, diameter, unit in (('Diameter', summary['diameter_miles'], 'miles'),
+                                          ('Diameter (hops)', summary['diameter_hops'], 'hops')):
+                upper = f", at most {diameter['upper']:.0f}" if diameter['upper'] is not None else ''
+                print(f"{label}: at least {diameter['lower']:.0f} {unit}{upper} "
+                      f"({diameter['ends'][0]} - {diameter['ends'][1]})")
+
         print("="*80 + "\n")
+        return summary
 
     def check_connectivity(self):
-        """Check if the graph is connected using BFS"""
+        """Check if the graph is connected (roads taken as two-way)"""
         if not self.cities:
             return False
-        
-        start = self.cities[0]
-        visited = set()
-        queue = [start]
-        visited.add(start)
-        
-        while queue:
-            current = queue.pop(0)
-            for neighbor in self.graph.get(current, {}).keys():
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        
-        return len(visited) == len(self.cities)
+        return self.analysis().is_connected()
+
+    def renderer(self):
+        """GraphRenderer for this graph: layout computed once, renders in the background"""
+        if self._renderer is None:
+            self._renderer = GraphRenderer(self.graph)
+        return self._renderer
 
     def visualize_graphviz(self, path=None, filename='graph_visualization', format='png', show_all_edges=False):
-        """Create visualization using Graphviz"""
+        """
+        Create visualization using Graphviz. The render runs in the background
+        on the cached layout (see Algorithms/rendering.py); returns its Future,
+        finish_rendering() waits for all of them
+        """
         if not GRAPHVIZ_AVAILABLE:
             print("Graphviz Python package not available for visualization")
-            return
-        
-        print(f"CreaIDSting graph visualization with Graphviz...")
-
-        dot = graphviz.Graph(comment='NY State Cities', engine='neato')
-
-        # Graph attributes for the layout
-        dot.attr(overlap='false')
-        dot.attr(splines='true')
-        dot.attr(sep='+4.0')
-        dot.attr(nodesep='4.0')
-        dot.attr(ranksep='4.0')
-        dot.attr(len='2.5')
-        dot.attr(K='5.0')
-
-        # Add nodes (cities)
-        for city in self.cities:
-            if path and city in path:
-                if city == path[0]:
-                    # Start node - green
-                    dot.node(city, city, shape='circle', style='filled', 
-                            fillcolor='lightgreen', fontsize='14', width='1.2')
-                elif city == path[-1]:
-                    # Goal node - red
-                    dot.node(city, city, shape='doublecircle', style='filled', 
-                            fillcolor='lightcoral', fontsize='14', width='1.2')
-                else:
-                    # Path node - yellow
-                    dot.node(city, city, shape='circle', style='filled', 
-                            fillcolor='yellow', fontsize='12', width='1.0')
-            else:
-                # Regular node - light blue
-                dot.node(city, city, shape='circle', style='filled', 
-                        fillcolor='lightblue', fontsize='10', width='0.8')
-
-        # Add edges
-        added_edges = set()
-
-        if path:
-            # Add path edges highlighted
-            for i in range(len(path) - 1):
-                city_from = path[i]
-                city_to = path[i+1]
-
-                if city_to in self.graph.get(city_from, {}):
-                    distance = self.graph[city_from][city_to]
-                    edge = tuple(sorted([city_from, city_to]))
-
-                    if edge not in added_edges:
-                        dot.edge(city_from, city_to,
-                                 label=f'{distance:.1f}',
-                                 color='red',
-                                 penwidth='3.0',
-                                 fontsize='12',
-                                 fontcolor='red')
-                        added_edges.add(edge)
-
-            if show_all_edges:
-                # Add remaining edges in gray
-                for city_from in self.graph:
-                    for city_to in self.graph[city_from]:
-                        edge = tuple(sorted([city_from, city_to]))
-                        if edge not in added_edges:
-                            distance = self.graph[city_from][city_to]
-                            dot.edge(city_from, city_to,
-                                     label=f'{distance:.1f}', 
-                                    color='gray', 
-                                    penwidth='0.5',
-                                    fontsize='8',
-                                    fontcolor='gray')
-                            added_edges.add(edge)
-        else:
-            # Show all edges
-            for city_from in self.graph:
-                for city_to in self.graph[city_from]:
-                    edge = tuple(sorted([city_from, city_to]))
-                    if edge not in added_edges:
-                        distance = self.graph[city_from][city_to]
-                        # Show edge labels only for shorter distances to reduce clutter
-                        if distance < 100:
-                            dot.edge(city_from, city_to, 
-                                    label=f'{distance:.0f}', 
-                                    color='gray70', 
-                                    penwidth='1.0',
-                                    fontsize='8')
-                        else:
-                            dot.edge(city_from, city_to, 
-                                    color='gray80', 
-                                    penwidth='0.5')
-                        added_edges.add(edge)
+            return None
         
-        # Render the graph
+        print(f"Rendering {filename}.{format} in the background...")
+        future = self.renderer().render(path, filename, format, show_all_edges)
+        if future not in self._render_futures:
+            # a repeated request shares the pending render, report it once
+            self._render_futures.add(future)
+            future.add_done_callback(_report_render)
+        return future
+
+    def finish_rendering(self):
+        """Wait for the background renders to finish"""
+        if self._renderer is not None:
+            self._renderer.wait()
+
+    def _close_renderer(self):
+        """
+        Drop the renderer after the graph changed: its pending renders finish
+        first (they are the only ones left to wait for) and its threads stop
+        """
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
+
+
+def _report_render(future):
+    try:
+        print(f"Graph saved to {future.result()}")
+    except Exception as e:
+        print(f"Error rendering graph: {e}")
+        print("  Make sure Graphviz is installed on your system")
+
+
+def load_heuristic(actualGraph, coordinates_file='cityCoordinates.csv',
+                   matrix_file='straightLineDistance.csv'):
+    """
+    Straight-line heuristic for the informed searches. Uses city lat/lon and
+    Haversine (O(N) memory) when the coordinates file exists, otherwise falls
+    back to the precomputed N x N straight-line matrix
+    """
+    if os.path.exists(coordinates_file):
         try:
-            output_path = dot.render(filename, format=format, cleanup=True)
-            print(f"Graph saved to {output_path}")
-        except Exception as e:
-            print(f"Error rendering graph: {e}")
-            print("  Make sure Graphviz is installed on your system")
+            heuristic = HaversineHeuristic.from_csv(coordinates_file, actualGraph.cities)
+            print(f"Heuristic: Haversine distances from {coordinates_file}")
+            return heuristic
+        except ValueError as e:
+            print(f"WARNING: {e} - falling back to {matrix_file}")
 
+    straightLineGraph = NYRouteGraph(matrix_file)
+    if not straightLineGraph.graph:
+        return None
+    print(f"Heuristic: straight-line matrix from {matrix_file}")
+    return MatrixHeuristic(straightLineGraph.graph, actualGraph.cities)
 
-def run_algorithm(actualGraph, straightlineGraph, algorithm_name, start, goal):
-    """Run selected algorithm using imported classes"""
-    
-    algo = None
-    
+
+# memory-bounded searches, run_algorithm(compare=True) compares their cost with A_STAR's
+BOUNDED_ALGORITHMS = ('SMA_STAR', 'BEAM')
+
+
+def create_algorithm(algorithm_name, graph, heuristic=None, queue='heapq',
+                     memory_limit=None, beam_width=None):
+    """
+    Build the search object for algorithm_name on a graph (CompactGraph or
+    dict-of-dicts). heuristic is a heuristic provider or straight-line matrix.
+    queue picks the frontier of UCS / A* (see Algorithms/priority_queue.py),
+    memory_limit the node budget of SMA_STAR and beam_width the beam of BEAM
+    (None keeps the defaults).
+    Returns None if the algorithm is not available
+    """
     if algorithm_name == "IDS" and IDS_AVAILABLE:
-        algo = IDSAlgorithm(actualGraph.graph)
+        return IDSAlgorithm(graph)
     elif algorithm_name == "BFS" and BFS_AVAILABLE:
-        algo = BFSAlgorithm(actualGraph.graph)
+        return BFSAlgorithm(graph)
     elif algorithm_name == "DFS" and DFS_AVAILABLE:
-        algo = DFSAlgorithm(actualGraph.graph)
+        return DFSAlgorithm(graph)
+    elif algorithm_name == "DFS_BNB" and DFS_AVAILABLE:
+        # anytime branch-and-bound DFS, best route found within one second
+        order = 'heuristic' if heuristic is not None else 'distance'
+        return DFSAlgorithm(graph, order, heuristic, branch_and_bound=True, time_budget=1000)
     elif algorithm_name == "UCS" and UCS_AVAILABLE:
-        algo = UCSAlgorithm(actualGraph.graph)
+        return UCSAlgorithm(graph, queue)
     elif algorithm_name == "GFS" and GFS_AVAILABLE:
-        algo = GFSAlgorithm(actualGraph.graph, straightlineGraph.graph)
+        # lazy goal-ordered successors: same routes, much smaller frontier
+        return GFSAlgorithm(graph, heuristic, goal_directed=True)
     elif algorithm_name == "IDA_STAR" and IDA_AVAILABLE:
-        algo = IDAAlgorithm(actualGraph.graph, straightlineGraph.graph)
+        return IDAAlgorithm(graph, heuristic)
     elif algorithm_name == "A_STAR" and ASTAR_AVAILABLE:
-        algo = AStarAlgorithm(actualGraph.graph, straightlineGraph.graph)
-    else:
+        return AStarAlgorithm(graph, heuristic, queue)
+    elif algorithm_name == "BI_UCS" and BIDIRECTIONAL_AVAILABLE:
+        return BidirectionalUCSAlgorithm(graph)
+    elif algorithm_name == "BI_A_STAR" and BIDIRECTIONAL_AVAILABLE:
+        return BidirectionalAStarAlgorithm(graph, heuristic)
+    elif algorithm_name == "A_STAR_ALT" and ASTAR_AVAILABLE and ALT_AVAILABLE:
+        # landmark (ALT) heuristic instead of straight-line distance
+        return AStarAlgorithm(graph, LandmarkHeuristic.for_graph(graph), queue)
+    elif algorithm_name == "IDA_STAR_ALT" and IDA_AVAILABLE and ALT_AVAILABLE:
+        return IDAAlgorithm(graph, LandmarkHeuristic.for_graph(graph))
+    elif algorithm_name == "UCS_DENSE" and DENSE_AVAILABLE:
+        # whole-row relaxation on the N x N matrix (fully connected data)
+        return DenseUCSAlgorithm(graph)
+    elif algorithm_name == "A_STAR_DENSE" and DENSE_AVAILABLE:
+        return DenseAStarAlgorithm(graph, heuristic)
+    elif algorithm_name == "SMA_STAR" and MEMORY_BOUNDED_AVAILABLE:
+        if memory_limit is None:
+            return SMAStarAlgorithm(graph, heuristic)
+        return SMAStarAlgorithm(graph, heuristic, memory_limit)
+    elif algorithm_name == "BEAM" and MEMORY_BOUNDED_AVAILABLE:
+        if beam_width is None:
+            return BeamSearchAlgorithm(graph, heuristic)
+        return BeamSearchAlgorithm(graph, heuristic, beam_width)
+    elif algorithm_name == "CH" and CH_AVAILABLE:
+        # the hierarchy is preprocessed on first use and kept with the graph
+        return CHAlgorithm(graph)
+    return None
+
+
+def run_algorithm(actualGraph, heuristic, algorithm_name, start, goal,
+                  memory_limit=None, beam_width=None, compare=False):
+    """
+    Run selected algorithm using imported classes
+    heuristic is a provider from load_heuristic() (an NYRouteGraph holding
+    the straight-line matrix also still works)
+    With ROUTE_TRACE / ROUTE_PROFILE set the search is instrumented and
+    result['stats'] holds its record (see Algorithms/instrumentation.py)
+    SMA_STAR / BEAM results also get 'memory' (their memory_stats). With
+    compare=True they also get 'optimal_cost' and 'optimality_gap' from an
+    extra, unbounded A_STAR search - off by default, it needs the very
+    memory these searches are meant to save
+    """
+    
+    if isinstance(heuristic, NYRouteGraph):
+        heuristic = heuristic.graph
+    
+    setup_wall, setup_cpu = time.perf_counter(), time.process_time()
+    algo = create_algorithm(algorithm_name, actualGraph.graph, heuristic,
+                            memory_limit=memory_limit, beam_width=beam_width)
+    if algo is None:
         print(f"Algorithm {algorithm_name} not available")
         return None
+    setup = (time.perf_counter() - setup_wall, time.process_time() - setup_cpu)
     
-    start_time = time.time()
-    path, cost = algo.search(start, goal)
-    end_time = time.time()
+    instrumentation = Instrumentation.from_env() if INSTRUMENTATION_AVAILABLE else None
+    record = None
+    start_time = time.perf_counter()
+    if instrumentation is not None:
+        path, cost, record = instrumentation.run(algo, start, goal, algorithm_name, setup)
+    else:
+        path, cost = algo.search(start, goal)
+    end_time = time.perf_counter()
     
-    return {
+    result = {
         'algorithm': algorithm_name,
         'path': path,
         'cost': cost,
@@ -289,6 +486,84 @@ def run_algorithm(actualGraph, straightlineGraph, algorithm_name, start, goal):
         'runtime': (end_time - start_time) * 1000,
         'stops': len(path) - 1 if path else 0
     }
+    # iterative deepening searches also report each pass (IDS per depth, IDA* per bound)
+    if getattr(algo, 'depth_stats', None):
+        result['iterations'] = algo.depth_stats
+    elif getattr(algo, 'iterations', None):
+        result['iterations'] = algo.iterations
+    if record is not None:
+        result['stats'] = record
+    if algorithm_name in BOUNDED_ALGORITHMS:
+        result['memory'] = algo.memory_stats
+    if algorithm_name in BOUNDED_ALGORITHMS and compare:
+        reference = create_algorithm('A_STAR', actualGraph.graph, heuristic)
+        if reference is not None:
+            reference_path, reference_cost = reference.search(start, goal)
+            result['optimal_cost'] = reference_cost if reference_path else None
+            result['optimality_gap'] = ((cost - reference_cost) / reference_cost
+                                        if path and reference_path and reference_cost else None)
+    return result
+
+
+def run_batch(actualGraph, heuristic, jobs, workers=None):
+    """
+    Run a list of (algorithm, start, goal) jobs over a process pool that
+    shares the compiled graph (see Algorithms/batch.py).
+    Yields result dicts (run_algorithm's keys plus 'index', 'start', 'goal',
+    'cpu' and 'worker') in completion order
+    """
+    if isinstance(heuristic, NYRouteGraph):
+        heuristic = heuristic.graph
+    with BatchExecutor(actualGraph.graph, create_algorithm, heuristic, workers) as pool:
+        yield from pool.run(jobs)
+
+
+def run_all_destinations(actualGraph, heuristic, algorithm_name, start, workers=1):
+    """
+    Run algorithm from start to every other city.
+    UCS and A_STAR answer all destinations from ONE shared search (a
+    shortest-path tree), the other algorithms run one search per city
+    (spread over `workers` processes when workers > 1).
+    Each row's 'expanded'/'runtime' is how far that single search had
+    got when the destination was settled.
+    Returns: list of (destination, result) pairs
+    """
+    destinations = [city for city in sorted(actualGraph.cities) if city != start]
+
+    algo = None
+    if algorithm_name == "UCS" and UCS_AVAILABLE:
+        algo = UCSAlgorithm(actualGraph.graph)
+    elif algorithm_name == "A_STAR" and ASTAR_AVAILABLE:
+        algo = AStarAlgorithm(actualGraph.graph, heuristic)
+
+    if algo is None and workers > 1 and BATCH_AVAILABLE:
+        jobs = [(algorithm_name, start, city) for city in destinations]
+        results = [None] * len(jobs)
+        for result in run_batch(actualGraph, heuristic, jobs, workers):
+            if 'error' in result:
+                print(result['error'])
+            else:
+                results[result['index']] = result
+        return list(zip(destinations, results))
+
+    if algo is None:
+        return [(city, run_algorithm(actualGraph, heuristic, algorithm_name, start, city))
+                for city in destinations]
+
+    tree = algo.search_all(start, destinations)
+    results = []
+    for city in destinations:
+        path, cost = tree.path_to(city)
+        expanded, runtime = tree.settled.get(actualGraph.graph.index[city], (0, 0.0))
+        results.append((city, {
+            'algorithm': algorithm_name,
+            'path': path,
+            'cost': cost,
+            'expanded': expanded,
+            'runtime': runtime,
+            'stops': len(path) - 1 if path else 0
+        }))
+    return results
 
 
 def print_results(result):
@@ -305,6 +580,29 @@ def print_results(result):
     print(f"Number of Stops: {result['stops']}")
     print(f"Nodes Expanded: {result['expanded']}")
     print(f"Runtime: {result['runtime']:.4f} ms")
+    if result.get('iterations'):
+        print("-"*80)
+        print("Per iteration:")
+        for stats in result['iterations']:
+            print("  " + ", ".join(f"{key} {value:.4f}" if isinstance(value, float) else f"{key} {value}"
+                                   for key, value in stats.items()))
+    if result.get('memory'):
+        print("-"*80)
+        print("Memory: " + ", ".join(f"{key} {value}" for key, value in result['memory'].items()))
+        if result.get('optimal_cost') is not None:
+            gap = result['optimality_gap'] or 0.0
+            print(f"A_STAR Distance: {result['optimal_cost']:.2f} miles (gap {gap * 100:.2f}%)")
+    if result.get('stats'):
+        stats = result['stats']
+        print("-"*80)
+        print(f"Generated: {stats['generated']}, Duplicates: {stats['duplicates']}, "
+              f"Max Frontier: {stats['max_frontier']}, Max Depth: {stats['max_depth']}, "
+              f"Heuristic Calls: {stats['heuristic_calls']}")
+        for phase, timing in stats['phases'].items():
+            print(f"  {phase:<10} wall {timing['wall_ms']:.4f} ms, cpu {timing['cpu_ms']:.4f} ms")
+        for row in stats.get('profile', []):
+            print("  " + ", ".join(f"{key} {value:.4f}" if isinstance(value, float) else f"{key} {value}"
+                                   for key, value in row.items()))
     print("="*80 + "\n")
 
 
@@ -317,25 +615,28 @@ def main():
     
     # Load graph
     actualGraph = NYRouteGraph('actualDistance.csv')
-    straightLineGraph = NYRouteGraph('straightLineDistance.csv')
     
     if not actualGraph.graph:
         print("Failed to load graph. Exiting.")
         sys.exit(1)
 
-    if not straightLineGraph.graph:
-        print("Failed to load graph. Exiting.")
+    heuristic = load_heuristic(actualGraph)
+    if heuristic is None:
+        print("Failed to load heuristic data. Exiting.")
         sys.exit(1)
     
-    # Analyze graph properties
-    actualGraph.analyze_graph_properties()
-    straightLineGraph.analyze_graph_properties()
+    # Drop the roads no shortest route needs (python main.py --sparse)
+    if '--sparse' in sys.argv[1:] and SPARSIFY_AVAILABLE:
+        actualGraph.sparsify()
+
+    # Analyze graph properties on request (python main.py --analyze)
+    if '--analyze' in sys.argv[1:]:
+        actualGraph.analyze_graph_properties()
     
     # Create full network visualization
     if GRAPHVIZ_AVAILABLE:
         print("Creating full network visualization...")
         actualGraph.visualize_graphviz(filename='full_network', format='png')
-        straightLineGraph.visualize_graphviz(filename='full_network', format='png')
         print()
     
     # Show available algorithms
@@ -351,6 +652,8 @@ def main():
     if DFS_AVAILABLE:
         algo_list.append("DFS")
         print("  - DFS  (Depth-First Search)")
+        algo_list.append("DFS_BNB")
+        print("  - DFS_BNB  (Branch-and-bound DFS, anytime within 1 s)")
     if UCS_AVAILABLE:
         algo_list.append("UCS")
         print("  - UCS  (Uniform-Cost Search)")
@@ -363,6 +666,30 @@ def main():
     if ASTAR_AVAILABLE:
         algo_list.append("A_STAR")
         print("  - A_STAR")
+    if BIDIRECTIONAL_AVAILABLE:
+        algo_list.append("BI_UCS")
+        print("  - BI_UCS  (Bidirectional Uniform-Cost Search)")
+        algo_list.append("BI_A_STAR")
+        print("  - BI_A_STAR  (Bidirectional A*)")
+    if ALT_AVAILABLE and ASTAR_AVAILABLE:
+        algo_list.append("A_STAR_ALT")
+        print("  - A_STAR_ALT  (A* with landmark heuristic)")
+    if ALT_AVAILABLE and IDA_AVAILABLE:
+        algo_list.append("IDA_STAR_ALT")
+        print("  - IDA_STAR_ALT  (IDA* with landmark heuristic)")
+    if DENSE_AVAILABLE:
+        algo_list.append("UCS_DENSE")
+        print("  - UCS_DENSE  (UCS on the dense distance matrix)")
+        algo_list.append("A_STAR_DENSE")
+        print("  - A_STAR_DENSE  (A* on the dense distance matrix)")
+    if MEMORY_BOUNDED_AVAILABLE:
+        algo_list.append("SMA_STAR")
+        print("  - SMA_STAR  (Memory-bounded A*, 10000-node budget)")
+        algo_list.append("BEAM")
+        print("  - BEAM  (Beam search, 16 nodes per layer)")
+    if CH_AVAILABLE:
+        algo_list.append("CH")
+        print("  - CH  (Contraction Hierarchies)")
     
     if not algo_list:
         print("ERROR: No algorithm files found!")
@@ -403,7 +730,8 @@ def main():
     print(f"\nRunning {algorithm}: {start} → {goal}\n")
     
     # Run search
-    result = run_algorithm(actualGraph, straightLineGraph, algorithm, start, goal)
+    result = run_algorithm(actualGraph, heuristic, algorithm, start, goal,
+                           compare='--compare' in sys.argv[1:])
     
     # Print results
     print_results(result)
@@ -438,11 +766,7 @@ def main():
         print("-"*80)
         
         results = []
-        for city in sorted(actualGraph.cities):
-            if city == start:
-                continue
-            
-            result = run_algorithm(actualGraph, straightLineGraph, algorithm, start, city)
+        for city, result in run_all_destinations(actualGraph, heuristic, algorithm, start):
             if result and result['path']:
                 print(f"{city:<20} {result['cost']:<12.2f} {result['stops']:<8} "
                       f"{result['expanded']:<10} {result['runtime']:<.4f}")
@@ -464,6 +788,7 @@ def main():
             print(f"Average Nodes Expanded: {avg_expanded:.2f}")
             print(f"Average Computaion Time: {avg_time:.4f}")
     
+    actualGraph.finish_rendering()
     print("\n✓ Complete!")
     
     if GRAPHVIZ_AVAILABLE:
@@ -0,0 +1,387 @@
+"""
+server.py - Long-running route-planning server (asyncio, HTTP/JSON)
+Loads the graph and heuristic once, then answers queries over HTTP so
+clients skip the process startup and graph load of main.py:
+
+    GET  /route?algorithm=A_STAR&start=Rochester&goal=Buffalo
+    POST /route          {"algorithm": "A_STAR", "start": "Rochester", "goal": "Buffalo"}
+    GET  /cities         list of city names
+    GET  /stats          cache / coalescing / search counters
+    GET  /health
+    POST /reload         re-read the CSV and bump the graph version
+    POST /edge           {"from": "Rochester", "to": "Buffalo", "distance": 80.5,
+                          "both_ways": true} changes one road (distance null
+                          closes it) and bumps the graph version
+
+Searches run in a process pool sharing the mmap'd graph (Algorithms/batch.py).
+Identical queries that arrive while one is already running wait for that
+search instead of starting their own, and finished results are kept in an
+LRU cache keyed by (graph version, algorithm, start, goal).
+
+algorithm=TREE answers in-process from the shortest-path tree of a
+--hot-start city, built at load time. Those are the only trees kept: TREE
+from any other city is a plain UCS query for the workers. POST /edge repairs
+the trees instead of rebuilding them (see Algorithms/path_tree.py) and
+passes the change on to the workers with their next jobs; only every
+MAX_EDITS changes do they restart on a fresh copy of the graph.
+
+    python server.py --port 8080 --workers 4
+    python loadgen.py --port 8080 --concurrency 32 --requests 5000
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import time
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from urllib.parse import parse_qs, urlsplit
+
+with redirect_stdout(io.StringIO()):
+    # main.py prints a warning for every optional piece that is missing
+    from main import NYRouteGraph, create_algorithm, load_heuristic
+
+from Algorithms.batch import BatchExecutor
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+MAX_BODY = 1 << 16
+# road changes sent along with each job before the workers get a fresh graph file
+MAX_EDITS = 64
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResultCache:
+    """Small LRU of finished query results"""
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        if self.size <= 0:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class RouteServer:
+    """Holds the graph, worker pool, result cache and in-flight searches"""
+
+    def __init__(self, csv_filename='actualDistance.csv', workers=None, cache_size=4096,
+                 hot_starts=()):
+        self.csv_filename = csv_filename
+        self.workers = workers
+        self.hot_starts = list(hot_starts)
+        self.cache = ResultCache(cache_size)
+        self.version = 0
+        self.in_flight = {}
+        self.counters = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'searches': 0, 'errors': 0}
+        self.route_graph = None
+        self.heuristic = None
+        self.pool = None
+        # /edge and /reload change the graph or the pool, one at a time
+        self._update_lock = asyncio.Lock()
+        self._swap(*self._build())
+
+    def _build(self):
+        """
+        Load the graph, hot-start trees and heuristic and start a worker pool
+        on them, without touching the server (runs in an executor thread on
+        /reload). main.py's load messages are silenced for this call only.
+        Returns: (route_graph, heuristic, pool)
+        """
+        with redirect_stdout(io.StringIO()):
+            route_graph = NYRouteGraph(self.csv_filename)
+            for city in self.hot_starts:
+                if city in route_graph.graph:
+                    route_graph.shortest_path_tree(city)
+            heuristic = load_heuristic(route_graph)
+        return route_graph, heuristic, self._new_pool(route_graph.graph, heuristic)
+
+    def _new_pool(self, graph, heuristic):
+        """Worker pool on graph (writes the graph file, so off the event loop when serving)"""
+        return BatchExecutor(graph, create_algorithm, heuristic, self.workers)
+
+    def _swap(self, route_graph, heuristic, pool):
+        """
+        Put a new graph/heuristic/pool in place under a new version.
+        Returns: the old pool (or None), for the caller to close
+        """
+        old_pool = self.pool
+        self.route_graph, self.heuristic, self.pool = route_graph, heuristic, pool
+        # results cached under the old version are never hit again and age out of the LRU
+        self.version += 1
+        return old_pool
+
+    async def reload(self):
+        """Re-read the CSV in an executor thread, then swap it in on the event loop"""
+        loop = asyncio.get_running_loop()
+        async with self._update_lock:
+            built = await loop.run_in_executor(None, self._build)
+            old_pool = self._swap(*built)
+        await loop.run_in_executor(None, old_pool.close)
+
+    async def update_edge(self, city_from, city_to, distance, both_ways=False):
+        """
+        Change one road and repair the hot-start trees (on the event loop, so
+        no TREE query sees a half-repaired tree). The workers get the change
+        with their next job; after MAX_EDITS changes a pool on a fresh copy
+        of the graph is built in an executor thread and replaces them.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._update_lock:
+            route_graph = self.route_graph
+            graph = route_graph.graph
+            repaired = route_graph.update_edge(city_from, city_to, distance, both_ways)
+            u, v = graph.index[city_from], graph.index[city_to]
+            self.pool.update_edges([(u, v, distance)] + ([(v, u, distance)] if both_ways else []))
+            self.version += 1
+            if len(self.pool.edits) < MAX_EDITS:
+                return repaired
+            # no other edit can run until the new pool is in place (the lock)
+            pool = await loop.run_in_executor(None, self._new_pool, graph, self.heuristic)
+            old_pool = self._swap(route_graph, self.heuristic, pool)
+        await loop.run_in_executor(None, old_pool.close)
+        return repaired
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    async def route(self, algorithm, start, goal):
+        """Answer one query from the cache, an identical running search, or a new search"""
+        cities = self.route_graph.graph.index
+        for city in (start, goal):
+            if city not in cities:
+                raise RequestError(404, f"Unknown city: {city}")
+
+        key = (self.version, algorithm, start, goal)
+        result = self.cache.get(key)
+        if result is not None:
+            self.counters['cache_hits'] += 1
+            return dict(result, cached=True)
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.counters['coalesced'] += 1
+            return dict(await asyncio.shield(future), cached=False)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        self.counters['searches'] += 1
+        try:
+            if algorithm == 'TREE' and start in self.hot_starts:
+                raw = self.tree_route(start, goal)
+            else:
+                # a cold TREE start is answered by a worker, without keeping its tree
+                name = 'UCS' if algorithm == 'TREE' else algorithm
+                raw = await asyncio.wrap_future(self.pool.submit(name, start, goal))
+            if 'error' in raw:
+                raise RequestError(400, raw['error'])
+            result = {
+                'algorithm': algorithm,
+                'start': start,
+                'goal': goal,
+                'path': raw['path'],
+                'cost': raw['cost'],
+                'stops': raw['stops'],
+                'expanded': raw['expanded'],
+                'runtime': raw['runtime'],
+                'version': key[0],
+            }
+            self.cache.put(key, result)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # waiters re-raise it, don't warn about it being unretrieved here
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+        return dict(result, cached=False)
+
+    def tree_route(self, start, goal):
+        """Route read off a hot start's shortest-path tree, same fields as a worker result"""
+        begin = time.perf_counter()
+        tree = self.route_graph.shortest_path_tree(start)
+        path, cost = tree.path_to(goal)
+        return {'path': path, 'cost': cost, 'stops': len(path) - 1 if path else 0,
+                'expanded': tree.expanded_nodes, 'runtime': (time.perf_counter() - begin) * 1000}
+
+    def stats(self):
+        return dict(self.counters, version=self.version, graph_version=self.route_graph.version,
+                    trees=sorted(self.route_graph._trees), pending_edits=len(self.pool.edits),
+                    cached_results=len(self.cache.entries),
+                    in_flight=len(self.in_flight), workers=self.pool.workers,
+                    cities=len(self.route_graph.cities))
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/route':
+            if method == 'GET':
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            elif method == 'POST':
+                try:
+                    query = json.loads(body or b'{}')
+                except ValueError:
+                    raise RequestError(400, "Body is not valid JSON")
+                if not isinstance(query, dict):
+                    raise RequestError(400, "Body must be a JSON object")
+            else:
+                raise RequestError(405, f"{method} not allowed on /route")
+            missing = [k for k in ('start', 'goal') if not query.get(k)]
+            if missing:
+                raise RequestError(400, f"Missing {', '.join(missing)}")
+            algorithm = str(query.get('algorithm', 'A_STAR')).upper()
+            return await self.route(algorithm, str(query['start']), str(query['goal']))
+        if url.path == '/cities':
+            return {'cities': list(self.route_graph.cities), 'version': self.version}
+        if url.path == '/stats':
+            return self.stats()
+        if url.path == '/health':
+            return {'status': 'ok', 'version': self.version}
+        if url.path == '/reload':
+            if method != 'POST':
+                raise RequestError(405, "Use POST /reload")
+            await self.reload()
+            return {'status': 'reloaded', 'version': self.version}
+        if url.path == '/edge':
+            if method != 'POST':
+                raise RequestError(405, "Use POST /edge")
+            try:
+                change = json.loads(body or b'{}')
+            except ValueError:
+                raise RequestError(400, "Body is not valid JSON")
+            if not isinstance(change, dict):
+                raise RequestError(400, "Body must be a JSON object")
+            missing = [k for k in ('from', 'to') if not change.get(k)]
+            if missing or 'distance' not in change:
+                raise RequestError(400, f"Missing {', '.join(missing or ['distance'])}")
+            distance = change['distance']
+            if distance is not None and (isinstance(distance, bool)
+                                         or not isinstance(distance, (int, float))):
+                raise RequestError(400, "distance must be a number or null")
+            try:
+                repaired = await self.update_edge(str(change['from']), str(change['to']), distance,
+                                                  bool(change.get('both_ways', False)))
+            except ValueError as e:
+                raise RequestError(400, str(e))
+            return {'status': 'updated', 'version': self.version,
+                    'graph_version': self.route_graph.version, 'repaired': repaired}
+        raise RequestError(404, f"No such endpoint: {url.path}")
+
+    async def handle_connection(self, reader, writer):
+        """One HTTP/1.1 connection, kept alive until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                self.counters['requests'] += 1
+                try:
+                    length = headers.get('content-length', '0') or '0'
+                    if not length.isdecimal():
+                        # the body can't be skipped, so the connection can't be reused
+                        keep_alive = False
+                        raise RequestError(400, f"Invalid Content-Length: {length}")
+                    length = int(length)
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise RequestError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = 200, await self.dispatch(method.upper(), target, body)
+                except RequestError as e:
+                    self.counters['errors'] += 1
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                             .encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(route_server, host, port):
+    server = await asyncio.start_server(route_server.handle_connection, host, port)
+    addresses = ', '.join(str(s.getsockname()) for s in server.sockets)
+    print(f"Route server listening on {addresses} "
+          f"({len(route_server.route_graph.cities)} cities, {route_server.pool.workers} workers)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve route queries over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--csv', default='actualDistance.csv')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="search processes (default: one per core)")
+    parser.add_argument('--cache-size', type=int, default=4096,
+                        help="results kept in the LRU cache (0 = off)")
+    parser.add_argument('--hot-start', nargs='*', default=['Rochester'],
+                        help="start cities whose shortest-path tree is kept (algorithm=TREE)")
+    args = parser.parse_args(argv)
+
+    begin = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        route_server = RouteServer(args.csv, args.workers, args.cache_size, args.hot_start)
+    print(f"Graph loaded in {(time.perf_counter() - begin) * 1000:.1f} ms")
+    try:
+        asyncio.run(serve(route_server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        route_server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import random
+
+from Algorithms.a_star import MAX_HEURISTIC_GOALS, AStarAlgorithm
+from Algorithms.generators import make_graph
+from Algorithms.ucs import UCSAlgorithm
+
+
+def test_search_all_matches_ucs_for_few_and_many_goals():
+    graph, heuristic = make_graph('geometric', 300, 5)
+    rng = random.Random(5)
+    ucs = UCSAlgorithm(graph)
+    for count in (1, 3, MAX_HEURISTIC_GOALS + 1, 60):
+        start = rng.choice(graph.cities)
+        goals = rng.sample(graph.cities, count)
+        tree = AStarAlgorithm(graph, heuristic).search_all(start, goals)
+        for goal in goals:
+            path, cost = tree.path_to(goal)
+            expected_path, expected = ucs.search(start, goal)
+            assert (path is None) == (expected_path is None)
+            assert abs(cost - expected) < 1e-6
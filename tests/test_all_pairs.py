@@ -0,0 +1,46 @@
+import random
+
+from Algorithms.all_pairs import INF, DistanceTable, dijkstra_row
+from Algorithms.generators import make_graph
+
+
+def check_table(table):
+    graph = table.graph
+    for u in range(graph.num_nodes):
+        expected, _ = dijkstra_row(graph, u)
+        for v in range(graph.num_nodes):
+            start, goal = graph.cities[u], graph.cities[v]
+            distance = table.distance(start, goal)
+            if expected[v] == INF:
+                assert distance == INF
+                continue
+            assert abs(distance - expected[v]) < 1e-6
+            path, cost = table.path(start, goal)
+            ids = [graph.index[city] for city in path]
+            assert abs(graph.path_cost(ids) - expected[v]) < 1e-6
+
+
+def test_build_matches_dijkstra():
+    for method in ('floyd', 'dijkstra'):
+        graph, _ = make_graph('geometric', 60, 3)
+        check_table(DistanceTable.build(graph, method))
+
+
+def test_incremental_updates_match_a_fresh_dijkstra():
+    rng = random.Random(6)
+    for kind, method in (('geometric', 'dijkstra'), ('scalefree', 'floyd'), ('complete', 'floyd')):
+        graph, _ = make_graph(kind, 40, 7)
+        table = DistanceTable.build(graph, method)
+        for _ in range(25):
+            a, b = rng.sample(range(graph.num_nodes), 2)
+            old = graph.weight(a, b, None)
+            roll = rng.random()
+            if old is not None and roll < 0.25:
+                distance = None
+            elif old is not None and roll < 0.6:
+                distance = old * rng.uniform(1.1, 4.0)
+            else:
+                distance = rng.uniform(1, 60)
+            table.update_edge(graph.cities[a], graph.cities[b], distance,
+                              both_ways=rng.random() < 0.5)
+            check_table(table)
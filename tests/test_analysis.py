@@ -0,0 +1,104 @@
+import random
+from collections import deque
+
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.analysis import GraphAnalysis
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+
+
+def two_way(cities, roads):
+    index = {city: i for i, city in enumerate(cities)}
+    edges = []
+    for a, b, w in roads:
+        edges += [(index[a], index[b], w), (index[b], index[a], w)]
+    return CompactGraph.from_edges(cities, edges)
+
+
+def reachable(graph, source, removed=None):
+    seen = {source}
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        for v in graph.neighbor_ids(u):
+            if v != removed and v not in seen:
+                seen.add(v)
+                queue.append(v)
+    return seen
+
+
+def test_hand_built_components_and_cut_vertices():
+    # triangle ABC - bridge C-D - D-E - triangle EFG, plus a separate pair H-I
+    graph = two_way('ABCDEFGHI', [('A', 'B', 1), ('B', 'C', 1), ('C', 'A', 1), ('C', 'D', 2),
+                                  ('D', 'E', 2), ('E', 'F', 1), ('F', 'G', 1), ('G', 'E', 1),
+                                  ('H', 'I', 5)])
+    analysis = GraphAnalysis(graph)
+    assert [sorted(c) for c in analysis.components()] == [list('ABCDEFG'), ['H', 'I']]
+    assert not analysis.is_connected()
+    assert sorted(analysis.articulation_points()) == ['C', 'D', 'E']
+    assert analysis.symmetric()
+    # A/B to F/G: 1 + 2 + 2 + 1
+    assert analysis.eccentricity('A') == ('F', 6) or analysis.eccentricity('A') == ('G', 6)
+
+
+def test_hand_built_strong_components():
+    # cycle 1 -> 2 -> 3 -> 1, then 3 -> 4, cycle 4 <-> 5, then 5 -> 6 and nothing back;
+    # taken as two-way roads that is a triangle with a tail 3-4-5-6
+    cities = ['1', '2', '3', '4', '5', '6']
+    edges = [(0, 1, 1), (1, 2, 1), (2, 0, 1), (2, 3, 1), (3, 4, 1), (4, 3, 1), (4, 5, 1)]
+    analysis = GraphAnalysis(CompactGraph.from_edges(cities, edges))
+    assert [sorted(c) for c in analysis.strong_components()] == [['1', '2', '3'], ['4', '5'], ['6']]
+    assert analysis.is_connected()
+    assert sorted(analysis.articulation_points()) == ['3', '4', '5']
+    assert not analysis.symmetric()
+    assert analysis.diameter()['upper'] is None
+
+
+def test_random_graphs_match_brute_force():
+    rng = random.Random(4)
+    for _ in range(20):
+        n = rng.randint(2, 25)
+        cities = [str(i) for i in range(n)]
+        edges = [(rng.randrange(n), rng.randrange(n), 1.0) for _ in range(rng.randint(0, 2 * n))]
+        edges = [(u, v, w) for u, v, w in edges if u != v]
+        directed = CompactGraph.from_edges(cities, edges)
+        undirected = CompactGraph.from_edges(cities, edges + [(v, u, w) for u, v, w in edges])
+        analysis = GraphAnalysis(directed)
+
+        groups = {frozenset(reachable(undirected, u)) for u in range(n)}
+        assert sorted(map(sorted, analysis.components())) == \
+            sorted(sorted(cities[u] for u in group) for group in groups)
+
+        def pieces(removed):
+            left, count = set(range(n)) - {removed}, 0
+            while left:
+                left -= reachable(undirected, left.pop(), removed)
+                count += 1
+            return count
+        # a cut vertex leaves more pieces behind than there were components
+        # (an isolated city leaves one fewer, the rest leave the same number)
+        cut = [cities[u] for u in range(n)
+               if pieces(u) > len(groups) - (len(reachable(undirected, u)) == 1)]
+        assert sorted(analysis.articulation_points()) == sorted(cut)
+
+        reach = [reachable(directed, u) for u in range(n)]
+        strong = {frozenset(v for v in reach[u] if u in reach[v]) for u in range(n)}
+        assert sorted(map(sorted, analysis.strong_components())) == \
+            sorted(sorted(cities[u] for u in group) for group in strong)
+
+
+def test_diameter_bounds_hold_on_generated_graphs():
+    for kind in ('geometric', 'grid', 'scalefree'):
+        for seed in range(3):
+            graph, _ = make_graph(kind, 150, seed)
+            analysis = GraphAnalysis(graph)
+            largest = [graph.index[city] for city in analysis.components()[0]]
+            true = max(d for u in largest for d in dijkstra_row(graph, u)[0] if d != INF)
+            bounds = analysis.diameter()
+            assert bounds['lower'] <= true + 1e-9
+            if bounds['upper'] is not None:
+                assert true <= bounds['upper'] + 1e-9
+            else:
+                assert not (analysis.symmetric() and analysis.is_connected())
+            a, b = (graph.index[city] for city in bounds['ends'])
+            assert abs(dijkstra_row(graph, a)[0][b] - bounds['lower']) < 1e-9
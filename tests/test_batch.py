@@ -0,0 +1,34 @@
+from Algorithms.batch import BatchExecutor
+from Algorithms.generators import make_graph
+from Algorithms.ucs import UCSAlgorithm
+
+
+class FailingSearch:
+    expanded_nodes = 0
+
+    def search(self, start, goal):
+        raise RuntimeError(f"no route from {start}")
+
+
+def factory(name, graph, heuristic):
+    if name == 'FAIL':
+        return FailingSearch()
+    if name == 'UCS':
+        return UCSAlgorithm(graph)
+    return None
+
+
+def test_a_failing_chunk_only_fails_its_own_jobs():
+    graph, _ = make_graph('grid', 49, 0)
+    start, goal = graph.cities[0], graph.cities[-1]
+    jobs = [('UCS', start, goal)] * 4 + [('FAIL', start, goal)] + [('NOPE', start, goal)]
+    with BatchExecutor(graph, factory, workers=2, chunk_size=2) as pool:
+        results = sorted(pool.run(jobs), key=lambda result: result['index'])
+    assert [result['index'] for result in results] == list(range(len(jobs)))
+    _, expected = UCSAlgorithm(graph).search(start, goal)
+    for result in results[:4]:
+        assert 'error' not in result and abs(result['cost'] - expected) < 1e-6
+    # the failing job shares its chunk with the unknown algorithm
+    assert 'RuntimeError' in results[4]['error']
+    assert results[4]['path'] is None
+    assert 'error' in results[5]
@@ -0,0 +1,54 @@
+import random
+
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.bidirectional import BidirectionalAStarAlgorithm, BidirectionalUCSAlgorithm
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+
+
+def one_way(graph, rng):
+    """Directed copy: roads get longer by different amounts each way, some become
+    one-way, and a few cities lose every road in, so nothing reaches them"""
+    sinks = set(rng.sample(range(graph.num_nodes), 3))
+    edges = []
+    for u in range(graph.num_nodes):
+        for v, w in graph.edges(u):
+            if v not in sinks and (u < v or rng.random() < 0.6):
+                edges.append((u, v, w * rng.uniform(1.0, 2.0)))
+    return CompactGraph.from_edges(graph.cities, edges), sinks
+
+
+def check_against_dijkstra(graph, heuristic, rng, sources=6):
+    searches = [BidirectionalUCSAlgorithm(graph), BidirectionalAStarAlgorithm(graph, heuristic)]
+    for source in rng.sample(range(graph.num_nodes), sources):
+        dist, _ = dijkstra_row(graph, source)
+        for goal in rng.sample(range(graph.num_nodes), 15):
+            for search in searches:
+                path, cost = search.search(graph.cities[source], graph.cities[goal])
+                if dist[goal] == INF:
+                    assert (path, cost) == (None, 0)
+                    continue
+                assert abs(cost - dist[goal]) < 1e-6
+                ids = [graph.index[city] for city in path]
+                assert ids[0] == source and ids[-1] == goal
+                assert abs(graph.path_cost(ids) - cost) < 1e-6
+
+
+def test_matches_dijkstra_on_generated_graphs():
+    rng = random.Random(7)
+    for kind in ('geometric', 'grid', 'scalefree'):
+        graph, heuristic = make_graph(kind, 200, 3)
+        check_against_dijkstra(graph, heuristic, rng)
+
+
+def test_matches_dijkstra_on_one_way_roads():
+    rng = random.Random(8)
+    for seed in range(4):
+        graph, heuristic = make_graph('geometric', 200, seed)
+        directed, sinks = one_way(graph, rng)
+        check_against_dijkstra(directed, heuristic, rng)
+        start = next(c for c in range(directed.num_nodes) if c not in sinks)
+        for goal in sinks:
+            for search in (BidirectionalUCSAlgorithm(directed),
+                           BidirectionalAStarAlgorithm(directed, heuristic)):
+                assert search.search(directed.cities[start], directed.cities[goal]) == (None, 0)
@@ -0,0 +1,29 @@
+from Algorithms.analysis import GraphAnalysis
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+from Algorithms.graph_cache import open_cache, save_graph
+
+
+def typecodes(graph):
+    return [getattr(values, 'typecode', None) or values.format
+            for values in (graph.offsets, graph.neighbors, graph.weights)]
+
+
+def test_every_builder_uses_int64_ids(tmp_path):
+    graph, _ = make_graph('geometric', 50, 0)
+    path = str(tmp_path / 'graph.bin')
+    save_graph(graph, path)
+    built = [graph, graph.reversed(), graph.with_edges([(0, 1, 2.0)]), graph.reindex(graph.cities[::-1]),
+             CompactGraph.from_dict(graph.to_dict()), open_cache(path)]
+    for other in built:
+        assert typecodes(other) == ['q', 'q', 'd']
+    assert graph.ordered_arrays('name')[0].typecode == 'q'
+
+
+def test_mapped_and_built_graphs_compare_equal(tmp_path):
+    graph, _ = make_graph('grid', 36, 0)
+    path = str(tmp_path / 'grid.bin')
+    save_graph(graph, path)
+    mapped = open_cache(path)
+    assert mapped.neighbors == graph.neighbors and mapped.offsets == graph.offsets
+    assert GraphAnalysis(mapped).symmetric()
@@ -0,0 +1,27 @@
+import random
+
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.contraction import CHAlgorithm, ContractionHierarchy
+from Algorithms.generators import make_graph
+
+
+def test_ch_queries_match_dijkstra(tmp_path):
+    rng = random.Random(8)
+    for kind in ('geometric', 'grid', 'scalefree'):
+        graph, _ = make_graph(kind, 150, 9)
+        hierarchy = ContractionHierarchy.build(graph)
+        path = str(tmp_path / f'{kind}.ch')
+        hierarchy.save(path)
+        for algo in (CHAlgorithm(graph, hierarchy),
+                     CHAlgorithm(graph, ContractionHierarchy.load(path))):
+            for source in rng.sample(range(graph.num_nodes), 5):
+                expected, _ = dijkstra_row(graph, source)
+                for target in rng.sample(range(graph.num_nodes), 20):
+                    route, cost = algo.search(graph.cities[source], graph.cities[target])
+                    if expected[target] == INF:
+                        assert route is None
+                        continue
+                    assert abs(cost - expected[target]) < 1e-6
+                    ids = [graph.index[city] for city in route]
+                    assert ids[0] == source and ids[-1] == target
+                    assert abs(graph.path_cost(ids) - cost) < 1e-6
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from Algorithms import dense
+from Algorithms.a_star import AStarAlgorithm
+from Algorithms.dense import DenseAStarAlgorithm, DenseUCSAlgorithm
+from Algorithms.generators import make_graph
+from Algorithms.ucs import UCSAlgorithm
+
+
+def graphs():
+    """A complete graph, and a sparse one where the last city has no road in"""
+    complete, complete_h = make_graph('complete', 120, 1)
+    sparse, sparse_h = make_graph('geometric', 150, 1)
+    last = sparse.num_nodes - 1
+    cut = [(u, last, None) for u in range(sparse.num_nodes) if sparse.has_edge(u, last)]
+    return [(complete, complete_h), (sparse.with_edges(cut), sparse_h)]
+
+
+def check_against_heap_searches(graph, heuristic):
+    rng = random.Random(6)
+    pairs = [rng.sample(graph.cities, 2) for _ in range(25)] + [(graph.cities[0], graph.cities[-1])]
+    for fast, slow in ((DenseUCSAlgorithm(graph), UCSAlgorithm(graph)),
+                       (DenseAStarAlgorithm(graph, heuristic), AStarAlgorithm(graph, heuristic))):
+        for start, goal in pairs:
+            path, cost = fast.search(start, goal)
+            expected_path, expected = slow.search(start, goal)
+            assert (path is None) == (expected_path is None)
+            if path is None:
+                assert cost == 0
+                continue
+            assert isinstance(cost, float)
+            assert abs(cost - expected) < 1e-6
+            assert path[0] == start and path[-1] == goal
+            assert abs(graph.path_cost([graph.index[city] for city in path]) - cost) < 1e-6
+
+
+def test_numpy_engine_matches_heap_searches():
+    np = pytest.importorskip('numpy')
+    assert dense.NUMPY_AVAILABLE
+    for graph, heuristic in graphs():
+        check_against_heap_searches(graph, heuristic)
+        assert isinstance(dense.dense_matrix(graph), np.ndarray)
+
+
+def test_list_engine_matches_heap_searches(monkeypatch):
+    monkeypatch.setattr(dense, 'NUMPY_AVAILABLE', False)
+    for graph, heuristic in graphs():
+        check_against_heap_searches(graph, heuristic)
+        assert isinstance(dense.dense_matrix(graph), list)
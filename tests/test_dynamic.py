@@ -0,0 +1,83 @@
+import random
+
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+from Algorithms.graph_cache import open_cache, save_graph
+from Algorithms.ucs import UCSAlgorithm
+
+
+def random_changes(graph, count, rng):
+    """(u, v, distance) changes mixing longer, shorter, closed and new roads"""
+    changes = []
+    for _ in range(count):
+        u = rng.randrange(graph.num_nodes)
+        row = list(graph.edges(u))
+        kind = rng.random()
+        if row and kind < 0.7:
+            v, w = rng.choice(row)
+            changes.append((u, v, None if kind < 0.2 else w * rng.uniform(0.3, 3.0)))
+        else:
+            v = rng.randrange(graph.num_nodes)
+            if v != u:
+                changes.append((u, v, rng.uniform(1, 50)))
+    return changes
+
+
+def edge_list(graph):
+    return sorted((u, v, w) for u in range(graph.num_nodes) for v, w in graph.edges(u))
+
+
+def test_update_edges_matches_a_rebuild():
+    rng = random.Random(1)
+    graph, _ = make_graph('geometric', 150, 1)
+    reverse = graph.reversed()
+    for _ in range(20):
+        changes = random_changes(graph, 5, rng)
+        expected = graph.with_edges(changes)
+        graph.update_edges(changes)
+        assert edge_list(graph) == edge_list(expected)
+        assert graph.reversed() is reverse
+        flipped = CompactGraph.from_edges(graph.cities, ((v, u, w) for u, v, w in edge_list(graph)))
+        assert edge_list(reverse) == edge_list(flipped)
+
+
+def test_update_edges_on_a_mapped_cache(tmp_path):
+    graph, _ = make_graph('grid', 64, 0)
+    path = str(tmp_path / 'grid.graphcache')
+    save_graph(graph, path)
+    mapped = open_cache(path)
+    changes = random_changes(mapped, 10, random.Random(2))
+    mapped.update_edges(changes)
+    assert mapped.cache_path is None
+    assert edge_list(mapped) == edge_list(graph.with_edges(changes))
+
+
+def test_repaired_trees_match_a_fresh_search():
+    rng = random.Random(3)
+    for kind in ('geometric', 'grid', 'scalefree'):
+        graph, _ = make_graph(kind, 120, 4)
+        starts = rng.sample(graph.cities, 3)
+        trees = {start: UCSAlgorithm(graph).search_all(start) for start in starts}
+        for _ in range(15):
+            changes = graph.update_edges(random_changes(graph, rng.randint(1, 3), rng))
+            for start, tree in trees.items():
+                tree.repair(graph, changes)
+                fresh = UCSAlgorithm(graph).search_all(start)
+                assert tree.cost.keys() == fresh.cost.keys()
+                for node, cost in fresh.cost.items():
+                    assert abs(tree.cost[node] - cost) < 1e-6
+                    path = tree.path_ids(node)
+                    assert abs(graph.path_cost(path) - cost) < 1e-6
+
+
+def test_road_changes_close_the_old_renderer():
+    from main import NYRouteGraph
+
+    route_graph = NYRouteGraph('actualDistance.csv')
+    renderer = route_graph.renderer()
+    job = renderer._pool.submit(lambda: 'rendered')
+    route_graph.update_edge('Rochester', 'Buffalo', 70.0, both_ways=True)
+    assert job.result() == 'rendered'
+    assert renderer._pool._shutdown
+    assert route_graph.renderer() is not renderer
+    route_graph.finish_rendering()
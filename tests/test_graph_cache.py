@@ -0,0 +1,32 @@
+import os
+import struct
+
+from Algorithms.graph_cache import HEADER, MTIME_OFFSET, cache_path, load_cached_graph
+
+
+def write_edges(tmp_path):
+    path = tmp_path / 'roads.csv'
+    path.write_text('from,to,distance\nA,B,5\nB,C,7\n')
+    return str(path)
+
+
+def cached_mtime(filename):
+    with open(cache_path(filename), 'rb') as f:
+        return struct.unpack_from('<q', f.read(HEADER.size), MTIME_OFFSET)[0]
+
+
+def test_cache_is_kept_per_loader_options(tmp_path):
+    filename = write_edges(tmp_path)
+    assert load_cached_graph(filename, directed=True).num_edges == 2
+    assert load_cached_graph(filename).num_edges == 4
+    assert load_cached_graph(filename, 'edges', directed=True).num_edges == 2
+
+
+def test_touched_source_refreshes_the_stored_mtime(tmp_path):
+    filename = write_edges(tmp_path)
+    load_cached_graph(filename)
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    graph = load_cached_graph(filename)
+    assert graph.cache_path == cache_path(filename)
+    assert cached_mtime(filename) == os.stat(filename).st_mtime_ns
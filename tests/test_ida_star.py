@@ -0,0 +1,38 @@
+import random
+
+from Algorithms.generators import make_graph
+from Algorithms.ida_star import IDAAlgorithm
+from Algorithms.ucs import UCSAlgorithm
+
+
+def test_matches_ucs_with_a_full_and_a_tiny_table():
+    rng = random.Random(11)
+    for kind, n in (('geometric', 40), ('grid', 60), ('scalefree', 60)):
+        graph, heuristic = make_graph(kind, n, 2)
+        ucs = UCSAlgorithm(graph)
+        # table_size=3 fills up at once, so nearly every city goes unrecorded
+        full, tiny = IDAAlgorithm(graph, heuristic), IDAAlgorithm(graph, heuristic, table_size=3)
+        expanded = {full: 0, tiny: 0}
+        for _ in range(10):
+            start, goal = rng.sample(graph.cities, 2)
+            expected_path, expected = ucs.search(start, goal)
+            for search in (full, tiny):
+                path, cost = search.search(start, goal)
+                expanded[search] += search.expanded_nodes
+                assert (path is None) == (expected_path is None)
+                if path is None:
+                    continue
+                assert abs(cost - expected) < 1e-6
+                assert path[0] == start and path[-1] == goal
+                assert abs(graph.path_cost([graph.index[city] for city in path]) - cost) < 1e-6
+        assert expanded[tiny] > expanded[full]
+
+
+def test_heuristic_is_consistent_on_generated_graphs():
+    for kind in ('geometric', 'grid', 'scalefree'):
+        graph, heuristic = make_graph(kind, 60, 2)
+        for goal in range(graph.num_nodes):
+            h = heuristic.goal_row(goal)
+            for u in range(graph.num_nodes):
+                for v, w in graph.edges(u):
+                    assert h[u] <= w + h[v] + 1e-9
@@ -0,0 +1,31 @@
+import threading
+
+import pytest
+
+from Algorithms.generators import make_graph
+from Algorithms.instrumentation import Instrumentation
+from Algorithms.memory_bounded import BeamSearchAlgorithm, SMAStarAlgorithm
+
+
+class FailingSearch:
+    expanded_nodes = 0
+    stats = None
+
+    def search(self, start, goal):
+        raise RuntimeError("search failed")
+
+
+def test_sampler_stops_when_the_search_raises():
+    before = threading.active_count()
+    with pytest.raises(RuntimeError):
+        Instrumentation(profile='sample').run(FailingSearch(), 'a', 'b')
+    assert threading.active_count() == before
+
+
+def test_duplicates_are_counted_among_generated():
+    graph, heuristic = make_graph('grid', 400, 1)
+    start, goal = graph.cities[0], graph.cities[-1]
+    for algo in (BeamSearchAlgorithm(graph, heuristic, beam_width=4),
+                 SMAStarAlgorithm(graph, heuristic, memory_limit=200)):
+        _, _, record = Instrumentation().run(algo, start, goal)
+        assert 0 <= record['duplicates'] <= record['generated']
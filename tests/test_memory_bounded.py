@@ -0,0 +1,89 @@
+import gc
+import random
+
+from Algorithms.a_star import AStarAlgorithm
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+from Algorithms.memory_bounded import (BEAM_TABLE_LAYERS, HEAP_FACTOR, BeamSearchAlgorithm,
+                                       SMAStarAlgorithm, _Node)
+from Algorithms.ucs import UCSAlgorithm
+
+
+def pairs(graph, count, seed=0):
+    rng = random.Random(seed)
+    return [tuple(graph.cities[i] for i in rng.sample(range(graph.num_nodes), 2))
+            for _ in range(count)]
+
+
+def test_sma_star_matches_ucs_when_the_route_fits():
+    graph, heuristic = make_graph('geometric', 200, 2)
+    ucs = UCSAlgorithm(graph)
+    for start, goal in pairs(graph, 15):
+        _, expected = ucs.search(start, goal)
+        path, cost = SMAStarAlgorithm(graph, heuristic, memory_limit=60).search(start, goal)
+        assert path is not None
+        assert abs(cost - expected) < 1e-6
+        assert abs(graph.path_cost([graph.index[c] for c in path]) - cost) < 1e-6
+
+
+def test_sma_star_memory_stays_bounded_with_a_full_table():
+    # a tiny best-g table behaves like the default one on a huge graph
+    graph, heuristic = make_graph('grid', 150, 0)
+    limit = 8
+    for start, goal in pairs(graph, 10):
+        algo = SMAStarAlgorithm(graph, heuristic, memory_limit=limit, table_size=5)
+        algo.search(start, goal)
+        stats = algo.memory_stats
+        assert stats['peak_nodes'] <= limit
+        assert stats['peak_entries'] <= HEAP_FACTOR * limit
+    gc.collect()
+    assert not [obj for obj in gc.get_objects() if isinstance(obj, _Node)]
+
+
+def test_sma_star_gives_up_when_the_route_is_too_long():
+    graph, heuristic = make_graph('grid', 100, 0)
+    start, goal = graph.cities[0], graph.cities[-1]
+    algo = SMAStarAlgorithm(graph, heuristic, memory_limit=4)
+    assert algo.search(start, goal) == (None, 0)
+    assert algo.memory_stats['peak_nodes'] <= 4
+
+
+def test_beam_search_routes_are_real_and_wide_beams_are_optimal():
+    graph, heuristic = make_graph('geometric', 150, 3)
+    astar = AStarAlgorithm(graph, heuristic)
+    for start, goal in pairs(graph, 10):
+        _, expected = astar.search(start, goal)
+        path, cost = BeamSearchAlgorithm(graph, heuristic, beam_width=4).search(start, goal)
+        if path is not None:
+            assert cost >= expected - 1e-6
+            assert abs(graph.path_cost([graph.index[c] for c in path]) - cost) < 1e-6
+        _, wide = BeamSearchAlgorithm(graph, heuristic, beam_width=graph.num_nodes).search(start, goal)
+        assert abs(wide - expected) < 1e-6
+
+
+def test_narrow_beam_matches_ucs_reachability():
+    # straight-line h on a grid never leads a beam into a dead end
+    graph, heuristic = make_graph('grid', 300, 1)
+    ucs = UCSAlgorithm(graph)
+    for width in (1, 2):
+        for start, goal in pairs(graph, 40, seed=width):
+            _, expected = ucs.search(start, goal)
+            algo = BeamSearchAlgorithm(graph, heuristic, beam_width=width)
+            path, cost = algo.search(start, goal)
+            assert path is not None
+            assert cost >= expected - 1e-6
+            assert abs(graph.path_cost([graph.index[c] for c in path]) - cost) < 1e-6
+            assert algo.memory_stats['peak_table'] <= BEAM_TABLE_LAYERS * width + width
+
+
+def test_a_city_dropped_from_the_beam_stays_reachable():
+    # the beam keeps A (better f) and drops B, the only way on is A -> B -> T
+    graph = CompactGraph.from_dict({
+        'S': {'A': 1, 'B': 1},
+        'A': {'B': 1},
+        'B': {'T': 1},
+        'T': {},
+    })
+    estimates = {'S': {'T': 2}, 'A': {'T': 1}, 'B': {'T': 1.5}, 'T': {}}
+    path, cost = BeamSearchAlgorithm(graph, estimates, beam_width=1).search('S', 'T')
+    assert path == ['S', 'A', 'B', 'T'] and cost == 3
@@ -0,0 +1,54 @@
+import random
+
+from Algorithms.a_star import AStarAlgorithm
+from Algorithms.all_pairs import INF, dijkstra_row
+from Algorithms.compact_graph import CompactGraph
+from Algorithms.generators import make_graph
+from Algorithms.priority_queue import QUEUES, make_queue
+from Algorithms.ucs import UCSAlgorithm
+
+
+def one_decimal(graph):
+    """Copy with mileages rounded to 0.1, where the bucket queue is exact"""
+    return CompactGraph.from_edges(graph.cities, ((u, v, max(0.1, round(w, 1)))
+                                                  for u in range(graph.num_nodes)
+                                                  for v, w in graph.edges(u)))
+
+
+def test_queues_pop_in_priority_order():
+    rng = random.Random(10)
+    for name in QUEUES:
+        queue = make_queue(name)
+        best = {}
+        for _ in range(500):
+            node = rng.randrange(100)
+            priority = rng.randrange(1000) / 10
+            if priority < best.get(node, INF):
+                best[node] = priority
+                queue.push(node, priority)
+        popped = [queue.pop() for _ in range(len(queue))]
+        assert [p for p, _ in popped] == sorted(best.values())
+        assert {node: p for p, node in popped} == best
+
+
+def test_ucs_and_a_star_match_dijkstra_with_every_queue():
+    rng = random.Random(11)
+    for kind in ('geometric', 'grid', 'scalefree'):
+        graph, heuristic = make_graph(kind, 200, 12)
+        graph = one_decimal(graph)
+        pairs = [rng.sample(range(graph.num_nodes), 2) for _ in range(15)]
+        for name in QUEUES:
+            algorithms = [UCSAlgorithm(graph, queue=name)]
+            if name != 'bucket':
+                # A* keys are not multiples of 0.1, so the bucket queue is only exact for UCS
+                algorithms.append(AStarAlgorithm(graph, heuristic, queue=name))
+            for algo in algorithms:
+                for source, target in pairs:
+                    expected = dijkstra_row(graph, source)[0][target]
+                    path, cost = algo.search(graph.cities[source], graph.cities[target])
+                    if expected == INF:
+                        assert path is None
+                        continue
+                    assert abs(cost - expected) < 1e-6, (name, type(algo).__name__)
+                    ids = [graph.index[city] for city in path]
+                    assert abs(graph.path_cost(ids) - cost) < 1e-6
@@ -0,0 +1,108 @@
+"""GraphRenderer against a stand-in graphviz module (no Graphviz binaries needed)"""
+
+import threading
+
+import pytest
+
+from Algorithms import rendering
+from Algorithms.generators import make_graph
+
+
+class StubGraphviz:
+    """Records what the renderer asks of graphviz.Graph"""
+
+    def __init__(self):
+        self.layouts = 0
+        self.renders = []
+        self.release = threading.Event()
+        self.release.set()
+        stub = self
+
+        class Graph:
+            def __init__(self, comment=None, engine='dot'):
+                self.engine = engine
+                self.attrs = {}
+                self.nodes = []
+                self.edges = []
+
+            def attr(self, **attrs):
+                self.attrs.update(attrs)
+
+            def node(self, name, label=None, **attrs):
+                self.nodes.append((name, attrs))
+
+            def edge(self, a, b, **attrs):
+                self.edges.append((a, b, attrs))
+
+            def pipe(self, format):
+                stub.layouts += 1
+                lines = ['graph 1 10 10']
+                for i, (name, _) in enumerate(self.nodes):
+                    lines.append(f'node "{name}" {i % 7} {i // 7} 0.8 0.8 "{name}" solid circle')
+                return '\n'.join(lines + ['stop']).encode('utf-8')
+
+            def render(self, filename, format, cleanup, neato_no_op):
+                stub.release.wait(5)
+                stub.renders.append((filename, self))
+                return f"{filename}.{format}"
+
+        self.Graph = Graph
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    graphviz = StubGraphviz()
+    monkeypatch.setattr(rendering, 'graphviz', graphviz, raising=False)
+    return graphviz
+
+
+def test_layout_is_computed_once_and_kept_on_disk(stub, tmp_path):
+    graph, _ = make_graph('grid', 25, 0)
+    renderer = rendering.GraphRenderer(graph, cache_dir=str(tmp_path))
+    first = renderer.render(filename=str(tmp_path / 'full'))
+    second = renderer.render([graph.cities[0], graph.cities[1]], str(tmp_path / 'route'))
+    assert first.result() and second.result()
+    renderer.close()
+    assert stub.layouts == 1
+
+    # a new renderer on the same graph reads the layout file back
+    graph.derived.clear()
+    renderer = rendering.GraphRenderer(graph, cache_dir=str(tmp_path))
+    renderer.render(filename=str(tmp_path / 'again')).result()
+    renderer.close()
+    assert stub.layouts == 1
+
+    for _, dot in stub.renders:
+        assert dot.attrs['splines'] == 'true'
+        assert all(attrs['pos'].endswith('!') for _, attrs in dot.nodes)
+
+    # an edited graph has other contents, so it gets its own layout
+    graph.update_edges([(0, 24, 3.0)])
+    renderer = rendering.GraphRenderer(graph, cache_dir=str(tmp_path))
+    renderer.render(filename=str(tmp_path / 'edited')).result()
+    renderer.close()
+    assert stub.layouts == 2
+
+
+def test_pending_renders_are_shared_only_for_the_same_picture(stub, tmp_path):
+    graph, _ = make_graph('grid', 25, 0)
+    cities = graph.cities
+    renderer = rendering.GraphRenderer(graph, cache_dir=str(tmp_path))
+    renderer.layout()
+    stub.release.clear()
+    route = renderer.render([cities[0], cities[1]], 'out')
+    same = renderer.render([cities[0], cities[1]], 'out')
+    other = renderer.render([cities[0], cities[5]], 'out')
+    again = renderer.render([cities[0], cities[5]], 'out')
+    elsewhere = renderer.render([cities[0], cities[1]], 'other')
+    assert same is route and again is other
+    assert other is not route and elsewhere is not route
+    stub.release.set()
+    renderer.wait()
+    renderer.close()
+
+    out = [dot for filename, dot in stub.renders if filename == 'out']
+    assert len(out) == 2
+    # the later request for the same file is drawn last
+    red = [(a, b) for a, b, attrs in out[-1].edges if attrs.get('color') == 'red']
+    assert red == [(cities[0], cities[5])]